@@ -17,6 +17,13 @@ class AIBase:
         self._complete_state = False
         self._query_state = False
         self._ai_logic = None
+        self._angle_listener = None
+        self._angle_dispatched = False
+        self._token_history = []
+        self._response_cache = None
+        self._target_angles = []
+        self._measurements = []
+        self._sweep_request = None
 
     
     @abstractmethod
@@ -40,6 +47,28 @@ class AIBase:
         '''
         pass
 
+    def connect_agent(self):
+        '''
+        Open the connection to the ai model; agents without a remote model need none
+        '''
+        pass
+
+    def close(self):
+        '''
+        Release agent resources such as client connections
+        '''
+        pass
+
+    def dispatch_angle(self, angle=None):
+        '''
+        Hand the target angle to the registered listener, at most once per query
+        '''
+        if self._angle_dispatched or self._angle_listener is None:
+            return False
+        self._angle_dispatched = True
+        self._angle_listener(self._angle if angle is None else angle)
+        return True
+
     # Getter for angle
     @property
     def angle(self):
@@ -48,13 +77,62 @@ class AIBase:
     # Setter for angle
     @angle.setter
     def angle(self, new_angle):
-        if not isinstance(new_angle, (int, float)):
+        self._check_angle(new_angle)
+        self._angle = new_angle
+        self._angle_history.append(new_angle)
+
+    @staticmethod
+    def _check_angle(angle):
+        if not isinstance(angle, (int, float)):
             raise ValueError("Angle must be a number")
-        elif new_angle < -90 or new_angle > 90:
+        elif angle < -90 or angle > 90:
             raise ValueError("Angle must be between -90 and +90 degrees")
-        else:
-            self._angle = new_angle
-            self._angle_history.append(new_angle)
+
+    # Getter for batch target angles
+    @property
+    def target_angles(self):
+        return self._target_angles
+
+    # Setter for batch target angles; every angle is recorded in the angle history in order
+    @target_angles.setter
+    def target_angles(self, angles):
+        angles = list(angles)
+        if not angles:
+            raise ValueError("At least one target angle is required")
+        for angle in angles:
+            self._check_angle(angle)
+        for angle in angles:
+            self.angle = angle
+        self._target_angles = angles
+
+    # Getter for the latest batch of (angle, distance) measurements
+    @property
+    def measurements(self):
+        return self._measurements
+
+    # Setter for a batch of measurements; every distance is recorded in the distance history in order
+    @measurements.setter
+    def measurements(self, pairs):
+        pairs = [(float(angle), float(distance)) for angle, distance in pairs]
+        for _, distance in pairs:
+            self.distance = distance
+        self._measurements = pairs
+
+    # Getter for requested sweep (start, stop, every_n), or None
+    @property
+    def sweep_request(self):
+        return self._sweep_request
+
+    # Setter for requested sweep; the profile comes back as the next batch of measurements
+    @sweep_request.setter
+    def sweep_request(self, request):
+        if request is not None:
+            start, stop, every_n = request
+            self._check_angle(start)
+            self._check_angle(stop)
+            if every_n < 1:
+                raise ValueError("Sweep must range every step or every Nth step")
+        self._sweep_request = request
 
     # Getter for distance
     @property
@@ -126,4 +204,39 @@ class AIBase:
     # Setter for ai logic
     @ai_logic.setter
     def ai_logic(self, logic):
-        self._ai_logic = logic
\ No newline at end of file
+        self._ai_logic = logic
+
+    # Getter for angle listener
+    @property
+    def angle_listener(self):
+        return self._angle_listener
+
+    # Setter for angle listener, called with each new target angle
+    @angle_listener.setter
+    def angle_listener(self, listener):
+        self._angle_listener = listener
+
+    # Getter for angle dispatch state
+    @property
+    def angle_dispatched(self):
+        return self._angle_dispatched
+
+    # Setter for angle dispatch state
+    @angle_dispatched.setter
+    def angle_dispatched(self, state):
+        self._angle_dispatched = state
+
+    # Getter for per-request token usage
+    @property
+    def token_history(self):
+        return self._token_history
+
+    # Getter for response cache
+    @property
+    def response_cache(self):
+        return self._response_cache
+
+    # Setter for response cache, consulted before each model request
+    @response_cache.setter
+    def response_cache(self, cache):
+        self._response_cache = cache
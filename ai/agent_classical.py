@@ -0,0 +1,140 @@
+"""
+Classical search agents
+Deterministic local agents answering each turn with a search strategy from search_strategies.py,
+or with sweep commands, instead of a model.  They need no network and add no model latency, so they
+serve as baselines for the LLM agents and as a fast path when no LLM is needed.
+"""
+from abc import ABC, abstractmethod
+from agent_base import AIBase
+from search_strategies import DEFAULT_MAX_TURNS, MIN_ANGLE, MAX_ANGLE, closest, make_strategy
+from scan_planner import MOTOR_STEP
+import tracing
+
+DEFAULT_SWEEP_EVERY_N = 5
+
+class ClassicalAgent(AIBase, ABC):
+    '''
+    Base for local agents; model options (model, base_url, seed, ...) are ignored
+    '''
+    name = None
+
+    def __init__(self, angle, batch_mode=False, **options):
+        super().__init__(angle)
+        self._batch_mode = batch_mode
+        self._observations = []
+        self._requested = [float(angle)]
+
+    # Getter for batch protocol mode
+    @property
+    def batch_mode(self):
+        return self._batch_mode
+
+    # Getter for (angle, distance) observations in visit order
+    @property
+    def observations(self):
+        return self._observations
+
+    def initialize_agent(self):
+        # No model to instruct; the search already knows the goal
+        print(f"Initializing {self.name} search agent...")
+        self.comprehension = "ok"
+
+    def update_angle(self):
+        with tracing.span("agent.update_angle"):
+            self._update_angle()
+
+    @abstractmethod
+    def _next_targets(self):
+        '''
+        (angles, finished) for the next turn; an agent may set sweep_request instead of returning angles
+        '''
+        pass
+
+    def _description(self):
+        return " ".join(type(self).__doc__.split())
+
+    def _update_angle(self):
+        # A sweep reply carries its own angles; otherwise pair the latest distances with the angles requested
+        if self._requested is None:
+            self._observations.extend(self.measurements)
+        elif self._batch_mode:
+            self._observations.extend(zip(self._requested, [distance for _, distance in self.measurements]))
+        else:
+            self._observations.append((self._requested[0], self.distance))
+
+        # Next target angles or sweep, or the closest observation once the search has finished
+        self.sweep_request = None
+        angles, finished = self._next_targets()
+        self.query_state = True
+        if finished:
+            self.complete_state = True
+            self.angle = angles[0]
+            print(f"{self.name} search finished at {angles[0]:g} degrees")
+        elif self.sweep_request is not None:
+            start, stop, every_n = self.sweep_request
+            print(f"{self.name} search sweep: {start:g} to {stop:g} degrees, every {every_n} steps")
+            angles = None
+        elif self._batch_mode:
+            self.target_angles = angles
+            print(f"{self.name} search angles: {', '.join(f'{angle:g}' for angle in angles)}")
+        else:
+            self.angle = angles[0]
+            print(f"{self.name} search angle: {angles[0]:g}")
+        self._requested = angles
+
+    def get_agent_logic(self):
+        # The search description and the observation table sorted by angle
+        rows = "\n".join(f"{angle:g} | {distance:g}" for angle, distance in sorted(self._observations))
+        self.ai_logic = self._description() + "\nangle (degrees) | distance\n" + rows
+        print("Search agent logic:")
+        print(self.ai_logic)
+
+class StrategyAgent(ClassicalAgent):
+    '''
+    Agent driven by a registered search strategy
+    '''
+    def __init__(self, angle, batch_mode=False, max_turns=DEFAULT_MAX_TURNS, **options):
+        super().__init__(angle, batch_mode, **options)
+        self._strategy = make_strategy(self.name, max_turns=max_turns)
+
+    def _next_targets(self):
+        if self._batch_mode:
+            return self._strategy.next_batch(self._observations)
+        angle, finished = self._strategy.next_step(self._observations)
+        return [angle], finished
+
+    def _description(self):
+        return " ".join(type(self._strategy).__doc__.split())
+
+class GridRefineAgent(StrategyAgent):
+    name = "grid-refine"
+
+class GoldenSectionAgent(StrategyAgent):
+    name = "golden-section"
+
+class MultiStartAgent(StrategyAgent):
+    name = "multi-start"
+
+class SweepAgent(ClassicalAgent):
+    '''
+    Sweep the whole field of view at every Nth motor step in one command, then sweep every motor step
+    within N steps of the closest reading, and answer with the closest reading of both sweeps
+    '''
+    name = "sweep"
+
+    def __init__(self, angle, batch_mode=False, sweep_every_n=DEFAULT_SWEEP_EVERY_N, **options):
+        super().__init__(angle, batch_mode, **options)
+        self._every_n = sweep_every_n
+        self._sweeps = 0
+
+    def _next_targets(self):
+        best = closest(self._observations)[0]
+        if self._sweeps == 0:
+            self.sweep_request = (MIN_ANGLE, MAX_ANGLE, self._every_n)
+        elif self._sweeps == 1 and self._every_n > 1:
+            span = self._every_n * MOTOR_STEP
+            self.sweep_request = (max(best - span, MIN_ANGLE), min(best + span, MAX_ANGLE), 1)
+        else:
+            return [best], True
+        self._sweeps += 1
+        return [], False
@@ -0,0 +1,22 @@
+"""
+Registry of selectable ai agents
+"""
+from agent_openai import OpenAIAgent, AsyncOpenAIAgent
+from agent_classical import GridRefineAgent, GoldenSectionAgent, MultiStartAgent, SweepAgent
+
+AGENTS = {
+    "openAI": OpenAIAgent,
+    "openAI-stream": AsyncOpenAIAgent,
+    "grid-refine": GridRefineAgent,
+    "golden-section": GoldenSectionAgent,
+    "multi-start": MultiStartAgent,
+    "sweep": SweepAgent,
+}
+
+def create_agent(name, angle=0, **options):
+    '''
+    Instantiate a registered agent by its command line name
+    '''
+    if name not in AGENTS:
+        raise ValueError(f"Unknown ai agent '{name}'. Available: {', '.join(sorted(AGENTS))}")
+    return AGENTS[name](angle, **options)
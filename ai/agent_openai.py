@@ -2,23 +2,163 @@
 openai api interface
 """
 from agent_base import AIBase
-from openai import OpenAI
+from response_cache import CacheMissError
+import tracing
+from openai import OpenAI, AsyncOpenAI
+import asyncio
 import re
 import os
 
+DEFAULT_MODEL = "gpt-4o"
+MAX_BATCH_ANGLES = 20
+
+# Leading number followed by a character that cannot continue it
+_LEADING_ANGLE = re.compile(r'^\s*(-?\d+(?:\.\d*)?)(?=[^\d.])')
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+
+def leading_angle(text):
+    '''
+    Target angle at the start of a partial response, once the number is complete
+    '''
+    match = _LEADING_ANGLE.match(text)
+    if match:
+        return float(match.group(1))
+    return None
+
+def parse_angle_list(text, limit=MAX_BATCH_ANGLES):
+    '''
+    Target angles in a batch response; angles outside the field of view are skipped
+    '''
+    angles = [float(value) for value in _NUMBER.findall(text)]
+    return [angle for angle in angles if -90 <= angle <= 90][:limit]
+
+def format_measurements(pairs):
+    '''
+    Batch measurements as "angle: distance" pairs separated by semicolons
+    '''
+    return "; ".join(f"{angle:g}: {distance:g}" for angle, distance in pairs)
+
 class OpenAIAgent(AIBase):
-    def __init__(self, angle):
+    def __init__(self, angle, compact_context=False, model=DEFAULT_MODEL, base_url=None, seed=None,
+                 batch_mode=False):
         super().__init__(angle)
         self._api_key = None
         self._client = None
         self._context = []
+        self._model = model
+        self._base_url = base_url
+        self._seed = seed
+        self._batch_mode = batch_mode
+        self._observations = []
+        self._compact_context = compact_context
+        self._distance_message = None
+
+    def _offline(self):
+        '''
+        Replay mode answers every request from the response cache without the API
+        '''
+        return self.response_cache is not None and self.response_cache.mode == "replay"
 
     # Initialize API connection
-    _api_key = os.getenv("OPENAI_API_KEY")
-    if not _api_key:
-        raise ValueError("API key not found. Make sure OPENAI_API_KEY is set as an environment variable.")
     def connect_agent(self):
-        self._client = OpenAI(api_key=self._api_key)
+        if self._offline():
+            return
+        # A local or self-hosted endpoint may not need a key
+        self._api_key = os.getenv("OPENAI_API_KEY")
+        if not self._api_key:
+            if self._base_url is None:
+                raise ValueError("API key not found. Make sure OPENAI_API_KEY is set as an environment variable.")
+            self._api_key = "not-needed"
+        self._client = self._create_client()
+
+    def _create_client(self):
+        return OpenAI(api_key=self._api_key, base_url=self._base_url)
+
+    def _chat(self, on_text=None):
+        '''
+        Send the context history to the model and return the response text.
+        on_text receives the partial response for agents that stream.
+        '''
+        messages = self._request_messages()
+        cache = self.response_cache
+        if cache is not None:
+            with tracing.span("agent.cache_lookup"):
+                resp = cache.lookup(self._model, messages, self._request_options())
+            if resp is not None:
+                self._record_usage(None, messages, cached=True)
+                if on_text is not None:
+                    on_text(resp)
+                return resp
+        with tracing.span("agent.llm_request", model=self._model, messages=len(messages)):
+            resp = self._query_model(messages, on_text)
+        if cache is not None:
+            cache.store(self._model, messages, resp, self._request_options())
+        return resp
+
+    def _query_model(self, messages, on_text=None):
+        '''
+        Request a chat completion from the API
+        '''
+        chat_completion = self._client.chat.completions.create(
+            messages=messages, model=self._model, **self._request_options())
+        self._record_usage(chat_completion.usage, messages)
+        return chat_completion.choices[0].message.content
+
+    def _request_messages(self):
+        '''
+        Messages for the next request.  In compaction mode the turn-by-turn history is
+        replaced by the initial prompt exchange, one observation table and any pending question.
+        '''
+        if not self._compact_context or len(self._context) <= 2 or not self._observations:
+            return self._context
+        messages = self._context[:2] + [{"role": "user", "content": self._observation_summary()}]
+        if self._context[-1] is not self._distance_message:
+            messages.append(self._context[-1])
+        return messages
+
+    def _observation_summary(self):
+        '''
+        Table of (angle, distance) observations sorted by angle, with the current angle and latest distance last.
+        Revisited angles keep their latest distance, so the table never exceeds one row per motor step.
+        '''
+        observations = dict(self._observations)
+        rows = [f"{angle:g} | {observations[angle]:g}" for angle in sorted(observations)]
+        angle, distance = self._observations[-1]
+        return ("Measurements so far, sorted by angle:\n"
+                "angle (degrees) | distance\n" + "\n".join(rows) +
+                f"\nCurrent angle: {angle:g}\nLatest distance: {distance}")
+
+    def _request_options(self):
+        '''
+        Optional request parameters; a seed asks the model for reproducible sampling
+        '''
+        return {} if self._seed is None else {"seed": self._seed}
+
+    def _record_usage(self, usage, messages, cached=False):
+        '''
+        Store token counts reported for one request; cached responses use no tokens
+        '''
+        self._token_history.append({
+            "messages": len(messages),
+            "prompt_tokens": 0 if cached else getattr(usage, "prompt_tokens", None),
+            "completion_tokens": 0 if cached else getattr(usage, "completion_tokens", None),
+            "cached": cached,
+        })
+
+    # Getter for batch protocol mode
+    @property
+    def batch_mode(self):
+        return self._batch_mode
+
+    def _on_partial_response(self, text):
+        '''
+        Hand the target angle to the listener as soon as the response holds a complete number
+        '''
+        if self.angle_dispatched or self._batch_mode:
+            return
+        angle = leading_angle(text)
+        if angle is not None and -90 <= angle <= 90:
+            self.dispatch_angle(angle)
 
     def initialize_agent(self):
         try:
@@ -29,11 +169,9 @@ class OpenAIAgent(AIBase):
                     "content": self.initial_prompt,
                 }
             self._context.append(user_message)
-            chat_completion = self._client.chat.completions.create(
-                messages=self._context, model="gpt-4o",)
-            
+            resp = self._chat()
+
             # Udpate ai state and context history
-            resp = chat_completion.choices[0].message.content
             print("OpenAI response:")
             print(resp)
             self.comprehension = resp.lower().strip()
@@ -42,24 +180,35 @@ class OpenAIAgent(AIBase):
                     "content": resp,
             }
             self._context.append(ai_resp)
+        except CacheMissError:
+            raise
         except Exception as e:
             print(f"Failed to communicate with OpenAI: {e}")
 
     def update_angle(self):
+        with tracing.span("agent.update_angle"):
+            self._update_angle()
+
+    def _update_angle(self):
+        # Pair each measurement with the angle it was taken at as it arrives
+        if self._batch_mode:
+            self._observations.extend(self.measurements)
+        else:
+            self._observations.append((self.angle, self.distance))
+
         try:
             # Request ai to update the target angle and update context history
             print("Sending updated proximity to OpenAI...")
             user_message = {
                     "role": "user",
-                    "content": str(self.distance),
+                    "content": format_measurements(self.measurements) if self._batch_mode else str(self.distance),
                 }
             self._context.append(user_message)
-            chat_completion = self._client.chat.completions.create(
-                messages=self._context, model="gpt-4o",)
+            self._distance_message = user_message
+            resp = self._chat(on_text=self._on_partial_response)
 
             # Udpate ai state and context history
             self.query_state = True
-            resp = chat_completion.choices[0].message.content
             print("OpenAI response:")
             print(resp)
             ai_resp = {
@@ -75,11 +224,22 @@ class OpenAIAgent(AIBase):
                 if match:
                     extracted_value = float(match.group(1))
                     self.angle = float(extracted_value)
+            elif self._batch_mode:
+                angles = parse_angle_list(resp)
+                if not angles:
+                    # Re-measure the current angle rather than re-sending the previous batch
+                    print(f"No valid target angles in OpenAI response: {resp!r}")
+                    angles = [self.angle]
+                self.target_angles = angles
             else:
-                self.angle = float(resp)
-            
+                # Same leading number a streaming response may already have dispatched
+                angle = leading_angle(resp + "\n")
+                self.angle = angle if angle is not None else float(resp)
+
             print("\n")
-            
+
+        except CacheMissError:
+            raise
         except Exception as e:
             print(f"Failed to get proper response from OpenAI: {e}")
 
@@ -94,11 +254,9 @@ class OpenAIAgent(AIBase):
                                 " and the other column has the measured distance at that angle.",
                 }
             self._context.append(user_message)
-            chat_completion = self._client.chat.completions.create(
-                messages=self._context, model="gpt-4o",)
-            
+            resp = self._chat()
+
             # Udpate ai state and context history
-            resp = chat_completion.choices[0].message.content
             print("OpenAI response:")
             print(resp)
             ai_resp = {
@@ -106,5 +264,61 @@ class OpenAIAgent(AIBase):
                     "content": resp,
             }
             self._context.append(ai_resp)
+        except CacheMissError:
+            raise
         except Exception as e:
-            print(f"Failed to communicate with OpenAI: {e}")
\ No newline at end of file
+            print(f"Failed to communicate with OpenAI: {e}")
+
+class AsyncOpenAIAgent(OpenAIAgent):
+    '''
+    Streaming agent on the asyncio OpenAI client.
+    The target angle is dispatched as soon as its number has streamed in, so the
+    hardware starts moving while the rest of the response is still arriving.
+    '''
+    def __init__(self, angle, compact_context=False, model=DEFAULT_MODEL, base_url=None, seed=None,
+                 batch_mode=False):
+        super().__init__(angle, compact_context, model, base_url, seed, batch_mode)
+        self._loop = None
+
+    def connect_agent(self):
+        self._loop = asyncio.new_event_loop()
+        super().connect_agent()
+
+    def _create_client(self):
+        return AsyncOpenAI(api_key=self._api_key, base_url=self._base_url)
+
+    def _query_model(self, messages, on_text=None):
+        return self._loop.run_until_complete(self._stream_chat(messages, on_text))
+
+    async def _stream_chat(self, messages, on_text=None):
+        '''
+        Stream the response, passing the text received so far to on_text after each chunk
+        '''
+        stream = await self._client.chat.completions.create(
+            messages=messages, model=self._model, stream=True,
+            stream_options={"include_usage": True}, **self._request_options())
+        resp = ""
+        usage = None
+        async for chunk in stream:
+            # Usage arrives in a final chunk without choices
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                resp += delta
+                if on_text is not None:
+                    on_text(resp)
+        self._record_usage(usage, messages)
+        return resp
+
+    def close(self):
+        '''
+        Close the client connection and the event loop
+        '''
+        if self._loop is not None:
+            if self._client is not None:
+                self._loop.run_until_complete(self._client.close())
+            self._loop.close()
+            self._loop = None
@@ -0,0 +1,116 @@
+"""
+Persistent LLM response cache and replay store
+Responses are stored in SQLite keyed by a hash of the model and the normalized request messages
+
+Modes:
+ - record: always query the model and store (overwrite) the response
+ - replay: answer from the cache only; a miss raises CacheMissError
+ - read-through: answer from the cache, querying and storing on a miss
+"""
+import hashlib
+import json
+import re
+import sqlite3
+
+CACHE_MODES = ("record", "replay", "read-through")
+DEFAULT_MAX_ENTRIES = 10000
+
+class CacheMissError(LookupError):
+    '''
+    Raised in replay mode when a request has no cached response
+    '''
+    pass
+
+def normalize_messages(messages):
+    '''
+    Role and whitespace-normalized content of each message
+    '''
+    return [{"role": message["role"], "content": re.sub(r'\s+', ' ', str(message["content"])).strip()}
+            for message in messages]
+
+def request_key(model, messages, options=None):
+    '''
+    Cache key for a request: hash of the model name, normalized messages and any sampling options
+    '''
+    request = {"model": model, "messages": normalize_messages(messages)}
+    if options:
+        request["options"] = options
+    payload = json.dumps(request, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    def __init__(self, path, mode="read-through", max_entries=DEFAULT_MAX_ENTRIES):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Cache mode must be one of {', '.join(CACHE_MODES)}")
+        if max_entries <= 0:
+            raise ValueError("Cache size must be greater than 0")
+        self._path = path
+        self._mode = mode
+        self._max_entries = max_entries
+        self._hits = 0
+        self._misses = 0
+        # Evaluation workers may share one cache file; wait for other writers
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, response TEXT, last_used INTEGER)")
+        self._db.commit()
+
+        # LRU clock continues from the most recent use in the store
+        self._clock = self._db.execute("SELECT COALESCE(MAX(last_used), 0) FROM responses").fetchone()[0]
+
+    # Getter for cache mode
+    @property
+    def mode(self):
+        return self._mode
+
+    # Getter for number of requests answered from the cache
+    @property
+    def hits(self):
+        return self._hits
+
+    # Getter for number of requests not found in the cache
+    @property
+    def misses(self):
+        return self._misses
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def lookup(self, model, messages, options=None):
+        '''
+        Cached response for a request, or None when the model should be queried
+        '''
+        if self._mode == "record":
+            return None
+        key = request_key(model, messages, options)
+        row = self._db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._misses += 1
+            if self._mode == "replay":
+                raise CacheMissError(f"No cached response for request {key[:12]}")
+            return None
+        self._hits += 1
+        self._clock += 1
+        self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (self._clock, key))
+        self._db.commit()
+        return row[0]
+
+    def store(self, model, messages, response, options=None):
+        '''
+        Store a model response and evict the least recently used entries beyond the size cap
+        '''
+        if self._mode == "replay":
+            return
+        self._clock += 1
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, model, response, last_used) VALUES (?, ?, ?, ?)",
+            (request_key(model, messages, options), model, response, self._clock))
+        self._db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self._max_entries,))
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
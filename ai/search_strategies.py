@@ -0,0 +1,266 @@
+"""
+Scripted search strategies for finding the closest obstacle
+Each strategy maps the observations so far to the next sensor angle, or to a final answer.
+
+Strategies are stateless: next_step() only depends on the (angle, distance) observations,
+ordered by visit with the current sensor position last, so a strategy can answer any
+request without session state.
+"""
+import math
+import random
+from abc import ABC, abstractmethod
+
+MIN_ANGLE = -90.0
+MAX_ANGLE = 90.0
+DEFAULT_MAX_TURNS = 40
+INV_PHI = (math.sqrt(5) - 1) / 2
+
+def closest(observations):
+    '''
+    Observation with the shortest distance
+    '''
+    return min(observations, key=lambda observation: observation[1])
+
+def _round_angle(angle):
+    return round(min(max(angle, MIN_ANGLE), MAX_ANGLE), 1)
+
+def _measured(observations):
+    '''
+    Latest distance at each visited angle, keyed by the angle rounded like the replies
+    '''
+    return {round(angle, 1): distance for angle, distance in observations}
+
+class SearchStrategy(ABC):
+    '''
+    Base strategy: finish at the closest observation after max_turns
+    '''
+    name = None
+
+    def __init__(self, max_turns=DEFAULT_MAX_TURNS, seed=0):
+        self._max_turns = max_turns
+        self._seed = seed
+
+    def next_step(self, observations):
+        '''
+        (angle, finished) for the next reply; finished angles report the closest obstacle
+        '''
+        if len(observations) > self._max_turns:
+            return closest(observations)[0], True
+        angle = self._next_angle(observations)
+        if angle is None:
+            return closest(observations)[0], True
+        return _round_angle(angle), False
+
+    def next_batch(self, observations):
+        '''
+        (angles, finished) for a batch reply; one angle unless the strategy knows several in advance
+        '''
+        angle, finished = self.next_step(observations)
+        return [angle], finished
+
+    @abstractmethod
+    def _next_angle(self, observations):
+        '''
+        Next angle to measure, or None once the search has finished
+        '''
+        pass
+
+class GridScan(SearchStrategy):
+    '''
+    Visit a uniform grid across the field of view, then answer with the closest grid point
+    '''
+    name = "grid"
+
+    def __init__(self, step=10.0, **kwargs):
+        super().__init__(**kwargs)
+        self._step = step
+
+    def _next_angle(self, observations):
+        visited = {round(angle, 1) for angle, _ in observations}
+        num_points = int(round((MAX_ANGLE - MIN_ANGLE) / self._step))
+        for index in range(num_points + 1):
+            angle = _round_angle(MIN_ANGLE + index * self._step)
+            if angle not in visited:
+                return angle
+        return None
+
+class Bisection(SearchStrategy):
+    '''
+    Coarse scan, then repeatedly bisect the wider gap next to the closest observation
+    until both neighbouring gaps are below the resolution
+    '''
+    name = "bisection"
+
+    def __init__(self, coarse_points=5, resolution=1.8, **kwargs):
+        super().__init__(**kwargs)
+        self._coarse_points = coarse_points
+        self._resolution = resolution
+
+    def _next_angle(self, observations):
+        visited = sorted({round(angle, 1) for angle, _ in observations})
+        spacing = (MAX_ANGLE - MIN_ANGLE) / (self._coarse_points - 1)
+        for index in range(self._coarse_points):
+            angle = _round_angle(MIN_ANGLE + index * spacing)
+            if angle not in visited:
+                return angle
+
+        best = round(closest(observations)[0], 1)
+        position = visited.index(best)
+        left = visited[position - 1] if position > 0 else MIN_ANGLE
+        right = visited[position + 1] if position < len(visited) - 1 else MAX_ANGLE
+        gaps = [(best - left, (best + left) / 2), (right - best, (best + right) / 2)]
+        width, midpoint = max(gaps)
+        if width < self._resolution:
+            return None
+        return midpoint
+
+class RandomWalk(SearchStrategy):
+    '''
+    Step a random distance left or right of the current angle, reflecting at the field limits.
+    Seeded by the turn number, so a replayed conversation gets the same walk.
+    '''
+    name = "random-walk"
+
+    def __init__(self, step=15.0, **kwargs):
+        super().__init__(**kwargs)
+        self._step = step
+
+    def _next_angle(self, observations):
+        rng = random.Random(self._seed * 1000003 + len(observations))
+        angle = observations[-1][0] + rng.choice((-1, 1)) * rng.uniform(0.5, 1.0) * self._step
+        if angle > MAX_ANGLE:
+            angle = 2 * MAX_ANGLE - angle
+        elif angle < MIN_ANGLE:
+            angle = 2 * MIN_ANGLE - angle
+        return angle
+
+class CoarseRefine(SearchStrategy):
+    '''
+    Coarse grid across the field of view, then probe either side of the closest observation
+    at halving steps until the step falls below the resolution
+    '''
+    name = "grid-refine"
+
+    def __init__(self, step=20.0, resolution=1.8, **kwargs):
+        super().__init__(**kwargs)
+        self._step = step
+        self._resolution = resolution
+
+    def _coarse_angles(self):
+        num_points = int(round((MAX_ANGLE - MIN_ANGLE) / self._step))
+        return [_round_angle(MIN_ANGLE + index * self._step) for index in range(num_points + 1)]
+
+    def next_batch(self, observations):
+        # The whole coarse grid is known up front
+        measured = _measured(observations)
+        coarse = [angle for angle in self._coarse_angles() if angle not in measured]
+        if coarse and len(observations) <= self._max_turns:
+            return coarse, False
+        return super().next_batch(observations)
+
+    def _next_angle(self, observations):
+        measured = _measured(observations)
+        for angle in self._coarse_angles():
+            if angle not in measured:
+                return angle
+
+        best = closest(observations)[0]
+        step = self._step / 2
+        while step >= self._resolution:
+            for angle in (_round_angle(best - step), _round_angle(best + step)):
+                if angle not in measured:
+                    return angle
+            step /= 2
+        return None
+
+class GoldenSection(SearchStrategy):
+    '''
+    Golden-section search over the field of view; finds the closest obstacle when the distance has a single minimum.
+    The bracket is rebuilt from the observations each turn, and each narrowing reuses one interior point.
+    '''
+    name = "golden-section"
+
+    def __init__(self, resolution=1.8, **kwargs):
+        super().__init__(**kwargs)
+        self._resolution = resolution
+
+    def _next_angle(self, observations):
+        measured = _measured(observations)
+        low, high = MIN_ANGLE, MAX_ANGLE
+        while high - low >= self._resolution:
+            left = high - INV_PHI * (high - low)
+            right = low + INV_PHI * (high - low)
+            for angle in (left, right):
+                if _round_angle(angle) not in measured:
+                    return angle
+            if measured[_round_angle(left)] <= measured[_round_angle(right)]:
+                high = right
+            else:
+                low = left
+        return None
+
+class MultiStartLocal(SearchStrategy):
+    '''
+    Measure evenly spaced start angles, then run a compass search from the closest few: probe either
+    side of the current angle, move to a closer probe, or halve the step when neither is closer
+    '''
+    name = "multi-start"
+
+    def __init__(self, starts=5, searches=2, resolution=1.8, **kwargs):
+        super().__init__(**kwargs)
+        self._starts = starts
+        self._searches = searches
+        self._resolution = resolution
+
+    def _start_angles(self):
+        spacing = (MAX_ANGLE - MIN_ANGLE) / self._starts
+        return [_round_angle(MIN_ANGLE + (index + 0.5) * spacing) for index in range(self._starts)]
+
+    def next_batch(self, observations):
+        # The start angles are known up front
+        measured = _measured(observations)
+        starts = [angle for angle in self._start_angles() if angle not in measured]
+        if starts and len(observations) <= self._max_turns:
+            return starts, False
+        return super().next_batch(observations)
+
+    def _next_angle(self, observations):
+        measured = _measured(observations)
+        starts = self._start_angles()
+        for angle in starts:
+            if angle not in measured:
+                return angle
+
+        step = (MAX_ANGLE - MIN_ANGLE) / self._starts / 2
+        for start in sorted(starts, key=lambda angle: measured[angle])[:self._searches]:
+            angle = self._local_search(start, step, measured)
+            if angle is not None:
+                return angle
+        return None
+
+    def _local_search(self, angle, step, measured):
+        '''
+        Next unmeasured probe of the compass search from angle, or None once it has converged
+        '''
+        while step >= self._resolution:
+            probes = [_round_angle(angle - step), _round_angle(angle + step)]
+            for probe in probes:
+                if probe not in measured:
+                    return probe
+            best = min(probes, key=lambda probe: measured[probe])
+            if measured[best] < measured[angle]:
+                angle = best
+            else:
+                step /= 2
+        return None
+
+STRATEGIES = {strategy.name: strategy for strategy in (Bisection, GridScan, RandomWalk, CoarseRefine,
+                                                       GoldenSection, MultiStartLocal)}
+
+def make_strategy(name, **kwargs):
+    '''
+    Instantiate a registered strategy by name
+    '''
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown search strategy '{name}'. Available: {', '.join(sorted(STRATEGIES))}")
+    return STRATEGIES[name](**kwargs)
@@ -0,0 +1,257 @@
+"""
+OpenAI-compatible local stand-in server
+Implements POST /v1/chat/completions (streaming and non-streaming) and answers with the
+prompts.json protocol (OK, numeric angles, FINISHED <angle>) using a scripted search strategy.
+Latency and failure injection allow load testing the agent loop without the network.
+
+Usage:
+    python ai/standin_server.py --strategy bisection --port 8000 [--latency 0.5] [--failure-rate 0.1]
+    python project.py -a openAI -m 1 -p 2 --base-url http://127.0.0.1:8000/v1
+"""
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from search_strategies import STRATEGIES, make_strategy
+
+DEFAULT_PORT = 8000
+INITIAL_ANGLE = 0.0
+
+_NUMBER = re.compile(r'^\s*(-?\d+(?:\.\d*)?)\s*$')
+_TABLE_ROW = re.compile(r'^\s*(-?\d+(?:\.\d*)?)\s*\|\s*(-?\d+(?:\.\d*)?)\s*$')
+_LATEST_DISTANCE = re.compile(r'Latest distance:\s*(-?\d+(?:\.\d*)?)')
+_CURRENT_ANGLE = re.compile(r'Current angle:\s*(-?\d+(?:\.\d*)?)')
+_BATCH_PAIR = re.compile(r'^\s*(-?\d+(?:\.\d*)?)\s*:\s*(-?\d+(?:\.\d*)?)\s*$')
+
+def _number(text):
+    match = _NUMBER.match(text)
+    return float(match.group(1)) if match else None
+
+def _pairs(text):
+    '''
+    (angle, distance) pairs of a batch measurement message, or None for any other message
+    '''
+    matches = [_BATCH_PAIR.match(pair) for pair in text.split(";")]
+    if not all(matches):
+        return None
+    return [(float(match.group(1)), float(match.group(2))) for match in matches]
+
+def parse_observations(messages):
+    '''
+    (angle, distance) observations in visit order from a chat request, with the current position last.
+    Returns None when the request is not a distance update (initial prompt or a free-form question).
+    '''
+    user_messages = [message["content"] for message in messages if message["role"] == "user"]
+    if len(user_messages) < 2:
+        return None
+    last = user_messages[-1]
+
+    # Compacted context: one observation table sorted by angle, then the current angle and its distance
+    latest = _LATEST_DISTANCE.search(last)
+    if latest:
+        rows = [_TABLE_ROW.match(line) for line in last.splitlines()]
+        observations = [(float(row.group(1)), float(row.group(2))) for row in rows if row]
+        current = _CURRENT_ANGLE.search(last)
+        if current is None:
+            return observations
+        current = (float(current.group(1)), float(latest.group(1)))
+        return [observation for observation in observations if observation[0] != current[0]] + [current]
+
+    # Batch protocol: every user message after the prompt holds its own angle: distance pairs
+    if _pairs(last) is not None:
+        return [pair for content in user_messages[1:] for pair in (_pairs(content) or [])]
+
+    # Full history: distances from the user, angles from the assistant replies after the initial OK
+    if _number(last) is None:
+        return None
+    distances = [_number(content) for content in user_messages[1:]]
+    replies = [message["content"] for message in messages if message["role"] == "assistant"][1:]
+    angles = [INITIAL_ANGLE] + [_number(content) for content in replies]
+    return [(angle, distance) for angle, distance in zip(angles, distances)
+            if angle is not None and distance is not None]
+
+def _usage(messages, reply):
+    '''
+    Token estimate: 4 characters per token plus chat formatting per message
+    '''
+    prompt_tokens = sum(len(str(message["content"])) // 4 + 4 for message in messages)
+    completion_tokens = len(reply) // 4 + 1
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+class _ChatCompletionsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_POST(self):
+        if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown endpoint {self.path}", "type": "invalid_request_error"}})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+
+        # Failure injection
+        if server.failure_rate and server.rng.random() < server.failure_rate:
+            self._send_json(server.failure_status, {"error": {"message": "Injected failure", "type": "server_error"}})
+            return
+        if server.latency:
+            time.sleep(server.latency)
+
+        messages = request.get("messages", [])
+        reply = self.server.reply(messages, request.get("seed"))
+        model = request.get("model", "stand-in")
+        if request.get("stream"):
+            include_usage = bool((request.get("stream_options") or {}).get("include_usage"))
+            self._send_stream(model, reply, _usage(messages, reply) if include_usage else None)
+        else:
+            self._send_json(200, {
+                "id": f"chatcmpl-standin-{server.next_id()}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": reply}}],
+                "usage": _usage(messages, reply),
+            })
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_stream(self, model, reply, usage):
+        '''
+        Server-sent events: a role chunk, the reply in small pieces, a stop chunk and optional usage
+        '''
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        chunk_id = f"chatcmpl-standin-{self.server.next_id()}"
+        def event(choices, usage=None):
+            body = {"id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": model, "choices": choices}
+            if usage is not None:
+                body["usage"] = usage
+            self.wfile.write(f"data: {json.dumps(body)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        for start in range(0, len(reply), self.server.chunk_size):
+            if self.server.chunk_latency:
+                time.sleep(self.server.chunk_latency)
+            event([{"index": 0, "delta": {"content": reply[start:start + self.server.chunk_size]},
+                    "finish_reason": None}])
+        event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if usage is not None:
+            event([], usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+class StandInServer(ThreadingHTTPServer):
+    '''
+    Chat completions stand-in answering with a scripted search strategy
+    '''
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", DEFAULT_PORT), strategy="bisection", latency=0.0,
+                 chunk_latency=0.0, chunk_size=2, failure_rate=0.0, failure_status=500,
+                 nok=False, seed=0, verbose=False, **strategy_options):
+        super().__init__(address, _ChatCompletionsHandler)
+        self.strategy = make_strategy(strategy, seed=seed, **strategy_options)
+        self._strategy_name = strategy
+        self._strategy_options = strategy_options
+        self._seeded_strategies = {seed: self.strategy}
+        self.latency = latency
+        self.chunk_latency = chunk_latency
+        self.chunk_size = max(1, chunk_size)
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.nok = nok
+        self.verbose = verbose
+        self.rng = random.Random(seed)
+        self._request_id = 0
+        self._lock = threading.Lock()
+
+    # Getter for the base URL clients should use
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def next_id(self):
+        with self._lock:
+            self._request_id += 1
+            return self._request_id
+
+    def strategy_for(self, seed=None):
+        '''
+        Strategy for a request; a request seed selects its own seeded instance
+        '''
+        if seed is None:
+            return self.strategy
+        with self._lock:
+            if seed not in self._seeded_strategies:
+                self._seeded_strategies[seed] = make_strategy(
+                    self._strategy_name, seed=seed, **self._strategy_options)
+            return self._seeded_strategies[seed]
+
+    def reply(self, messages, seed=None):
+        '''
+        Protocol reply for a conversation
+        '''
+        user_messages = [message for message in messages if message["role"] == "user"]
+        if len(user_messages) <= 1:
+            return "NOK" if self.nok else "OK"
+        strategy = self.strategy_for(seed)
+        observations = parse_observations(messages)
+        if observations is None:
+            return f"Scripted {strategy.name} search; no further reasoning is available."
+        angle, finished = strategy.next_step(observations)
+        return f"FINISHED {angle:g}" if finished else f"{angle:g}"
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible local stand-in server.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on.")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="bisection",
+                        help="Scripted search strategy used to answer.")
+    parser.add_argument("--max-turns", type=int, default=40, help="Turns before the strategy must finish.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each response starts.")
+    parser.add_argument("--chunk-latency", type=float, default=0.0, help="Seconds between streamed chunks.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests answered with an error.")
+    parser.add_argument("--failure-status", type=int, default=500, help="HTTP status of injected failures (e.g. 429, 500).")
+    parser.add_argument("--nok", action="store_true", help="Answer the initial prompt with NOK.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for failure injection and random strategies.")
+    parser.add_argument("--verbose", action="store_true", help="Log every request.")
+    args = parser.parse_args()
+
+    server = StandInServer(
+        (args.host, args.port), strategy=args.strategy, latency=args.latency,
+        chunk_latency=args.chunk_latency, failure_rate=args.failure_rate,
+        failure_status=args.failure_status, nok=args.nok, seed=args.seed,
+        verbose=args.verbose, max_turns=args.max_turns)
+    print(f"Stand-in chat completions server ({args.strategy}) at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+bench_context.py
+Request size per agent turn with the full conversation history versus context compaction.
+Runs an OpenAIAgent against a stand-in client that answers with a fixed search pattern,
+so no API calls are made.  Tokens are estimated as 4 characters per token plus
+4 tokens of chat formatting per message.
+
+Usage:
+    python benchmarks/bench_context.py [--turns N]
+"""
+
+import sys
+import os
+import io
+import json
+import argparse
+import contextlib
+from types import SimpleNamespace
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "ai"))
+from agent_openai import OpenAIAgent
+
+class _Stand_In_Client:
+    '''
+    Minimal chat completions client recording the estimated tokens sent per request
+    '''
+    def __init__(self, turns):
+        self.request_tokens = []
+        # Coarse-to-fine search that keeps revisiting a 20 degree grid
+        self._replies = iter(["OK"] + [str(20 * (turn % 9) - 80) for turn in range(turns)])
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, messages, model):
+        self.request_tokens.append(sum(len(message["content"]) // 4 + 4 for message in messages))
+        message = SimpleNamespace(content=next(self._replies))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+def run_search(turns, compact_context):
+    '''
+    Estimated tokens sent for each update_angle request over a search of the given length
+    '''
+    with open(os.path.join(os.path.dirname(__file__), "..", "ai", "prompts.json")) as file:
+        prompt = json.load(file)["2"]
+    agent = OpenAIAgent(0, compact_context=compact_context)
+    agent._client = _Stand_In_Client(turns)
+    agent.initial_prompt = prompt
+    agent.initialize_agent()
+    for turn in range(turns):
+        agent.distance = 100.0 + turn
+        agent.update_angle()
+    return agent._client.request_tokens[1:]
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent request size benchmark.")
+    parser.add_argument("--turns", type=int, default=50, help="Number of agent turns.")
+    args = parser.parse_args()
+
+    # Silence the agent's per-turn console output
+    with contextlib.redirect_stdout(io.StringIO()):
+        full = run_search(args.turns, compact_context=False)
+        compact = run_search(args.turns, compact_context=True)
+    print(f"Estimated prompt tokens per request over {args.turns} turns")
+    print(f"{'turn':>6} {'full history':>14} {'compacted':>11}")
+    for turn in sorted({0, args.turns // 4, args.turns // 2, args.turns - 1}):
+        print(f"{turn + 1:>6} {full[turn]:>14} {compact[turn]:>11}")
+    print(f"{'total':>6} {sum(full):>14} {sum(compact):>11}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+bench_ipc.py
+Per-turn IPC latency between the agent process and the real-time process.
+Compares the original 100 ms sleep-poll handshake with the event-driven handoff.
+
+Usage:
+    python benchmarks/bench_ipc.py [--turns N]
+"""
+
+import sys
+import os
+import time
+import argparse
+import statistics
+import multiprocessing
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "hardware"))
+from ipc_utils import recv_latest
+
+SLEEP_POLL_PERIOD = 0.1
+
+def _recv_sleep_poll(conn):
+    '''
+    Original handshake: sleep-poll until data arrives, then flush the pipe
+    '''
+    while not conn.poll():
+        time.sleep(SLEEP_POLL_PERIOD)
+    message = None
+    while conn.poll():
+        message = conn.recv()
+    return message
+
+def _hardware_loop(conn, turns, legacy):
+    '''
+    Stand-in for the real-time process: send a distance, wait for the next angle
+    '''
+    for _ in range(turns + 1):
+        if legacy:
+            time.sleep(SLEEP_POLL_PERIOD)
+        conn.send(10.0)
+        if legacy:
+            _recv_sleep_poll(conn)
+        else:
+            recv_latest(conn)
+
+def run_turns(turns, legacy):
+    '''
+    Time each agent turn: receive a distance and send back an angle
+    '''
+    parent_conn, child_conn = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_hardware_loop, args=(child_conn, turns, legacy))
+    process.start()
+
+    # Discard the initial distance so every timed turn is a full round trip
+    _recv_sleep_poll(parent_conn) if legacy else recv_latest(parent_conn)
+    latencies = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        parent_conn.send(0.0)
+        if legacy:
+            time.sleep(SLEEP_POLL_PERIOD)
+            _recv_sleep_poll(parent_conn)
+        else:
+            recv_latest(parent_conn)
+        latencies.append(time.perf_counter() - start)
+
+    parent_conn.send(0.0)
+    process.join()
+    return latencies
+
+def report(label, latencies):
+    '''
+    Print latency summary in milliseconds
+    '''
+    ms = [1e3 * value for value in latencies]
+    print(f"{label:>14}: mean {statistics.mean(ms):9.3f} ms   "
+          f"median {statistics.median(ms):9.3f} ms   max {max(ms):9.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-turn IPC latency benchmark.")
+    parser.add_argument("--turns", type=int, default=20, help="Number of agent turns to time.")
+    args = parser.parse_args()
+
+    print(f"Per-turn IPC round trip over {args.turns} turns")
+    report("sleep-poll", run_turns(args.turns, legacy=True))
+    report("event-driven", run_turns(args.turns, legacy=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+bench_poll_sensor.py
+Per-call Python overhead of reading the VL53L1 sensor through ctypes.
+Builds a stub driver library (stub_vl53l1x.c) so no sensor is needed, then compares
+ - legacy: per-call attribute lookups, byref() wrappers and a new dict per reading
+ - poll_sensor: dictionary interface on top of the cached hot path
+ - read_sensor: cached function pointers and byref arguments filling a reused ToF_Reading
+
+Usage:
+    python benchmarks/bench_poll_sensor.py [--calls N] [--cc gcc]
+"""
+
+import sys
+import os
+import time
+import ctypes
+import argparse
+import tempfile
+import subprocess
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "hardware"))
+from VL53L1_wrapper import ToF_Sensor, ToF_Reading
+
+STUB_SOURCE = os.path.join(os.path.dirname(__file__), "stub_vl53l1x.c")
+
+class _Ready:
+    '''
+    Data-ready waiter that never blocks, so only the driver calls are timed
+    '''
+    def wait(self, timeout=5):
+        return True
+
+    def reset(self):
+        pass
+
+def build_stub(cc, out_dir):
+    '''
+    Compile the stub driver into a shared library
+    '''
+    library_path = os.path.join(out_dir, "libvl53l1x_stub.so")
+    subprocess.run([cc, "-O2", "-shared", "-fPIC", "-o", library_path, STUB_SOURCE], check=True)
+    return library_path
+
+def legacy_poll(tof):
+    '''
+    Original polling sequence: library attribute lookups and byref() wrappers on every call
+    '''
+    tof._lib.VL53L1X_CheckForDataReady(tof._dev, ctypes.byref(tof._dataReady))
+    tof._lib.VL53L1X_GetResult(tof._dev, ctypes.byref(tof._vl53l1x_result_t))
+    tof._lib.VL53L1X_ClearInterrupt(tof._dev)
+    return {
+        "Status": tof._vl53l1x_result_t.Status,
+        "Distance": tof._vl53l1x_result_t.Distance,
+        "Ambient": tof._vl53l1x_result_t.Ambient,
+        "SigPerSPAD": tof._vl53l1x_result_t.SigPerSPAD,
+        "NumSPADs": tof._vl53l1x_result_t.NumSPADs,
+    }
+
+def time_calls(label, function, calls):
+    '''
+    Print mean time per call in microseconds
+    '''
+    function()
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    elapsed = time.perf_counter() - start
+    print(f"{label:>12}: {1e6 * elapsed / calls:8.3f} us per reading")
+
+def main():
+    parser = argparse.ArgumentParser(description="VL53L1 polling overhead benchmark.")
+    parser.add_argument("--calls", type=int, default=200000, help="Number of readings to time.")
+    parser.add_argument("--cc", default="gcc", help="C compiler used to build the stub driver.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        tof = ToF_Sensor(library_path=build_stub(args.cc, out_dir), data_ready=_Ready())
+        reading = ToF_Reading()
+
+        print(f"Sensor polling overhead over {args.calls} readings (stub driver)")
+        time_calls("legacy", lambda: legacy_poll(tof), args.calls)
+        time_calls("poll_sensor", tof.poll_sensor, args.calls)
+        time_calls("read_sensor", lambda: tof.read_sensor(reading), args.calls)
+
+if __name__ == "__main__":
+    main()
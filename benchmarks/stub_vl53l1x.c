@@ -0,0 +1,98 @@
+/*
+ * stub_vl53l1x.c
+ * Hardware-free stand-in for the VL53L1X ultra lite driver (libvl53l1x.so).
+ * Exports every symbol bound by VL53L1_wrapper.ToF_Sensor so the Python
+ * calling overhead can be measured without a sensor on the I2C bus.
+ *
+ * Build:
+ *     gcc -O2 -shared -fPIC -o libvl53l1x_stub.so stub_vl53l1x.c
+ */
+
+#include <stdint.h>
+
+typedef struct {
+    uint8_t major;
+    uint8_t minor;
+    uint8_t build;
+    uint32_t revision;
+} VL53L1X_Version_t;
+
+typedef struct {
+    uint8_t Status;
+    uint16_t Distance;
+    uint16_t Ambient;
+    uint16_t SigPerSPAD;
+    uint16_t NumSPADs;
+} VL53L1X_Result_t;
+
+static uint16_t measurement;
+static uint16_t timing_budget = 100;
+static uint16_t inter_measurement = 100;
+static uint16_t distance_mode = 2;
+static uint16_t signal_threshold = 1024;
+static uint16_t sigma_threshold = 15;
+static uint16_t roi_x = 16;
+static uint16_t roi_y = 16;
+
+int8_t VL53L1X_GetSWVersion(VL53L1X_Version_t *version)
+{
+    version->major = 3;
+    version->minor = 5;
+    version->build = 1;
+    version->revision = 0;
+    return 0;
+}
+
+int8_t VL53L1X_UltraLite_Linux_I2C_Init(uint16_t dev, int bus, uint8_t addr) { return 0; }
+int8_t VL53L1X_SensorInit(uint16_t dev) { return 0; }
+int8_t VL53L1X_StartRanging(uint16_t dev) { return 0; }
+int8_t VL53L1X_StopRanging(uint16_t dev) { return 0; }
+int8_t VL53L1X_ClearInterrupt(uint16_t dev) { return 0; }
+
+int8_t VL53L1X_CheckForDataReady(uint16_t dev, uint8_t *ready)
+{
+    *ready = 1;
+    return 0;
+}
+
+int8_t VL53L1X_GetInterruptPolarity(uint16_t dev, uint8_t *polarity)
+{
+    *polarity = 1;
+    return 0;
+}
+
+int8_t VL53L1X_GetResult(uint16_t dev, VL53L1X_Result_t *result)
+{
+    measurement++;
+    result->Status = 0;
+    result->Distance = 1000 + (measurement & 0x0F);
+    result->Ambient = 12;
+    result->SigPerSPAD = 2048;
+    result->NumSPADs = 40;
+    return 0;
+}
+
+int8_t VL53L1X_SetROI(uint16_t dev, uint16_t x, uint16_t y)
+{
+    roi_x = x;
+    roi_y = y;
+    return 0;
+}
+
+int8_t VL53L1X_GetROI_XY(uint16_t dev, uint16_t *x, uint16_t *y)
+{
+    *x = roi_x;
+    *y = roi_y;
+    return 0;
+}
+
+int8_t VL53L1X_SetTimingBudgetInMs(uint16_t dev, uint16_t value) { timing_budget = value; return 0; }
+int8_t VL53L1X_GetTimingBudgetInMs(uint16_t dev, uint16_t *value) { *value = timing_budget; return 0; }
+int8_t VL53L1X_SetInterMeasurementInMs(uint16_t dev, uint32_t value) { inter_measurement = value; return 0; }
+int8_t VL53L1X_GetInterMeasurementInMs(uint16_t dev, uint16_t *value) { *value = inter_measurement; return 0; }
+int8_t VL53L1X_SetDistanceMode(uint16_t dev, uint16_t value) { distance_mode = value; return 0; }
+int8_t VL53L1X_GetDistanceMode(uint16_t dev, uint16_t *value) { *value = distance_mode; return 0; }
+int8_t VL53L1X_SetSignalThreshold(uint16_t dev, uint16_t value) { signal_threshold = value; return 0; }
+int8_t VL53L1X_GetSignalThreshold(uint16_t dev, uint16_t *value) { *value = signal_threshold; return 0; }
+int8_t VL53L1X_SetSigmaThreshold(uint16_t dev, uint16_t value) { sigma_threshold = value; return 0; }
+int8_t VL53L1X_GetSigmaThreshold(uint16_t dev, uint16_t *value) { *value = sigma_threshold; return 0; }
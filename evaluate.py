@@ -0,0 +1,246 @@
+"""
+evaluate.py
+Evaluation harness: runs a matrix of prompts x scenes x agents x seeds in simulation mode
+across a process pool and writes one row per episode to a results table.
+
+Each episode runs the agent loop in-process against the scene's distance lookup table,
+the same measurements the simulation process serves, so episodes need no real-time
+subprocess and parallelize across all cores.
+
+Usage:
+    python evaluate.py -a openAI --base-url http://127.0.0.1:8000/v1 -p 2 3 -g line two_obstacles \
+        --seeds 0 1 2 --workers 8 -o results.csv
+"""
+
+import sys
+import os
+import io
+import csv
+import json
+import time
+import argparse
+import itertools
+import contextlib
+import statistics
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "hardware"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "ai"))
+from agent_factory import AGENTS, create_agent
+from agent_openai import DEFAULT_MODEL
+from response_cache import ResponseCache, CACHE_MODES
+from scene_geometry import BUILTIN_SCENES, Scene_Lookup_Table, load_scene
+from scan_planner import sweep_angles
+
+PROMPTS_PATH = os.path.join(os.path.dirname(__file__), "ai", "prompts.json")
+TARGET_ANGLE_IC = 0
+DEFAULT_MAX_TURNS = 60
+
+RESULT_FIELDS = [
+    "prompt", "scene", "agent", "seed", "status", "turns", "converged",
+    "final_angle", "final_distance", "true_angle", "true_distance", "angle_error", "distance_error",
+    "prompt_tokens", "completion_tokens", "cached_requests", "wall_time", "error",
+]
+
+# Per-worker lookup tables, built once per scene
+_LOOKUP_TABLES = {}
+
+def load_prompts():
+    '''
+    Numbered prompts from ai/prompts.json (comment entries are skipped)
+    '''
+    with open(PROMPTS_PATH, "r") as file:
+        prompts = json.load(file)
+    return {key: value for key, value in prompts.items() if key.isdigit()}
+
+def scene_lookup_table(scene_name, lut_cache_dir=None):
+    if scene_name not in _LOOKUP_TABLES:
+        _LOOKUP_TABLES[scene_name] = Scene_Lookup_Table(load_scene(scene_name), cache_dir=lut_cache_dir)
+    return _LOOKUP_TABLES[scene_name]
+
+def ground_truth(lut, tolerance=0.1):
+    '''
+    Shortest distance in the scene and the motor step angles within tolerance of it
+    (the simulated measurement resolution), so flat minima count every angle they span
+    '''
+    table = lut.table
+    shortest = float(table.min())
+    return shortest, [float(angle) for angle in lut.angles[table <= shortest + tolerance]]
+
+def run_episode(episode):
+    '''
+    Run one agent search against a simulated scene and score it against ground truth
+    '''
+    result = {field: None for field in RESULT_FIELDS}
+    result.update({key: episode[key] for key in ("prompt", "scene", "agent", "seed")})
+    start = time.perf_counter()
+    agent = None
+    try:
+        lut = scene_lookup_table(episode["scene"], episode.get("lut_cache_dir"))
+        true_distance, true_angles = ground_truth(lut)
+        result["true_distance"] = true_distance
+        result["true_angle"] = min(true_angles, key=abs)
+
+        agent = create_agent(episode["agent"], TARGET_ANGLE_IC, **episode["agent_options"])
+        if episode.get("cache") is not None:
+            agent.response_cache = ResponseCache(episode["cache"], mode=episode["cache_mode"])
+        agent.initial_prompt = episode["prompt_text"]
+
+        # Agents print every exchange; keep worker output quiet
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent.connect_agent()
+            agent.initialize_agent()
+            if agent.comprehension != "ok":
+                result["status"] = "not_understood"
+                return result
+
+            # Same turn structure as project.main(), with the lookup table as the hardware
+            distance = round(lut.lookup(TARGET_ANGLE_IC), 1)
+            measurements = [(TARGET_ANGLE_IC, distance)]
+            turns = 0
+            swept = False
+            while turns < episode["max_turns"] and not agent.complete_state:
+                if episode.get("batch") or swept:
+                    agent.measurements = measurements
+                else:
+                    agent.distance = distance
+                agent.angle_dispatched = False
+                agent.update_angle()
+                turns += 1
+                distance = round(lut.lookup(agent.angle), 1)
+                swept = agent.sweep_request is not None and not agent.complete_state
+                if swept:
+                    sweep_start, sweep_stop, every_n = agent.sweep_request
+                    angles = sweep_angles(sweep_start, sweep_stop, every_n=every_n)
+                    measurements = list(zip(angles, lut.lookup_many(angles).round(1)))
+                elif episode.get("batch") and not agent.complete_state:
+                    angles = agent.target_angles or [agent.angle]
+                    measurements = list(zip(angles, lut.lookup_many(angles).round(1)))
+
+        result["status"] = "ok"
+        result["turns"] = turns
+        result["converged"] = bool(agent.complete_state)
+        result["final_angle"] = agent.angle
+        result["final_distance"] = distance
+        result["angle_error"] = min(abs(agent.angle - angle) for angle in true_angles)
+        result["distance_error"] = distance - true_distance
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if agent is not None:
+            history = agent.token_history
+            result["prompt_tokens"] = sum(usage["prompt_tokens"] or 0 for usage in history)
+            result["completion_tokens"] = sum(usage["completion_tokens"] or 0 for usage in history)
+            result["cached_requests"] = sum(1 for usage in history if usage.get("cached"))
+            agent.close()
+            if agent.response_cache is not None:
+                agent.response_cache.close()
+        result["wall_time"] = round(time.perf_counter() - start, 4)
+    return result
+
+def build_episodes(args, prompts):
+    '''
+    Episode descriptions for every prompt x scene x agent x seed combination
+    '''
+    episodes = []
+    for prompt, scene, agent, seed in itertools.product(args.prompts, args.geometry, args.agents, args.seeds):
+        episodes.append({
+            "prompt": prompt,
+            "prompt_text": prompts[prompt],
+            "scene": scene,
+            "agent": agent,
+            "seed": seed,
+            "agent_options": {
+                "model": args.model,
+                "base_url": args.base_url,
+                "compact_context": args.compact_context,
+                "seed": seed,
+                "batch_mode": args.batch,
+            },
+            "batch": args.batch,
+            "cache": args.cache,
+            "cache_mode": args.cache_mode,
+            "lut_cache_dir": args.lut_cache,
+            "max_turns": args.max_turns,
+        })
+    return episodes
+
+def write_results(results, path):
+    '''
+    Write episode rows as CSV, or Parquet for a .parquet path (requires pandas and pyarrow)
+    '''
+    if path.endswith(".parquet"):
+        try:
+            import pandas
+        except ImportError:
+            raise RuntimeError("Parquet output requires pandas and pyarrow; use a .csv path instead")
+        pandas.DataFrame(results, columns=RESULT_FIELDS).to_parquet(path, index=False)
+        return
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+def summarize(results):
+    '''
+    Print convergence, error and cost per prompt, scene and agent
+    '''
+    print(f"{'prompt':>6} {'scene':>14} {'agent':>14} {'runs':>5} {'conv':>5} "
+          f"{'turns':>6} {'angle err':>9} {'dist err':>9} {'tokens':>8}")
+    key = lambda result: (result["prompt"], result["scene"], result["agent"])
+    for (prompt, scene, agent), group in itertools.groupby(sorted(results, key=key), key=key):
+        group = list(group)
+        scored = [result for result in group if result["status"] == "ok"]
+        mean = lambda field: statistics.mean(result[field] for result in scored) if scored else float("nan")
+        converged = sum(1 for result in scored if result["converged"])
+        tokens = statistics.mean((result["prompt_tokens"] or 0) + (result["completion_tokens"] or 0)
+                                 for result in group)
+        print(f"{prompt:>6} {scene:>14} {agent:>14} {len(group):>5} {converged:>5} "
+              f"{mean('turns'):>6.1f} {mean('angle_error'):>9.1f} {mean('distance_error'):>9.1f} {tokens:>8.0f}")
+
+def parse_arguments(prompts):
+    parser = argparse.ArgumentParser(description="Parallel prompt x scene evaluation in simulation mode.")
+    parser.add_argument("-p", "--prompts", nargs="+", choices=sorted(prompts, key=int), default=sorted(prompts, key=int),
+                        help="Prompts from ai/prompts.json (default: all).")
+    parser.add_argument("-g", "--geometry", nargs="+", choices=sorted(BUILTIN_SCENES), default=sorted(BUILTIN_SCENES),
+                        help="Simulation scenes (default: all).")
+    parser.add_argument("-a", "--agents", nargs="+", choices=sorted(AGENTS), default=["openAI"],
+                        help="Agents to evaluate.")
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0], help="Seeds; one episode per seed.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Worker processes (default: one per core; more helps when agents wait on the network).")
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS, help="Turns before an episode is cut off.")
+    parser.add_argument("--model", type=str, default=DEFAULT_MODEL, help="Chat completions model name.")
+    parser.add_argument("--base-url", type=str, default=None, help="OpenAI-compatible API base URL.")
+    parser.add_argument("--compact-context", action="store_true", help="Use context compaction.")
+    parser.add_argument("--batch", action="store_true", help="Use the multi-angle batch protocol (with prompt 7).")
+    parser.add_argument("--cache", type=str, default=None, help="SQLite response cache shared by all workers.")
+    parser.add_argument("--cache-mode", type=str, choices=CACHE_MODES, default="read-through", help="Response cache mode.")
+    parser.add_argument("--lut-cache", type=str, default=None, help="Directory to cache scene lookup tables.")
+    parser.add_argument("-o", "--output", type=str, default="results.csv", help="Results table (.csv or .parquet).")
+    return parser.parse_args()
+
+def main():
+    prompts = load_prompts()
+    args = parse_arguments(prompts)
+    episodes = build_episodes(args, prompts)
+    print(f"Running {len(episodes)} episodes on {args.workers} workers...")
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(run_episode, episode) for episode in episodes]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"  prompt {result['prompt']} {result['scene']} {result['agent']} seed {result['seed']}: "
+                  f"{result['status']}, {result['turns']} turns, angle error {result['angle_error']}")
+
+    results.sort(key=lambda result: (result["prompt"], result["scene"], result["agent"], result["seed"]))
+    write_results(results, args.output)
+    summarize(results)
+    print(f"{len(results)} episodes in {time.perf_counter() - start:.1f} s; results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,60 @@ Python wrapper for linux system driver for the ST VL53L1 Time of Flight (TOF) se
 """
 
 import ctypes
+import math
 import time
 import os
 import sys
+import numpy as np
 from smbus2 import SMBus, i2c_msg
+import tracing
+from data_ready import GPIO_Data_Ready, Polling_Data_Ready, Libgpiod_Line, DEFAULT_GPIO_CHIP
 
 DEFAULT_I2C_ADDR = 0x29
 DEFAULT_I2C_BUS = 1
 
+# Batched acquisition
+RANGE_STATUS_VALID = 0
+CONFIDENCE_Z = 1.96
+DEFAULT_SAMPLE_CAPACITY = 64
+
+# Ranging configuration
+DISTANCE_MODES = {"short": 1, "long": 2}
+TIMING_BUDGETS_MS = (15, 20, 33, 50, 100, 200, 500)
+RANGING_PROFILES = {
+    "fast": {"distance_mode": "short", "timing_budget_ms": 20, "inter_measurement_ms": 20},
+    "default": {"distance_mode": "long", "timing_budget_ms": 100, "inter_measurement_ms": 100},
+    "accurate": {"distance_mode": "long", "timing_budget_ms": 200, "inter_measurement_ms": 200},
+}
+
+class ToF_Reading:
+    '''
+    Sensor reading record; reused between reads to keep the polling hot path allocation free
+    '''
+    __slots__ = ("status", "distance", "ambient", "sig_per_spad", "num_spads")
+
+    def __init__(self):
+        self.status = 0
+        self.distance = 0
+        self.ambient = 0
+        self.sig_per_spad = 0
+        self.num_spads = 0
+
+    def as_dict(self):
+        '''
+        Reading in the poll_sensor() dictionary format
+        '''
+        return {
+            "Status": self.status,
+            "Distance": self.distance,
+            "Ambient": self.ambient,
+            "SigPerSPAD": self.sig_per_spad,
+            "NumSPADs": self.num_spads,
+        }
+
 class ToF_Sensor:
-    def __init__(self, library_path=None, i2c_bus = DEFAULT_I2C_BUS, i2c_addr = DEFAULT_I2C_ADDR):
+    def __init__(self, library_path=None, i2c_bus = DEFAULT_I2C_BUS, i2c_addr = DEFAULT_I2C_ADDR,
+                 data_ready_pin = None, gpio_chip = DEFAULT_GPIO_CHIP, data_ready = None):
         if library_path is None:
             library_path = os.path.join(
             os.path.dirname(__file__), "../libraries/VL53L1X/STSW-IMG013/user_lib/libvl53l1x.so")
@@ -26,6 +70,18 @@ class ToF_Sensor:
         self._status = int()
         self._ROI_x = ctypes.c_uint16()
         self._ROI_y = ctypes.c_uint16()
+        self._timing_budget = ctypes.c_uint16()
+        self._inter_measurement = ctypes.c_uint16()
+        self._distance_mode = ctypes.c_uint16()
+        self._signal_threshold = ctypes.c_uint16()
+        self._sigma_threshold = ctypes.c_uint16()
+        self._ranging = False
+        self._sample_distances = np.empty(DEFAULT_SAMPLE_CAPACITY, dtype=np.float64)
+        self._sample_status = np.empty(DEFAULT_SAMPLE_CAPACITY, dtype=np.uint8)
+        self._interrupt_polarity = ctypes.c_uint8(1)
+        self._data_ready_pin = data_ready_pin
+        self._gpio_chip = gpio_chip
+        self._data_ready = data_ready
 
         # Software version storage information
         class _vl53l1x_version_t(ctypes.Structure):
@@ -48,12 +104,15 @@ class ToF_Sensor:
 
         self._vl53l1x_version_t = _vl53l1x_version_t()
         self._vl53l1x_result_t = _vl53l1x_result_t()
+        self._reading = ToF_Reading()
 
         # Initialize the sensor and start communication upon instantiation
         self._bind_functions()
         if not self._probe_i2c_sensor():
             self._initialize_i2c()
             self._initialize_sensor()
+        if self._data_ready is None:
+            self._data_ready = self._create_data_ready()
 
     def _bind_functions(self):
         '''
@@ -87,9 +146,54 @@ class ToF_Sensor:
         self._lib.VL53L1X_ClearInterrupt.argtypes = [ctypes.c_uint16]
         self._lib.VL53L1X_ClearInterrupt.restype = ctypes.c_int8
 
+        # Interrupt polarity of the GPIO1 data-ready line (1 = active high)
+        self._lib.VL53L1X_GetInterruptPolarity.argtypes = [ctypes.c_uint16, ctypes.POINTER(ctypes.c_uint8)]
+        self._lib.VL53L1X_GetInterruptPolarity.restype = ctypes.c_int8
+
         # Configure the sensor field of view (aka region of interest)
         self._lib.VL53L1X_SetROI.argtypes = [ctypes.c_uint16, ctypes.c_uint16, ctypes.c_uint16]
         self._lib.VL53L1X_SetROI.restype = ctypes.c_int8
+        self._lib.VL53L1X_GetROI_XY.argtypes = [ctypes.c_uint16, ctypes.POINTER(ctypes.c_uint16), ctypes.POINTER(ctypes.c_uint16)]
+        self._lib.VL53L1X_GetROI_XY.restype = ctypes.c_int8
+
+        # Stop the sensor ranging function
+        self._lib.VL53L1X_StopRanging.argtypes = [ctypes.c_uint16]
+        self._lib.VL53L1X_StopRanging.restype = ctypes.c_int8
+
+        # Ranging duration of a single measurement
+        self._lib.VL53L1X_SetTimingBudgetInMs.argtypes = [ctypes.c_uint16, ctypes.c_uint16]
+        self._lib.VL53L1X_SetTimingBudgetInMs.restype = ctypes.c_int8
+        self._lib.VL53L1X_GetTimingBudgetInMs.argtypes = [ctypes.c_uint16, ctypes.POINTER(ctypes.c_uint16)]
+        self._lib.VL53L1X_GetTimingBudgetInMs.restype = ctypes.c_int8
+
+        # Period between measurements in continuous ranging
+        self._lib.VL53L1X_SetInterMeasurementInMs.argtypes = [ctypes.c_uint16, ctypes.c_uint32]
+        self._lib.VL53L1X_SetInterMeasurementInMs.restype = ctypes.c_int8
+        self._lib.VL53L1X_GetInterMeasurementInMs.argtypes = [ctypes.c_uint16, ctypes.POINTER(ctypes.c_uint16)]
+        self._lib.VL53L1X_GetInterMeasurementInMs.restype = ctypes.c_int8
+
+        # Distance mode (1 = short, 2 = long)
+        self._lib.VL53L1X_SetDistanceMode.argtypes = [ctypes.c_uint16, ctypes.c_uint16]
+        self._lib.VL53L1X_SetDistanceMode.restype = ctypes.c_int8
+        self._lib.VL53L1X_GetDistanceMode.argtypes = [ctypes.c_uint16, ctypes.POINTER(ctypes.c_uint16)]
+        self._lib.VL53L1X_GetDistanceMode.restype = ctypes.c_int8
+
+        # Minimum return signal (kcps) and maximum sigma (mm) for a valid range
+        self._lib.VL53L1X_SetSignalThreshold.argtypes = [ctypes.c_uint16, ctypes.c_uint16]
+        self._lib.VL53L1X_SetSignalThreshold.restype = ctypes.c_int8
+        self._lib.VL53L1X_GetSignalThreshold.argtypes = [ctypes.c_uint16, ctypes.POINTER(ctypes.c_uint16)]
+        self._lib.VL53L1X_GetSignalThreshold.restype = ctypes.c_int8
+        self._lib.VL53L1X_SetSigmaThreshold.argtypes = [ctypes.c_uint16, ctypes.c_uint16]
+        self._lib.VL53L1X_SetSigmaThreshold.restype = ctypes.c_int8
+        self._lib.VL53L1X_GetSigmaThreshold.argtypes = [ctypes.c_uint16, ctypes.POINTER(ctypes.c_uint16)]
+        self._lib.VL53L1X_GetSigmaThreshold.restype = ctypes.c_int8
+
+        # Cache hot path function pointers and by-reference arguments
+        self._fn_check_for_data_ready = self._lib.VL53L1X_CheckForDataReady
+        self._fn_get_result = self._lib.VL53L1X_GetResult
+        self._fn_clear_interrupt = self._lib.VL53L1X_ClearInterrupt
+        self._data_ready_ref = ctypes.byref(self._dataReady)
+        self._result_ref = ctypes.byref(self._vl53l1x_result_t)
 
     def get_software_version(self):
         '''
@@ -145,28 +249,46 @@ class ToF_Sensor:
         '''
         self._status = self._lib.VL53L1X_StartRanging(self._dev)
         if self._status == 0:
+            self._ranging = True
             print("Ranging Initialized....")
         else:
             raise RuntimeError(f"Ranging initialization failed with status: {self._status}")
         
+    def _create_data_ready(self):
+        '''
+        Select the data-ready wait: GPIO1 edge events when a pin is configured, adaptive polling otherwise
+        '''
+        if self._data_ready_pin is not None:
+            try:
+                self._lib.VL53L1X_GetInterruptPolarity(self._dev, ctypes.byref(self._interrupt_polarity))
+                line = Libgpiod_Line(chip = self._gpio_chip, pin = self._data_ready_pin,
+                                     active_high = bool(self._interrupt_polarity.value))
+                print("Data ready interrupt line configured....")
+                return GPIO_Data_Ready(line)
+            except (RuntimeError, OSError) as e:
+                print(f"Data ready interrupt unavailable, falling back to polling: {e}")
+        return Polling_Data_Ready(self._read_data_ready)
+
+    def _read_data_ready(self):
+        '''
+        Read the data-ready register once
+        '''
+        self._status = self._fn_check_for_data_ready(self._dev, self._data_ready_ref)
+        return self._dataReady.value != 0
+
     def _check_for_data(self, timeout=5):
         '''
-        Checks device register if new data is ready to be retrieved
+        Waits until new data is ready to be retrieved
         '''
-        self._dataReady = ctypes.c_uint8(0)
-        start_time = time.time()
-        while(self._dataReady == ctypes.c_uint8(0)):
-            self._status = self._lib.VL53L1X_CheckForDataReady(self._dev, ctypes.byref(self._dataReady))
-            if time.time() - start_time > timeout:
-                raise TimeoutError("Timeout waiting for VL53L1 sensor polling")
-            time.sleep(0.1)
+        if not self._data_ready.wait(timeout):
+            raise TimeoutError("Timeout waiting for VL53L1 sensor polling")
         return self._status
 
     def _get_new_data(self):
         '''
         Extracts distance releated data from the sensor
         '''
-        self._status = self._lib.VL53L1X_GetResult(self._dev, ctypes.byref(self._vl53l1x_result_t))
+        self._status = self._fn_get_result(self._dev, self._result_ref)
         if self._status == 0:
             return None
         else:
@@ -176,7 +298,7 @@ class ToF_Sensor:
         '''
         Trigger sensor to ready for new data measurements
         '''
-        self._status = self._lib.VL53L1X_ClearInterrupt(self._dev)
+        self._status = self._fn_clear_interrupt(self._dev)
         if self._status == 0:
             return None
         else:
@@ -186,15 +308,86 @@ class ToF_Sensor:
         '''
         Poll readings from sensor and store updated measurements
         '''
-        self._check_for_data()
-        self._get_new_data()
-        self._trigger_interrupt()
+        return self.read_sensor().as_dict()
 
+    def read_sensor(self, out=None, timeout=5):
+        '''
+        Low-overhead poll: waits for data, reads it into the bound result struct and clears the interrupt.
+        Fills the caller's ToF_Reading, or a reading owned by the sensor that is overwritten on the next call.
+        '''
+        with tracing.span("tof.read_sensor"):
+            return self._read_sensor(out, timeout)
+
+    def _read_sensor(self, out, timeout):
+        if not self._data_ready.wait(timeout):
+            raise TimeoutError("Timeout waiting for VL53L1 sensor polling")
+        self._status = self._fn_get_result(self._dev, self._result_ref)
+        if self._status != 0:
+            raise RuntimeError(f"Data retrieval failed with status: {self._status}")
+        self._status = self._fn_clear_interrupt(self._dev)
+        if self._status != 0:
+            raise RuntimeError(f"Sensor trigger failed with status: {self._status}")
+        return self.last_reading(out)
+
+    def last_reading(self, out=None):
+        '''
+        Fields of the most recent reading held in the bound result struct
+        '''
+        result = self._vl53l1x_result_t
+        reading = self._reading if out is None else out
+        reading.status = result.Status
+        reading.distance = result.Distance
+        reading.ambient = result.Ambient
+        reading.sig_per_spad = result.SigPerSPAD
+        reading.num_spads = result.NumSPADs
+        return reading
+
+    def acquire(self, n, target_precision=None, min_samples=3):
+        '''
+        Collect up to n readings into a preallocated buffer and summarize them.
+        With a target precision (same units as distance), stops early once the 95% confidence
+        interval half-width of the mean of valid readings is within it.
+        Statistics use valid readings (range status 0) when there are any.
+        '''
+        if n < 1:
+            raise ValueError("Sample count must be at least 1")
+        if n > len(self._sample_distances):
+            self._sample_distances = np.empty(n, dtype=np.float64)
+            self._sample_status = np.empty(n, dtype=np.uint8)
+
+        # Running mean and variance of valid readings (Welford)
+        valid, mean, m2 = 0, 0.0, 0.0
+        count = 0
+        while count < n:
+            self._check_for_data()
+            self._get_new_data()
+            self._trigger_interrupt()
+            distance = self._vl53l1x_result_t.Distance
+            status = self._vl53l1x_result_t.Status
+            self._sample_distances[count] = distance
+            self._sample_status[count] = status
+            count += 1
+
+            if status == RANGE_STATUS_VALID:
+                valid += 1
+                delta = distance - mean
+                mean += delta / valid
+                m2 += delta * (distance - mean)
+                if (target_precision is not None and valid >= max(min_samples, 2)
+                        and CONFIDENCE_Z * math.sqrt(m2 / (valid - 1) / valid) <= target_precision):
+                    break
+
+        distances = self._sample_distances[:count]
+        statuses = self._sample_status[:count]
+        values = distances[statuses == RANGE_STATUS_VALID] if valid else distances
+        codes, counts = np.unique(statuses, return_counts=True)
         return {
-            "Distance": self._vl53l1x_result_t.Distance,
-            "Ambient": self._vl53l1x_result_t.Ambient,
-            "SigPerSPAD": self._vl53l1x_result_t.SigPerSPAD,
-            "NumSPADs": self._vl53l1x_result_t.NumSPADs,
+            "median": float(np.median(values)),
+            "mean": float(values.mean()),
+            "std": float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+            "samples": count,
+            "valid": valid,
+            "status_counts": {int(code): int(total) for code, total in zip(codes, counts)},
         }
 
     def set_roi(self, x, y):
@@ -208,6 +401,165 @@ class ToF_Sensor:
             return None
         else:
             raise RuntimeError(f"Sensor ROI update failed with status: {self._status}")
+
+    def get_roi(self):
+        '''
+        Retrieve the sensor field of view
+        '''
+        self._status = self._lib.VL53L1X_GetROI_XY(self._dev, ctypes.byref(self._ROI_x), ctypes.byref(self._ROI_y))
+        if self._status == 0:
+            return self._ROI_x.value, self._ROI_y.value
+        else:
+            raise RuntimeError(f"Sensor ROI retrieval failed with status: {self._status}")
+
+    def stop_ranging(self):
+        '''
+        Stops the distance measurement function
+        '''
+        self._status = self._lib.VL53L1X_StopRanging(self._dev)
+        if self._status == 0:
+            self._ranging = False
+        else:
+            raise RuntimeError(f"Ranging stop failed with status: {self._status}")
+
+    def set_timing_budget(self, timing_budget_ms):
+        '''
+        Configure the duration of a single measurement (15 ms is short distance mode only)
+        '''
+        if timing_budget_ms not in TIMING_BUDGETS_MS:
+            raise ValueError(f"Timing budget must be one of {TIMING_BUDGETS_MS} ms")
+        self._status = self._lib.VL53L1X_SetTimingBudgetInMs(self._dev, ctypes.c_uint16(timing_budget_ms))
+        if self._status != 0:
+            raise RuntimeError(f"Sensor timing budget update failed with status: {self._status}")
+
+    def get_timing_budget(self):
+        '''
+        Retrieve the duration of a single measurement in ms
+        '''
+        self._status = self._lib.VL53L1X_GetTimingBudgetInMs(self._dev, ctypes.byref(self._timing_budget))
+        if self._status == 0:
+            return self._timing_budget.value
+        else:
+            raise RuntimeError(f"Sensor timing budget retrieval failed with status: {self._status}")
+
+    def set_inter_measurement(self, inter_measurement_ms):
+        '''
+        Configure the period between measurements; must be at least the timing budget
+        '''
+        self._status = self._lib.VL53L1X_SetInterMeasurementInMs(self._dev, ctypes.c_uint32(inter_measurement_ms))
+        if self._status != 0:
+            raise RuntimeError(f"Sensor inter-measurement update failed with status: {self._status}")
+
+    def get_inter_measurement(self):
+        '''
+        Retrieve the period between measurements in ms
+        '''
+        self._status = self._lib.VL53L1X_GetInterMeasurementInMs(self._dev, ctypes.byref(self._inter_measurement))
+        if self._status == 0:
+            return self._inter_measurement.value
+        else:
+            raise RuntimeError(f"Sensor inter-measurement retrieval failed with status: {self._status}")
+
+    def set_distance_mode(self, distance_mode):
+        '''
+        Configure short (up to ~1.3 m, better ambient immunity) or long (up to ~4 m) distance mode
+        '''
+        if distance_mode not in DISTANCE_MODES:
+            raise ValueError(f"Distance mode must be one of {sorted(DISTANCE_MODES)}")
+        self._status = self._lib.VL53L1X_SetDistanceMode(self._dev, ctypes.c_uint16(DISTANCE_MODES[distance_mode]))
+        if self._status != 0:
+            raise RuntimeError(f"Sensor distance mode update failed with status: {self._status}")
+
+    def get_distance_mode(self):
+        '''
+        Retrieve the distance mode ("short" or "long")
+        '''
+        self._status = self._lib.VL53L1X_GetDistanceMode(self._dev, ctypes.byref(self._distance_mode))
+        if self._status == 0:
+            modes = {value: name for name, value in DISTANCE_MODES.items()}
+            return modes.get(self._distance_mode.value, self._distance_mode.value)
+        else:
+            raise RuntimeError(f"Sensor distance mode retrieval failed with status: {self._status}")
+
+    def set_signal_threshold(self, signal_kcps):
+        '''
+        Configure the minimum return signal rate for a valid range
+        '''
+        self._status = self._lib.VL53L1X_SetSignalThreshold(self._dev, ctypes.c_uint16(signal_kcps))
+        if self._status != 0:
+            raise RuntimeError(f"Sensor signal threshold update failed with status: {self._status}")
+
+    def get_signal_threshold(self):
+        '''
+        Retrieve the minimum return signal rate in kcps
+        '''
+        self._status = self._lib.VL53L1X_GetSignalThreshold(self._dev, ctypes.byref(self._signal_threshold))
+        if self._status == 0:
+            return self._signal_threshold.value
+        else:
+            raise RuntimeError(f"Sensor signal threshold retrieval failed with status: {self._status}")
+
+    def set_sigma_threshold(self, sigma_mm):
+        '''
+        Configure the maximum ranging standard deviation for a valid range
+        '''
+        self._status = self._lib.VL53L1X_SetSigmaThreshold(self._dev, ctypes.c_uint16(sigma_mm))
+        if self._status != 0:
+            raise RuntimeError(f"Sensor sigma threshold update failed with status: {self._status}")
+
+    def get_sigma_threshold(self):
+        '''
+        Retrieve the maximum ranging standard deviation in mm
+        '''
+        self._status = self._lib.VL53L1X_GetSigmaThreshold(self._dev, ctypes.byref(self._sigma_threshold))
+        if self._status == 0:
+            return self._sigma_threshold.value
+        else:
+            raise RuntimeError(f"Sensor sigma threshold retrieval failed with status: {self._status}")
+
+    def set_ranging_profile(self, profile):
+        '''
+        Apply a ranging profile by name (see RANGING_PROFILES) or as a dict with any of:
+        distance_mode, timing_budget_ms, inter_measurement_ms, roi, signal_threshold, sigma_threshold.
+        Ranging is paused while the sensor is reconfigured.
+        '''
+        if isinstance(profile, str):
+            if profile not in RANGING_PROFILES:
+                raise ValueError(f"Unknown ranging profile: {profile}")
+            profile = RANGING_PROFILES[profile]
+
+        was_ranging = self._ranging
+        if was_ranging:
+            self.stop_ranging()
+        if "distance_mode" in profile:
+            self.set_distance_mode(profile["distance_mode"])
+        if "timing_budget_ms" in profile:
+            self.set_timing_budget(profile["timing_budget_ms"])
+        if "inter_measurement_ms" in profile:
+            self.set_inter_measurement(max(profile["inter_measurement_ms"], profile.get("timing_budget_ms", 0)))
+        if "roi" in profile:
+            self.set_roi(*profile["roi"])
+        if "signal_threshold" in profile:
+            self.set_signal_threshold(profile["signal_threshold"])
+        if "sigma_threshold" in profile:
+            self.set_sigma_threshold(profile["sigma_threshold"])
+
+        # The measurement period changed; the data-ready wait must relearn it
+        if hasattr(self._data_ready, "reset"):
+            self._data_ready.reset()
+        if was_ranging:
+            self.initialize_ranging()
+
+    def get_ranging_profile(self):
+        '''
+        Retrieve the active ranging configuration
+        '''
+        return {
+            "distance_mode": self.get_distance_mode(),
+            "timing_budget_ms": self.get_timing_budget(),
+            "inter_measurement_ms": self.get_inter_measurement(),
+            "roi": self.get_roi(),
+        }
     
 
 if __name__ == "__main__":
@@ -0,0 +1,188 @@
+"""
+Data-ready wait strategies for the ST VL53L1 Time of Flight (TOF) sensor
+
+ - GPIO_Data_Ready: blocks on edge events of the sensor GPIO1 interrupt line (libgpiod)
+ - Polling_Data_Ready: adaptive short-interval polling of the data-ready register
+ - Simulated_Data_Ready_Line: stand-in interrupt line for testing without hardware
+"""
+
+import time
+
+try:
+    import gpiod
+    from gpiod.line import Bias, Direction, Edge
+except ImportError:
+    gpiod = None
+
+DEFAULT_GPIO_CHIP = "/dev/gpiochip0"
+
+class Libgpiod_Line:
+    '''
+    libgpiod v2 backend for a single input line with edge detection
+    '''
+    def __init__(self, chip=DEFAULT_GPIO_CHIP, pin=0, active_high=True):
+        if gpiod is None:
+            raise RuntimeError("libgpiod python bindings (gpiod) are not installed")
+        self._pin = pin
+        self._active_high = active_high
+        settings = gpiod.LineSettings(
+            direction = Direction.INPUT,
+            edge_detection = Edge.RISING if active_high else Edge.FALLING,
+            bias = Bias.PULL_DOWN if active_high else Bias.PULL_UP,
+        )
+        self._request = gpiod.request_lines(chip, consumer="vl53l1x-data-ready", config={pin: settings})
+
+    def is_asserted(self):
+        '''
+        Current interrupt level; the sensor holds it asserted until the interrupt is cleared
+        '''
+        active = self._request.get_value(self._pin) == gpiod.line.Value.ACTIVE
+        return active == self._active_high
+
+    def wait_edge(self, timeout):
+        '''
+        Block until an edge event arrives or the timeout (seconds) expires
+        '''
+        return self._request.wait_edge_events(timeout)
+
+    def drain(self):
+        '''
+        Discard queued edge events
+        '''
+        while self._request.wait_edge_events(0):
+            self._request.read_edge_events()
+
+    def close(self):
+        self._request.release()
+
+class Simulated_Data_Ready_Line:
+    '''
+    Stand-in interrupt line for a sensor ranging continuously every period seconds.
+    The line asserts when a measurement completes and stays asserted until cleared.
+    '''
+    def __init__(self, period=0.1, clock=time.monotonic, sleep=time.sleep):
+        self._period = float(period)
+        self._clock = clock
+        self._sleep = sleep
+        self._ready_time = self._clock() + self._period
+
+    # Getter for the time the next (or current) measurement completes
+    @property
+    def ready_time(self):
+        return self._ready_time
+
+    def is_asserted(self):
+        return self._clock() >= self._ready_time
+
+    def wait_edge(self, timeout):
+        remaining = self._ready_time - self._clock()
+        if timeout is not None and remaining > timeout:
+            self._sleep(timeout)
+            return False
+        if remaining > 0:
+            self._sleep(remaining)
+        return True
+
+    def drain(self):
+        pass
+
+    def clear(self):
+        '''
+        Clear the interrupt; the next measurement completes one period after the last one
+        '''
+        self._ready_time = max(self._ready_time + self._period, self._clock())
+
+    def close(self):
+        pass
+
+class GPIO_Data_Ready:
+    '''
+    Interrupt-driven data-ready wait on the sensor GPIO1 line
+    '''
+    def __init__(self, line):
+        self._line = line
+
+    def wait(self, timeout=5):
+        '''
+        Block until the interrupt line asserts.  Returns False on timeout.
+        '''
+        deadline = time.monotonic() + timeout
+        while not self._line.is_asserted():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._line.wait_edge(remaining):
+                return False
+            # Consume the edge so the next wait blocks until a new one arrives
+            self._line.drain()
+        self._line.drain()
+        return True
+
+    def close(self):
+        self._line.close()
+
+class Polling_Data_Ready:
+    '''
+    Adaptive polling of the data-ready register.
+    Sleeps through most of the expected measurement period, then polls at a short
+    interval that backs off toward max_interval.
+    '''
+    def __init__(self, check_ready, min_interval=0.001, max_interval=0.01,
+                 early_fraction=0.8, clock=time.monotonic, sleep=time.sleep):
+        self._check_ready = check_ready
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._early_fraction = early_fraction
+        self._clock = clock
+        self._sleep = sleep
+        self._last_ready = None
+        self._period = None
+
+    # Getter for the learned measurement period (seconds)
+    @property
+    def period(self):
+        return self._period
+
+    def wait(self, timeout=5):
+        '''
+        Poll until data is ready.  Returns False on timeout.
+        '''
+        start = self._clock()
+        deadline = start + timeout
+
+        # Skip most of the expected measurement time without touching the bus
+        slept_early = False
+        if self._period is not None and self._last_ready is not None:
+            early_wake = self._last_ready + self._early_fraction * self._period
+            if start < early_wake:
+                self._sleep(min(early_wake, deadline) - start)
+                slept_early = True
+
+        interval = self._min_interval
+        polls = 0
+        while not self._check_ready():
+            polls += 1
+            now = self._clock()
+            if now >= deadline:
+                return False
+            self._sleep(min(interval, deadline - now))
+            interval = min(2 * interval, self._max_interval)
+
+        # Learn the measurement period; only waits that caught the data arriving measure it
+        now = self._clock()
+        if polls and self._last_ready is not None:
+            observed = now - self._last_ready
+            self._period = observed if self._period is None else 0.75 * self._period + 0.25 * observed
+        elif slept_early:
+            # Data was already waiting after the early sleep; the estimate is too long
+            self._period *= self._early_fraction
+        self._last_ready = now
+        return True
+
+    def reset(self):
+        '''
+        Forget the learned period, e.g. after the timing budget changes
+        '''
+        self._last_ready = None
+        self._period = None
+
+    def close(self):
+        pass
@@ -0,0 +1,89 @@
+"""
+Inter-process communication helpers shared by the agent and real-time processes
+Blocks on the pipe's file descriptor instead of sleep-polling
+"""
+
+from multiprocessing.connection import wait
+
+# Command messages; a bare number on the pipe is a move-and-measure target angle
+SWEEP_COMMAND = "sweep"
+MEASURE_COMMAND = "measure"
+BATCH_COMMAND = "batch"
+
+def wait_for_message(conn, timeout=None):
+    '''
+    Block until the connection has data to read.
+    Returns False if the timeout (seconds) expires first; None waits indefinitely.
+    '''
+    return bool(wait([conn], timeout))
+
+def recv_latest(conn, timeout=None):
+    '''
+    Block for the next message, then flush the pipe and return the most recent value (LIFO)
+    '''
+    if not wait_for_message(conn, timeout):
+        raise TimeoutError(f"Timeout waiting {timeout} s for IPC message")
+    message = conn.recv()
+    while conn.poll():
+        message = conn.recv()
+    return message
+
+def is_command(message, command):
+    '''
+    Check whether a pipe message is the given command
+    '''
+    return isinstance(message, dict) and message.get("command") == command
+
+def measure_command(angle, samples=None, target_precision=None):
+    '''
+    Move-and-measure message with a per-measurement sample count or target precision
+    '''
+    return {"command": MEASURE_COMMAND, "angle": angle, "samples": samples, "target_precision": target_precision}
+
+def sweep_command(start, stop, every_n=1, profile=None):
+    '''
+    Sweep message: range from start to stop at every Nth motor step, optionally with a ranging profile
+    '''
+    return {"command": SWEEP_COMMAND, "start": float(start), "stop": float(stop), "every_n": int(every_n),
+            "profile": profile}
+
+def sweep_reply(angles, distances):
+    '''
+    Reply to a sweep command: the swept angles and the distance profile
+    '''
+    return {"command": SWEEP_COMMAND, "angles": [float(angle) for angle in angles],
+            "distances": [float(distance) for distance in distances]}
+
+def request_sweep(conn, start, stop, every_n=1, timeout=None, profile=None):
+    '''
+    Ask the real-time process for a sweep profile; blocks until (angles, distances) arrive.
+    The optional ranging profile name overrides the hardware's sweep profile.
+    '''
+    conn.send(sweep_command(start, stop, every_n, profile))
+    reply = recv_latest(conn, timeout)
+    if not is_command(reply, SWEEP_COMMAND):
+        raise RuntimeError(f"Unexpected reply to sweep request: {reply}")
+    return reply["angles"], reply["distances"]
+
+def batch_command(angles):
+    '''
+    Measure-all message for a list of target angles
+    '''
+    return {"command": BATCH_COMMAND, "angles": [float(angle) for angle in angles]}
+
+def batch_reply(angles, distances):
+    '''
+    Reply to a batch command: one (angle, distance) pair per requested angle
+    '''
+    return {"command": BATCH_COMMAND,
+            "measurements": [(float(angle), float(distance)) for angle, distance in zip(angles, distances)]}
+
+def request_batch(conn, angles, timeout=None):
+    '''
+    Ask the real-time process to measure every angle; blocks until the (angle, distance) pairs arrive
+    '''
+    conn.send(batch_command(angles))
+    reply = recv_latest(conn, timeout)
+    if not is_command(reply, BATCH_COMMAND):
+        raise RuntimeError(f"Unexpected reply to batch request: {reply}")
+    return reply["measurements"]
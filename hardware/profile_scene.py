@@ -0,0 +1,126 @@
+"""
+Data-driven simulation from recorded scan profiles
+Builds the simulation's angle-to-distance table from real sensor readings instead of ray-cast geometry,
+so the simulated room includes the sensor's ROI cone, surface reflectance and noise.
+
+Profiles are session recordings (hardware/session_recorder.py) or CSV files with angle and distance
+columns.  Readings from every profile are pooled per motor step; the table holds the median at each
+measured step and interpolates linearly between them.  With noise enabled, each measurement adds a
+residual drawn from the readings recorded at the nearest step that was measured more than once.
+"""
+
+import os
+import numpy as np
+from scene_geometry import DEFAULT_STEP, DEFAULT_MIN_ANGLE, DEFAULT_MAX_ANGLE
+from session_recorder import load_session
+
+def load_profile(path):
+    '''
+    Angles and distances of one recorded profile; session readings with an error range status are dropped
+    '''
+    if os.path.splitext(path)[1].lower() == ".csv":
+        data = np.genfromtxt(path, delimiter=",", names=True)
+        if data.dtype.names is None or not {"angle", "distance"} <= set(data.dtype.names):
+            raise ValueError(f"{path} needs angle and distance columns")
+        data = np.atleast_1d(data)
+        return data["angle"].astype(np.float64), data["distance"].astype(np.float64)
+    session = load_session(path)
+    valid = session[session["status"] == 0]
+    return valid["angle"].astype(np.float64), valid["distance"].astype(np.float64)
+
+def load_profiles(paths):
+    '''
+    Pooled angles and distances of several recorded profiles
+    '''
+    profiles = [load_profile(path) for path in paths]
+    if not profiles:
+        raise ValueError("At least one recorded profile is required")
+    angles = np.concatenate([angles for angles, _ in profiles])
+    distances = np.concatenate([distances for _, distances in profiles])
+    if len(angles) == 0:
+        raise ValueError("Recorded profiles hold no valid readings")
+    return angles, distances
+
+class Profile_Lookup_Table:
+    '''
+    Angle-to-distance table built from recorded readings, quantized to the motor step.
+    Same interface as Scene_Lookup_Table, so Hardware_Sim can use either.
+    '''
+    def __init__(self, angles, distances, step=DEFAULT_STEP, min_angle=DEFAULT_MIN_ANGLE,
+                 max_angle=DEFAULT_MAX_ANGLE, noise=False, seed=None):
+        if step <= 0:
+            raise ValueError("Lookup table step must be greater than 0")
+        self._step = float(step)
+        self._min_angle = float(min_angle)
+        self._num_angles = int(round((max_angle - min_angle) / step)) + 1
+        self._angles = self._min_angle + self._step * np.arange(self._num_angles)
+        self._noise = noise
+        self._rng = np.random.default_rng(seed)
+        self._build(np.asarray(angles, dtype=np.float64), np.asarray(distances, dtype=np.float64))
+
+    # Getter for quantized angles
+    @property
+    def angles(self):
+        return self._angles
+
+    # Getter for median distances at the quantized angles
+    @property
+    def table(self):
+        return self._table
+
+    # Getter for noise resampling
+    @property
+    def noise(self):
+        return self._noise
+
+    def _build(self, angles, distances):
+        '''
+        Median per measured step, interpolated over the grid, and the per-step residuals for noise
+        '''
+        idx = np.clip(np.rint((angles - self._min_angle) / self._step).astype(int), 0, self._num_angles - 1)
+        order = np.lexsort((distances, idx))
+        idx, distances = idx[order], distances[order]
+        steps, starts, counts = np.unique(idx, return_index=True, return_counts=True)
+        medians = (distances[starts + (counts - 1) // 2] + distances[starts + counts // 2]) / 2
+        self._table = np.interp(self._angles, self._angles[steps], medians)
+
+        # Residuals grouped by step; steps measured once say nothing about noise
+        self._residuals = distances - np.repeat(medians, counts)
+        repeated = counts > 1
+        if self._noise and not repeated.any():
+            raise ValueError("Noise resampling needs repeated readings at one or more angles")
+        self._noise_starts = starts[repeated]
+        self._noise_counts = counts[repeated]
+        if self._noise:
+            # Nearest repeatedly measured step for every grid angle
+            centers = steps[repeated]
+            grid = np.arange(self._num_angles)
+            right = np.clip(np.searchsorted(centers, grid), 0, len(centers) - 1)
+            left = np.clip(right - 1, 0, len(centers) - 1)
+            self._noise_source = np.where(np.abs(grid - centers[left]) <= np.abs(centers[right] - grid), left, right)
+
+    def index(self, angle):
+        '''
+        Table index of the motor step nearest to the angle
+        '''
+        idx = int(round((angle - self._min_angle) / self._step))
+        return min(max(idx, 0), self._num_angles - 1)
+
+    def lookup(self, angle):
+        '''
+        Distance at the motor step nearest to the angle
+        '''
+        return float(self.lookup_many([angle])[0])
+
+    def lookup_many(self, angles):
+        '''
+        Distances at the motor steps nearest to an array of angles, with resampled noise when enabled
+        '''
+        idx = np.rint((np.asarray(angles, dtype=np.float64) - self._min_angle) / self._step).astype(int)
+        idx = np.clip(idx, 0, self._num_angles - 1)
+        distances = self._table[idx]
+        if not self._noise:
+            return distances
+        source = self._noise_source[idx]
+        draws = self._noise_starts[source] + self._rng.integers(0, self._noise_counts[source])
+        return np.maximum(distances + self._residuals[draws], 0.0)
@@ -3,27 +3,59 @@ Hardware control class
 Runs on a dedicated core for realtime control and extensibility
 '''
 import time
+import numpy as np
+import tracing
+from ipc_utils import recv_latest, is_command, batch_reply, sweep_reply, SWEEP_COMMAND, MEASURE_COMMAND, BATCH_COMMAND
+from scan_planner import sweep_angles, plan_moves, move_time
+from telemetry_buffer import Telemetry_Ring_Buffer
+from session_recorder import Session_Recorder
 from VL53L1_wrapper import ToF_Sensor
+from tof_array import ToF_Array
 from stepper_motor_control_wrapper import Stepper_Motor
 
 class Hardware_Control():
     def __init__(self, conn, init_event, error_event, shutdown_event, 
                  ipc_status_flag, i2c_bus = 1, i2c_addr = 0x29, 
-                 gpio_pins = [0, 0, 0, 0], initial_angle = 0, motor_speed = 0):
+                 gpio_pins = [0, 0, 0, 0], initial_angle = 0, motor_speed = 0,
+                 motor_acceleration = 0, motor_start_speed = None, motor_jitter = False,
+                 range_while_moving = False,
+                 ipc_timeout = None, telemetry_name = None, data_ready_pin = None,
+                 measure_profile = None, sweep_profile = "fast",
+                 samples_per_measurement = 1, target_precision = None, record_path = None,
+                 tof_array = None):
         self.pipe_conn = conn
-        self._polling_period = 0.1
+        self._ipc_timeout = ipc_timeout
+        self._telemetry_name = telemetry_name
+        self._telemetry = None
+        self._record_path = record_path
+        self._recorder = None
+        self._turn = 0
         self._sensor_all_data = None
         self._new_angle = float()
         self._last_angle = float(initial_angle)
+        self._commanded_angle = float(initial_angle)
         self._rotate = float()
         self._rotate_precision = 0.9
         self._distance = round(float(), 1)
         self._i2c_bus = i2c_bus
         self._i2c_addr = i2c_addr
         self._gpio_pins = gpio_pins
+        self._data_ready_pin = data_ready_pin
+        self._measure_profile = measure_profile
+        self._sweep_profile = sweep_profile
+        self._samples_per_measurement = samples_per_measurement
+        self._target_precision = target_precision
+        self._precision_sample_limit = 16
         self._motor_speed = motor_speed
+        self._motor_acceleration = motor_acceleration
+        self._motor_start_speed = motor_start_speed
+        self._motor_jitter = motor_jitter
+        self._range_while_moving = range_while_moving
+        self._move_report = None
         self._stepper_motor = None 
         self._tof = None
+        self._tof_array_config = tof_array
+        self._tof_array = None
         self._ipc_status_flag = ipc_status_flag
         self._init_event = init_event
         self._error_event = error_event
@@ -47,13 +79,32 @@ class Hardware_Control():
         Initializes the proximity sensor and stepper motor objects along with startup procedures.
         '''
         try:
-            # Initialize and conifugre the proximity sensor
-            self._tof = ToF_Sensor(i2c_bus = self._i2c_bus, i2c_addr = self._i2c_addr)
+            # Initialize and conifugre the proximity sensor, or an array of sensors led by a primary sensor
+            if self._tof_array_config is not None:
+                self._tof_array = ToF_Array(i2c_bus = self._i2c_bus, **self._tof_array_config)
+                self._tof = self._tof_array
+            else:
+                self._tof = ToF_Sensor(i2c_bus = self._i2c_bus, i2c_addr = self._i2c_addr,
+                                       data_ready_pin = self._data_ready_pin)
             self._tof.set_roi(4, 4)
+            if self._measure_profile is not None:
+                self._tof.set_ranging_profile(self._measure_profile)
             self._tof.initialize_ranging()
 
             # Initialize the stepper motor
-            self._stepper_motor = Stepper_Motor(gpio_pins = self._gpio_pins, speed = self._motor_speed)
+            self._stepper_motor = Stepper_Motor(gpio_pins = self._gpio_pins, speed = self._motor_speed,
+                                                acceleration = self._motor_acceleration,
+                                                start_speed = self._motor_start_speed)
+            if self._motor_jitter:
+                self._stepper_motor.motor_jitter_enable()
+
+            # Attach to the telemetry ring buffer created by the caller python application
+            if self._telemetry_name is not None:
+                self._telemetry = Telemetry_Ring_Buffer(name = self._telemetry_name)
+
+            # Record every measurement of the session
+            if self._record_path is not None:
+                self._recorder = Session_Recorder(self._record_path)
 
             return 0
         
@@ -70,26 +121,22 @@ class Hardware_Control():
         '''
         State machine to control motor position and updating measured distance
         '''
-        while True:
-            
-            # Poll sensor and send distance data to caller python application
-            try:
-                self._sensor_all_data = self._tof.poll_sensor()
-                self._distance = float(self._sensor_all_data["Distance"])
-                self.pipe_conn.send(self._distance)
-            
-            except (RuntimeError, OSError) as e:
-                print(f"ToF Sensor communication failed during hardware transition: {e}")
+        # Poll sensor at the initial position and send distance data to caller python application
+        self._measure_and_send(self._samples_per_measurement, self._target_precision)
 
-            except Exception as e:
-                print(f"An unexpected error occurred during hardware transition: {e}")
+        while True:
 
-            # Retrieve target angle from caller python application; configure pipe as LIFO and then flush
+            # Block until the caller python application sends a target angle or command; configure pipe as LIFO and then flush
+            message = None
             try:
-                while not self.pipe_conn.poll():
-                    time.sleep(self._polling_period)
-                while self.pipe_conn.poll():
-                    self._new_angle = float(self.pipe_conn.recv())
+                with tracing.span("hardware.wait_command"):
+                    message = recv_latest(self.pipe_conn, self._ipc_timeout)
+
+            # The caller python application stopped responding; nothing more will arrive
+            except TimeoutError as e:
+                print(f"Target angle communication timed out during hardware transition: {e}")
+                self._shutdown()
+                return
 
             except (RuntimeError, OSError) as e:
                 print(f"Target angle communication failed during hardware transition: {e}")
@@ -97,31 +144,248 @@ class Hardware_Control():
             except Exception as e:
                 print(f"An unexpected error occurred during hardware transition: {e}")
 
-            # Set motor position.  Note that commanded position is updated according to the motor precision.
-            try:
-                self._rotate = round((self._new_angle - self._last_angle) / self._rotate_precision, 0) * self._rotate_precision
-                self._last_angle = self._last_angle + self._rotate
-                self._stepper_motor.motor_set_position_half_step(self._rotate)
+            if message is not None:
+                self._turn += 1
 
-            except (RuntimeError, OSError) as e:
-                print(f"Stepper motor command failed during hardware transition: {e}")
+            # The flag is raised before the final target angle is sent; read it before replying so the
+            # next turn's flag cannot end this one early
+            shutdown_requested = self._ipc_status_flag.value == 1
 
-            except Exception as e:
-                print(f"An unexpected error occurred during hardware transition: {e}")
+            # Sweep command: range the whole profile and reply once
+            if is_command(message, SWEEP_COMMAND):
+                try:
+                    with tracing.span("hardware.sweep"):
+                        angles, distances = self.sweep(message["start"], message["stop"], message.get("every_n", 1),
+                                                       message.get("profile"))
+                    self.pipe_conn.send(sweep_reply(angles, distances))
+
+                except (RuntimeError, OSError) as e:
+                    print(f"Sweep failed during hardware transition: {e}")
+
+                except Exception as e:
+                    print(f"An unexpected error occurred during hardware transition: {e}")
+
+            # Batch command: measure every target angle and reply with all pairs at once
+            elif is_command(message, BATCH_COMMAND):
+                try:
+                    angles = message["angles"]
+                    with tracing.span("hardware.batch", targets=len(angles)):
+                        distances = self.measure_batch(angles)
+                    self.pipe_conn.send(batch_reply(angles, distances))
+
+                except (RuntimeError, OSError) as e:
+                    print(f"Batch measurement failed during hardware transition: {e}")
+
+                except Exception as e:
+                    print(f"An unexpected error occurred during hardware transition: {e}")
+
+            # Target angle: set motor position, then poll sensor and send distance data.
+            # A measure command carries its own sample count or target precision.
+            elif message is not None:
+                samples = self._samples_per_measurement
+                precision = self._target_precision
+                try:
+                    if is_command(message, MEASURE_COMMAND):
+                        samples = message.get("samples") or samples
+                        precision = message.get("target_precision") or precision
+                        message = message["angle"]
+                    self._new_angle = float(message)
+                    self._commanded_angle = self._new_angle
+                    self._move_to(self._new_angle)
+
+                except (RuntimeError, OSError) as e:
+                    print(f"Stepper motor command failed during hardware transition: {e}")
+
+                except Exception as e:
+                    print(f"An unexpected error occurred during hardware transition: {e}")
+
+                self._measure_and_send(samples, precision)
 
             # Check IPC status flag
-            if self._ipc_status_flag.value == 1:
+            if shutdown_requested:
                 self._shutdown()
 
             if test_mode == "on":
                 break
 
+    def _measure(self, samples = 1, target_precision = None):
+        '''
+        Poll the sensor at the current position and publish the reading.
+        With several samples or a target precision the median of a batched acquisition is reported.
+        '''
+        with tracing.span("hardware.measure", samples=samples):
+            return self._measure_at_position(samples, target_precision)
+
+    def _measure_at_position(self, samples, target_precision):
+        if samples > 1 or target_precision is not None:
+            max_samples = samples if samples > 1 else self._precision_sample_limit
+            stats = self._tof.acquire(max_samples, target_precision = target_precision)
+            self._sensor_all_data = self._tof.last_reading()
+            self._distance = float(stats["median"])
+        else:
+            self._sensor_all_data = self._tof.read_sensor()
+            self._distance = float(self._sensor_all_data.distance)
+        self._publish_telemetry()
+        if self._recorder is not None:
+            self._recorder.append_reading(self._turn, self._commanded_angle, self._last_angle,
+                                          self._sensor_all_data, self._distance)
+        if self._tof_array is not None:
+            self._measure_offsets()
+        return self._distance
+
+    def _measure_offsets(self):
+        '''
+        Read the array's other sensors and publish each reading at the motor angle plus the sensor's offset
+        '''
+        offsets = self._tof_array.offsets[1:]
+        for offset, reading in zip(offsets, self._tof_array.read_all(first = 1)):
+            angle = self._last_angle + offset
+            self._publish_telemetry(reading, angle)
+            if self._recorder is not None:
+                self._recorder.append_reading(self._turn, self._commanded_angle + offset, angle, reading)
+
+    def _measure_and_send(self, samples = 1, target_precision = None):
+        '''
+        Poll sensor and send distance data to caller python application
+        '''
+        try:
+            self.pipe_conn.send(self._measure(samples, target_precision))
+
+        except (RuntimeError, OSError) as e:
+            print(f"ToF Sensor communication failed during hardware transition: {e}")
+
+        except Exception as e:
+            print(f"An unexpected error occurred during hardware transition: {e}")
+
+    def _move_to(self, angle):
+        '''
+        Set motor position.  Note that commanded position is updated according to the motor precision.
+        '''
+        self._rotate = round((angle - self._last_angle) / self._rotate_precision, 0) * self._rotate_precision
+        if self._rotate != 0:
+            with tracing.span("hardware.move", rotate=self._rotate):
+                if self._range_while_moving:
+                    self._move_and_range(self._rotate)
+                else:
+                    self._stepper_motor.motor_set_position_half_step(self._rotate)
+        self._last_angle = self._last_angle + self._rotate
+
+    def _move_and_range(self, rotate):
+        '''
+        Move asynchronously and keep ranging while the motor turns.
+        Each reading is published to telemetry at the motor angle it was taken at.
+        '''
+        origin = self._stepper_motor.motor_step_position()
+        move = self._stepper_motor.motor_move_async(rotate)
+        try:
+            while not move.done():
+                reading = self._tof.read_sensor()
+                self._publish_telemetry(reading, self._last_angle + self._stepper_motor.motor_step_position() - origin)
+        except Exception:
+            # The cancelled move stops part way; record the angle actually reached before re-raising
+            self._stepper_motor.motor_move_cancel()
+            self._last_angle = self._last_angle + move.result() - origin
+            raise
+        move.result()
+
+    def sweep(self, start, stop, every_n = 1, profile = None):
+        '''
+        Move from start to stop at motor step resolution, ranging every Nth step.
+        The sweep ranges with the sweep profile (fast and coarse by default), then restores the
+        measurement profile used for single-angle refinement.
+        Returns the quantized angles and the measured distance profile.
+        '''
+        profile = profile if profile is not None else self._sweep_profile
+        angles = sweep_angles(start, stop, self._rotate_precision, every_n, reference = self._last_angle)
+        if profile is not None:
+            self._tof.set_ranging_profile(profile)
+        try:
+            # Sweep in one direction, starting from whichever end is nearer
+            distances = self._visit(angles, monotonic = True)
+        finally:
+            if profile is not None:
+                self._tof.set_ranging_profile(self._measure_profile or "default")
+        return angles, distances
+
+    def measure_batch(self, angles):
+        '''
+        Measure every target angle with the measurement profile, visiting them in travel-minimizing order.
+        Returns the distances in the order the angles were requested.
+        '''
+        return self._visit(angles, self._samples_per_measurement, self._target_precision)
+
+    def _visit(self, angles, samples = 1, target_precision = None, monotonic = False):
+        '''
+        Move to the target angles in the planned order and measure once per motor step.
+        Targets on the same motor step share one measurement.
+        Returns the distances in the order the angles were given and reports predicted versus actual move time.
+        '''
+        stops, index = plan_moves(angles, self._last_angle, self._rotate_precision, monotonic = monotonic)
+        predicted = move_time(stops, self._last_angle, self._motor_speed, self._rotate_precision,
+                              self._motor_acceleration, self._motor_start_speed)
+        readings = np.empty(len(stops))
+        moving = 0.0
+        for i, stop in enumerate(stops):
+            self._commanded_angle = float(stop)
+            start = time.perf_counter()
+            self._move_to(stop)
+            moving += time.perf_counter() - start
+            readings[i] = self._measure(samples, target_precision)
+
+        self._move_report = {"targets": len(angles), "stops": len(stops), "predicted": predicted, "actual": moving}
+        predicted = "n/a" if predicted is None else f"{predicted:.3f} s"
+        print(f"Visited {len(angles)} targets in {len(stops)} stops: predicted move time {predicted}, actual {moving:.3f} s")
+        return readings[index]
+
+    # Getter for the predicted and actual move time of the last planned visit
+    @property
+    def move_report(self):
+        return self._move_report
+
+    def _publish_telemetry(self, reading = None, angle = None):
+        '''
+        Write the full sensor reading at the current angle to the telemetry ring buffer.
+        Readings taken while moving carry their own distance and angle.
+        '''
+        if self._telemetry is None:
+            return
+        if reading is None:
+            reading, distance, angle = self._sensor_all_data, self._distance, self._last_angle
+        else:
+            distance = reading.distance
+        self._telemetry.write(
+            angle = angle,
+            distance = distance,
+            ambient = reading.ambient,
+            signal = reading.sig_per_spad,
+            spads = reading.num_spads,
+            status = reading.status,
+        )
+
+    def _report_motor_jitter(self):
+        '''
+        Print the step latency distribution recorded by the motor driver
+        '''
+        jitter = self._stepper_motor.motor_jitter_histogram()
+        if jitter["steps"] == 0:
+            return
+        bin_us = jitter["bin_us"]
+        cumulative = np.cumsum(jitter["counts"]) / jitter["steps"]
+        p50, p99 = ((np.searchsorted(cumulative, q) + 1) * bin_us for q in (0.5, 0.99))
+        print(f"Motor step latency over {jitter['steps']} steps: p50 < {p50} us, p99 < {p99} us, "
+              f"max {jitter['max_us']} us")
+
     def _shutdown(self):
         '''
         Shut down motor and flag parent process it is safe to kill this subprocess
         '''
         print("Shutting down all hardware...")
+        if self._motor_jitter:
+            self._report_motor_jitter()
         self._stepper_motor.motor_stop()
+        if self._recorder is not None:
+            self._recorder.close()
+        tracing.flush()
         self._shutdown_event.set()
 
 if __name__ == "__main__":
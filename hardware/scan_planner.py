@@ -0,0 +1,95 @@
+"""
+Scan planning helpers shared by the hardware control and simulation classes
+Quantizes commanded angles to the motor step grid and lays out sweeps
+"""
+
+import numpy as np
+
+MOTOR_STEP = 0.9
+MIN_ANGLE = -90.0
+MAX_ANGLE = 90.0
+
+def quantize_angle(angle, step=MOTOR_STEP, reference=0.0):
+    '''
+    Nearest angle reachable from the reference position in whole motor steps
+    '''
+    return reference + round((angle - reference) / step) * step
+
+def sweep_angles(start, stop, step=MOTOR_STEP, every_n=1, reference=0.0):
+    '''
+    Motor-step angles visited by a sweep from start to stop (inclusive), ranging every Nth step.
+    The last step is always ranged so the profile covers the full span.
+    Angles outside the field of view are dropped.
+    '''
+    if every_n < 1:
+        raise ValueError("Sweep must range at least every step (every_n >= 1)")
+    first = quantize_angle(start, step, reference)
+    num_steps = int(round((stop - first) / step))
+    direction = 1 if num_steps >= 0 else -1
+    offsets = np.arange(0, abs(num_steps) + 1, every_n)
+    if offsets[-1] != abs(num_steps):
+        offsets = np.append(offsets, abs(num_steps))
+    angles = np.round(first + direction * step * offsets, 6)
+    return angles[(angles >= MIN_ANGLE - 1e-6) & (angles <= MAX_ANGLE + 1e-6)]
+
+def plan_moves(targets, start, step=MOTOR_STEP, reference=None, monotonic=False):
+    '''
+    Visit order for target angles that minimizes total rotation from the start angle.
+    Targets are quantized to motor steps from the reference (default: the start angle) and targets
+    on the same step are merged.  On a line the shortest route runs to the nearer extreme first and
+    then straight to the other one; monotonic plans visit the targets in one direction only.
+    Returns the stops in visit order and, for each target, the index of the stop that serves it.
+    '''
+    reference = start if reference is None else reference
+    targets = np.asarray(targets, dtype=float)
+    if targets.size == 0:
+        return np.empty(0), np.empty(0, dtype=int)
+    unique, inverse = np.unique(np.round((targets - reference) / step).astype(int), return_inverse=True)
+    here = (start - reference) / step
+    low, high = min(unique[0], here), max(unique[-1], here)
+    ascending = np.arange(len(unique))
+
+    # Ties start towards negative angles
+    if monotonic:
+        order = ascending if here - unique[0] <= unique[-1] - here else ascending[::-1]
+    elif here - low <= high - here:
+        order = np.concatenate((ascending[unique <= here][::-1], ascending[unique > here]))
+    else:
+        order = np.concatenate((ascending[unique >= here], ascending[unique < here][::-1]))
+
+    rank = np.empty(len(unique), dtype=int)
+    rank[order] = np.arange(len(order))
+    stops = np.round(reference + unique[order] * step, 6)
+    return stops, rank[inverse.ravel()]
+
+def travel_steps(stops, start, step=MOTOR_STEP):
+    '''
+    Motor steps needed to visit the stops in order from the start angle
+    '''
+    path = np.concatenate(([start], np.asarray(stops, dtype=float)))
+    return int(np.round(np.abs(np.diff(path)) / step).sum())
+
+def step_pauses_us(num_steps, speed, step=MOTOR_STEP, acceleration=0, start_speed=None):
+    '''
+    Per-step pauses in microseconds of one move, mirroring the motor driver's trapezoidal profile:
+    speed ramps from start_speed (default: 10% of the cruise speed) at the given acceleration
+    and back down for the last steps
+    '''
+    index = np.arange(num_steps)
+    speeds = np.full(num_steps, float(speed))
+    if acceleration > 0:
+        start_speed = min(0.1 * speed if start_speed is None else start_speed, speed)
+        ramp_steps = np.minimum(index, num_steps - 1 - index)
+        speeds = np.minimum(speeds, np.sqrt(start_speed ** 2 + 2 * acceleration * ramp_steps * step))
+    return (1e6 / speeds * step).astype(int)
+
+def move_time(stops, start, speed, step=MOTOR_STEP, acceleration=0, start_speed=None):
+    '''
+    Predicted time in seconds to visit the stops, using the motor driver's per-step pauses
+    at the configured speed in degrees per second (None when no speed is set)
+    '''
+    if speed <= 0:
+        return None
+    path = np.concatenate(([start], np.asarray(stops, dtype=float)))
+    moves = np.round(np.abs(np.diff(path)) / step).astype(int)
+    return sum(int(step_pauses_us(steps, speed, step, acceleration, start_speed).sum()) for steps in moves) / 1e6
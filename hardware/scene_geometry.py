@@ -0,0 +1,282 @@
+"""
+Spatial scene geometry for the hardware simulation
+Describes a 2D environment of obstacles and ray-casts sensor distances with NumPy
+
+Coordinate convention:
+ - The sensor sits at the scene origin (default (0, 0))
+ - 0 degrees points along +y; positive angles rotate toward +x
+"""
+
+import hashlib
+import math
+import os
+import numpy as np
+
+DEFAULT_MAX_RANGE = 4000.0
+DEFAULT_STEP = 0.9
+DEFAULT_MIN_ANGLE = -90.0
+DEFAULT_MAX_ANGLE = 90.0
+
+class Spatial_Scene:
+    def __init__(self, origin=(0.0, 0.0), max_range=DEFAULT_MAX_RANGE):
+        self._origin = (float(origin[0]), float(origin[1]))
+        self._max_range = float(max_range)
+        self._segments = np.empty((0, 4), dtype=np.float64)
+        self._circles = np.empty((0, 3), dtype=np.float64)
+        self._revision = 0
+
+    # Getter for sensor origin
+    @property
+    def origin(self):
+        return self._origin
+
+    # Getter for maximum sensor range
+    @property
+    def max_range(self):
+        return self._max_range
+
+    # Getter for scene revision; incremented on every definition change
+    @property
+    def revision(self):
+        return self._revision
+
+    # Getter for line segments (x0, y0, x1, y1)
+    @property
+    def segments(self):
+        return self._segments
+
+    # Getter for circles (cx, cy, r)
+    @property
+    def circles(self):
+        return self._circles
+
+    def add_segment(self, x0, y0, x1, y1):
+        '''
+        Add a single line segment obstacle
+        '''
+        segment = np.array([[x0, y0, x1, y1]], dtype=np.float64)
+        self._segments = np.vstack((self._segments, segment))
+        self._revision += 1
+        return self
+
+    def add_polygon(self, vertices, closed=True):
+        '''
+        Add a polygon (or open polyline) obstacle from a sequence of (x, y) vertices
+        '''
+        points = np.asarray(vertices, dtype=np.float64)
+        if points.ndim != 2 or points.shape[1] != 2 or len(points) < 2:
+            raise ValueError("Polygon requires at least two (x, y) vertices")
+        ends = np.roll(points, -1, axis=0) if closed else points[1:]
+        starts = points if closed else points[:-1]
+        self._segments = np.vstack((self._segments, np.hstack((starts, ends))))
+        self._revision += 1
+        return self
+
+    def add_rectangle(self, cx, cy, width, height, rotation=0.0):
+        '''
+        Add a rectangle obstacle centered at (cx, cy), rotated in degrees about its center
+        '''
+        if width <= 0 or height <= 0:
+            raise ValueError("Rectangle width and height must be greater than 0")
+        half_w, half_h = width / 2.0, height / 2.0
+        corners = np.array([[-half_w, -half_h], [half_w, -half_h],
+                            [half_w, half_h], [-half_w, half_h]])
+        theta = math.radians(rotation)
+        rot = np.array([[math.cos(theta), -math.sin(theta)],
+                        [math.sin(theta), math.cos(theta)]])
+        return self.add_polygon(corners @ rot.T + np.array([cx, cy]))
+
+    def add_circle(self, cx, cy, radius):
+        '''
+        Add a circular obstacle
+        '''
+        if radius <= 0:
+            raise ValueError("Circle radius must be greater than 0")
+        circle = np.array([[cx, cy, radius]], dtype=np.float64)
+        self._circles = np.vstack((self._circles, circle))
+        self._revision += 1
+        return self
+
+    def digest(self):
+        '''
+        Stable hash of the scene definition, used to key cached lookup tables
+        '''
+        sha = hashlib.sha256()
+        sha.update(np.array(self._origin + (self._max_range,)).tobytes())
+        sha.update(np.ascontiguousarray(self._segments).tobytes())
+        sha.update(np.ascontiguousarray(self._circles).tobytes())
+        return sha.hexdigest()
+
+    def distances(self, angles):
+        '''
+        Ray-cast every angle (degrees) against every obstacle at once.
+        Rays that hit nothing report the maximum sensor range.
+        '''
+        theta = np.radians(np.atleast_1d(np.asarray(angles, dtype=np.float64)))
+        dx = np.sin(theta)[:, None]
+        dy = np.cos(theta)[:, None]
+        ox, oy = self._origin
+        nearest = np.full(theta.shape, np.inf)
+
+        # Ray-segment intersection: origin + s*d = p + t*e
+        if len(self._segments):
+            px = self._segments[:, 0] - ox
+            py = self._segments[:, 1] - oy
+            ex = self._segments[:, 2] - self._segments[:, 0]
+            ey = self._segments[:, 3] - self._segments[:, 1]
+            denom = dx * ey - dy * ex
+            parallel = np.abs(denom) < 1e-12
+            denom = np.where(parallel, 1.0, denom)
+            s = (px * ey - py * ex) / denom
+            t = (px * dy - py * dx) / denom
+            hit = ~parallel & (s >= 0) & (t >= 0) & (t <= 1)
+            nearest = np.minimum(nearest, np.where(hit, s, np.inf).min(axis=1))
+
+        # Ray-circle intersection: |origin + s*d - c|^2 = r^2
+        if len(self._circles):
+            cx = self._circles[:, 0] - ox
+            cy = self._circles[:, 1] - oy
+            r = self._circles[:, 2]
+            b = dx * cx + dy * cy
+            disc = b ** 2 - (cx ** 2 + cy ** 2 - r ** 2)
+            root = np.sqrt(np.maximum(disc, 0.0))
+            near = b - root
+            s = np.where(near >= 0, near, b + root)
+            hit = (disc >= 0) & (s >= 0)
+            nearest = np.minimum(nearest, np.where(hit, s, np.inf).min(axis=1))
+
+        return np.minimum(nearest, self._max_range)
+
+    def distance(self, angle):
+        '''
+        Ray-cast a single angle (degrees)
+        '''
+        return float(self.distances(angle)[0])
+
+
+class Scene_Lookup_Table:
+    '''
+    Angle-to-distance table for a scene, quantized to the motor step.
+    Measurements become a single array index; the table rebuilds itself when the scene changes.
+    '''
+    def __init__(self, scene, step=DEFAULT_STEP, min_angle=DEFAULT_MIN_ANGLE,
+                 max_angle=DEFAULT_MAX_ANGLE, cache_dir=None):
+        if step <= 0:
+            raise ValueError("Lookup table step must be greater than 0")
+        self._scene = scene
+        self._step = float(step)
+        self._min_angle = float(min_angle)
+        self._num_angles = int(round((max_angle - min_angle) / step)) + 1
+        self._angles = self._min_angle + self._step * np.arange(self._num_angles)
+        self._cache_dir = cache_dir
+        self._revision = None
+        self._table = None
+        self._build()
+
+    # Getter for quantized angles
+    @property
+    def angles(self):
+        return self._angles
+
+    # Getter for distances at the quantized angles
+    @property
+    def table(self):
+        if self._revision != self._scene.revision:
+            self._build()
+        return self._table
+
+    def _cache_path(self):
+        '''
+        On-disk table location keyed by the scene hash and angle grid
+        '''
+        sha = hashlib.sha256(self._scene.digest().encode())
+        sha.update(np.array([self._step, self._min_angle, self._num_angles]).tobytes())
+        return os.path.join(self._cache_dir, f"scene_lut_{sha.hexdigest()[:32]}.npy")
+
+    def _build(self):
+        '''
+        Ray-cast the full angle grid, or load it from the disk cache when available
+        '''
+        self._revision = self._scene.revision
+        path = self._cache_path() if self._cache_dir else None
+        if path and os.path.exists(path):
+            try:
+                table = np.load(path)
+                if table.shape == self._angles.shape:
+                    self._table = table
+                    return
+            except (OSError, ValueError):
+                pass
+
+        self._table = self._scene.distances(self._angles)
+        if path:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as file:
+                np.save(file, self._table)
+            os.replace(tmp_path, path)
+
+    def index(self, angle):
+        '''
+        Table index of the motor step nearest to the angle
+        '''
+        idx = int(round((angle - self._min_angle) / self._step))
+        return min(max(idx, 0), self._num_angles - 1)
+
+    def lookup(self, angle):
+        '''
+        Distance at the motor step nearest to the angle
+        '''
+        return float(self.table[self.index(angle)])
+
+    def lookup_many(self, angles):
+        '''
+        Distances at the motor steps nearest to an array of angles
+        '''
+        idx = np.rint((np.asarray(angles, dtype=np.float64) - self._min_angle) / self._step).astype(int)
+        return self.table[np.clip(idx, 0, self._num_angles - 1)]
+
+
+def scene_line(distance=10.0):
+    '''
+    Flat wall perpendicular to the 0 degree heading; distance = d / cos(angle)
+    '''
+    span = DEFAULT_MAX_RANGE * 1e3
+    return Spatial_Scene().add_segment(-span, distance, span, distance)
+
+def scene_two_obstacles():
+    '''
+    Back wall with two boxes in front of it, similar to the README example environment
+    '''
+    scene = Spatial_Scene()
+    scene.add_polygon([(-400, 300), (-400, 500), (400, 500), (400, 300)], closed=False)
+    scene.add_rectangle(-130, 130, 40, 40, rotation=20)
+    scene.add_rectangle(60, 100, 30, 30)
+    return scene
+
+def scene_corridor():
+    '''
+    Narrow corridor with a round pillar off to one side
+    '''
+    scene = Spatial_Scene()
+    scene.add_segment(-60, -10, -60, 800)
+    scene.add_segment(60, -10, 60, 800)
+    scene.add_segment(-60, 800, 60, 800)
+    scene.add_circle(30, 250, 15)
+    return scene
+
+BUILTIN_SCENES = {
+    "line": scene_line,
+    "two_obstacles": scene_two_obstacles,
+    "corridor": scene_corridor,
+}
+
+def load_scene(geom_type):
+    '''
+    Resolve a built-in scene name or pass through an existing scene
+    '''
+    if isinstance(geom_type, Spatial_Scene):
+        return geom_type
+    if geom_type in BUILTIN_SCENES:
+        return BUILTIN_SCENES[geom_type]()
+    raise ValueError(f"Unknown simulation geometry: {geom_type}")
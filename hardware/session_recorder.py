@@ -0,0 +1,178 @@
+"""
+Binary session recorder and replay
+The real-time process appends one fixed-width record per measurement to a memory-mapped file;
+a whole session loads back as a zero-copy NumPy structured array.
+
+Layout:
+ - Header: magic, format version, record size and the number of records written (updated last)
+ - Records: SESSION_DTYPE, appended in measurement order
+
+The file grows in chunks while recording and is trimmed to its records on close, so a
+session cut short by a crash is still readable up to its last complete record.
+"""
+
+import os
+import mmap
+import time
+import numpy as np
+
+SESSION_MAGIC = b"SCANREC1"
+SESSION_VERSION = 1
+GROWTH_RECORDS = 4096
+
+SESSION_DTYPE = np.dtype([
+    ("timestamp", np.float64),
+    ("turn", np.uint32),
+    ("commanded_angle", np.float64),
+    ("angle", np.float64),
+    ("distance", np.float64),
+    ("ambient", np.uint16),
+    ("signal", np.uint16),
+    ("spads", np.uint16),
+    ("status", np.uint8),
+], align=True)
+
+_HEADER_DTYPE = np.dtype([("magic", "S8"), ("version", np.uint32), ("record_size", np.uint32),
+                          ("count", np.uint64)])
+_HEADER_BYTES = 64
+
+class Session_Recorder:
+    def __init__(self, path, growth=GROWTH_RECORDS):
+        if growth <= 0:
+            raise ValueError("Recorder growth must be greater than 0")
+        self._path = path
+        self._growth = growth
+        self._count = 0
+        self._capacity = 0
+        self._file = open(path, "w+b")
+        self._map = None
+        self._header = None
+        self._records = None
+        self._remap(growth)
+        self._header["magic"] = SESSION_MAGIC
+        self._header["version"] = SESSION_VERSION
+        self._header["record_size"] = SESSION_DTYPE.itemsize
+        self._header["count"] = 0
+
+    # Getter for session file path
+    @property
+    def path(self):
+        return self._path
+
+    # Getter for number of records written
+    @property
+    def count(self):
+        return self._count
+
+    def _remap(self, capacity):
+        '''
+        Extend the file to hold capacity records and map it again
+        '''
+        self._release_map()
+        self._file.truncate(_HEADER_BYTES + capacity * SESSION_DTYPE.itemsize)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._header = np.ndarray((1,), dtype=_HEADER_DTYPE, buffer=self._map)
+        self._records = np.ndarray((capacity,), dtype=SESSION_DTYPE, buffer=self._map, offset=_HEADER_BYTES)
+        self._capacity = capacity
+
+    def _release_map(self):
+        # The map cannot close while NumPy views still export its buffer
+        self._header = None
+        self._records = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def append(self, turn, commanded_angle, angle, distance, ambient=0, signal=0, spads=0, status=0,
+               timestamp=None):
+        '''
+        Append one measurement record
+        '''
+        if self._map is None:
+            raise ValueError("Session recorder is closed")
+        if self._count == self._capacity:
+            self._remap(self._capacity + self._growth)
+        slot = self._records[self._count:self._count + 1]
+        slot["timestamp"] = time.monotonic() if timestamp is None else timestamp
+        slot["turn"] = turn
+        slot["commanded_angle"] = commanded_angle
+        slot["angle"] = angle
+        slot["distance"] = distance
+        slot["ambient"] = ambient
+        slot["signal"] = signal
+        slot["spads"] = spads
+        slot["status"] = status
+        self._count += 1
+        self._header["count"] = self._count
+        return self._count
+
+    def append_reading(self, turn, commanded_angle, angle, reading, distance=None):
+        '''
+        Append a full ToF_Reading; distance overrides the reading's own (e.g. a median of several samples)
+        '''
+        return self.append(turn, commanded_angle, angle,
+                           reading.distance if distance is None else distance,
+                           ambient = reading.ambient, signal = reading.sig_per_spad,
+                           spads = reading.num_spads, status = reading.status)
+
+    def close(self):
+        '''
+        Write the mapped records out and trim the file to the records written
+        '''
+        if self._map is None:
+            return
+        self._map.flush()
+        self._release_map()
+        self._file.truncate(_HEADER_BYTES + self._count * SESSION_DTYPE.itemsize)
+        self._file.close()
+
+def load_session(path):
+    '''
+    Every record of a session as a read-only structured array backed by the file mapping (no copy)
+    '''
+    header = np.fromfile(path, dtype=_HEADER_DTYPE, count=1)
+    if len(header) == 0 or header["magic"][0] != SESSION_MAGIC:
+        raise ValueError(f"{path} is not a scanner session recording")
+    if header["record_size"][0] != SESSION_DTYPE.itemsize:
+        raise ValueError(f"{path} was recorded with an incompatible record layout")
+    count = int(header["count"][0])
+    if count == 0 or os.path.getsize(path) < _HEADER_BYTES + count * SESSION_DTYPE.itemsize:
+        return np.empty(0, dtype=SESSION_DTYPE)
+    return np.memmap(path, dtype=SESSION_DTYPE, mode="r", offset=_HEADER_BYTES, shape=(count,))
+
+class Session_Replay:
+    '''
+    Recorded turns in order, for playing a session back to the agent loop
+    '''
+    def __init__(self, path):
+        self._records = load_session(path)
+        if len(self._records) == 0:
+            raise ValueError(f"{path} holds no recorded measurements")
+        turns = self._records["turn"]
+        # Records of one turn are contiguous; split wherever the turn index changes
+        bounds = np.flatnonzero(np.diff(turns)) + 1
+        self._turns = np.split(self._records, bounds)
+        self._next = 0
+
+    # Getter for all recorded measurements
+    @property
+    def records(self):
+        return self._records
+
+    # Getter for number of recorded turns
+    @property
+    def turns(self):
+        return len(self._turns)
+
+    # Getter for turns not yet replayed
+    @property
+    def remaining(self):
+        return len(self._turns) - self._next
+
+    def next_turn(self):
+        '''
+        Records of the next recorded turn; the final turn repeats once the session is exhausted
+        '''
+        turn = self._turns[min(self._next, len(self._turns) - 1)]
+        self._next += 1
+        return turn
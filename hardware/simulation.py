@@ -3,13 +3,31 @@ Hardware simulation class
 Simulates both the physical environment and peripherals
 """
 
-import time
-import math
+import numpy as np
+import tracing
+from ipc_utils import recv_latest, is_command, batch_reply, sweep_reply, SWEEP_COMMAND, MEASURE_COMMAND, BATCH_COMMAND
+from scan_planner import sweep_angles, plan_moves, quantize_angle
+from telemetry_buffer import Telemetry_Ring_Buffer
+from scene_geometry import load_scene, Scene_Lookup_Table
+from session_recorder import Session_Recorder, Session_Replay
+from profile_scene import Profile_Lookup_Table, load_profiles
 
 class Hardware_Sim:
     def __init__(self, conn, shutdown_event, ipc_status_flag, init_event, 
-                 error_event, geom_type="line", initial_angle=0):
+                 error_event, geom_type="line", initial_angle=0,
+                 rotate_precision=0.9, lut_cache_dir=None, ipc_timeout=None,
+                 telemetry_name=None, record_path=None, replay_path=None,
+                 profile_paths=None, profile_noise=False, profile_seed=None):
         self._geometry = geom_type
+        self._scene = None
+        self._lut = None
+        self._recorder = None
+        self._replay = None
+        self._turn = 0
+        self._rotate_precision = rotate_precision
+        self._lut_cache_dir = lut_cache_dir
+        self._ipc_timeout = ipc_timeout
+        self._telemetry = None
         self._angle = float(initial_angle)
         self._distance = round(float(10.00), 1)
         self.pipe_conn = conn
@@ -17,7 +35,29 @@ class Hardware_Sim:
         self._init_event = init_event
         self._error_event = error_event
         self._shutdown_event = shutdown_event
-        self.sim_line()
+
+        # Load the simulated scene, recorded profiles or a session to replay; flag the parent process on failure
+        try:
+            if replay_path is not None:
+                self._replay = Session_Replay(replay_path)
+            elif profile_paths:
+                self._lut = Profile_Lookup_Table(
+                    *load_profiles(profile_paths), step = self._rotate_precision,
+                    noise = profile_noise, seed = profile_seed)
+            else:
+                self._scene = load_scene(geom_type)
+                self._lut = Scene_Lookup_Table(
+                    self._scene, step = self._rotate_precision, cache_dir = self._lut_cache_dir)
+            self._distance = self.measure(self._angle)
+            if telemetry_name is not None:
+                self._telemetry = Telemetry_Ring_Buffer(name=telemetry_name)
+            if record_path is not None:
+                self._recorder = Session_Recorder(record_path)
+        except (ValueError, OSError):
+            self._error_event.set()
+            self._init_event.set()
+            raise
+        self._sim_transition()
 
     # Getter for angle
     @property
@@ -47,27 +87,128 @@ class Hardware_Sim:
             raise ValueError("Distance must be greater than 0")
         self._distance = new_distance
 
-    # Geometric Simulation:  Line
-    def sim_line(self):
+    # Getter for simulated scene
+    @property
+    def scene(self):
+        return self._scene
+
+    def measure(self, angle):
+        '''
+        Simulated proximity measurement at the motor step nearest the requested angle
+        '''
+        if self._replay is not None:
+            return round(float(self._replay_distances([angle])[0]), 1)
+        return round(self._lut.lookup(angle), 1)
+
+    def _replay_distances(self, angles):
+        '''
+        Distances of the next recorded turn, taken at the recorded angles nearest the requested ones.
+        Reports where the agent asks for angles the recorded run did not measure.
+        '''
+        turn = self._replay.next_turn()
+        if self._replay.remaining == 0:
+            print("Replaying the last recorded turn; later turns repeat it")
+        angles = np.asarray(angles, dtype=float)
+        if len(angles) == 0:
+            return np.empty(0)
+        nearest = np.abs(turn["angle"][None, :] - angles[:, None]).argmin(axis=1)
+        offset = np.abs(turn["angle"][nearest] - angles).max()
+        if offset > self._rotate_precision / 2:
+            print(f"Replay diverged at turn {int(turn['turn'][0])}: requested angles are up to {offset:.1f} degrees "
+                  f"from the recorded ones")
+        return np.asarray(turn["distance"][nearest], dtype=float)
+
+    def sweep(self, start, stop, every_n=1, profile=None):
+        '''
+        Simulated sweep from start to stop at motor step resolution, ranging every Nth step.
+        Returns the quantized angles and the distance profile in one vectorized lookup.
+        The ranging profile has no effect on the ideal simulated sensor.
+        '''
+        angles = sweep_angles(start, stop, self._rotate_precision, every_n)
+        return angles, self._visit(angles, monotonic=True)
+
+    def measure_batch(self, angles):
+        '''
+        Simulated measurements for a list of target angles in one vectorized lookup.
+        Returns the distances in the order the angles were requested.
+        '''
+        return self._visit(angles)
+
+    def _visit(self, angles, monotonic=False):
+        '''
+        Look up the planned stops for the target angles, leaving the sensor where the
+        hardware would stop, and publish telemetry in visit order
+        '''
+        stops, index = plan_moves(angles, self.angle, self._rotate_precision, reference=0.0, monotonic=monotonic)
+        if self._replay is not None:
+            readings = self._replay_distances(stops).round(1)
+        else:
+            readings = self._lut.lookup_many(stops).round(1)
+        if self._recorder is not None:
+            for angle, distance in zip(stops, readings):
+                self._recorder.append(self._turn, angle, angle, distance)
+        if len(stops):
+            self.angle = float(stops[-1])
+            self.distance = float(readings[-1])
+        if self._telemetry is not None:
+            for angle, distance in zip(stops, readings):
+                self._telemetry.write(angle=angle, distance=distance)
+        return readings[index]
+
+    def _send_state(self):
+        '''
+        Fill telemetry buffer and data pipe with current system state
+        '''
+        if self._telemetry is not None:
+            self._telemetry.write(angle=self.angle, distance=self.distance)
+        if self._recorder is not None:
+            self._recorder.append(self._turn, self.angle, quantize_angle(self.angle, self._rotate_precision),
+                                  self.distance)
+        self.pipe_conn.send(self.distance)
+
+    # Geometric Simulation:  Scene ray-casting (built-in "line" reproduces the original flat wall)
+    def _sim_transition(self):
         
         # Faux hardware initialization
         self._init_event.set()
 
+        self._send_state()
+
         while True:
-            time.sleep(0.1)
-
-            # Fill data pipe with current system state
-            self.pipe_conn.send(self.distance)
-            # Retrieve angle from AI; configure pipe as LIFO and then flush
-            self.angle = 0
-            while not self.pipe_conn.poll():
-                time.sleep(0.1)
-            while self.pipe_conn.poll():
-                self.angle = float(self.pipe_conn.recv())
-                self.distance = round(10 / math.cos(self.angle * math.pi / 180), 1)
+
+            # Block until the AI sends a new angle or command; configure pipe as LIFO and then flush
+            try:
+                with tracing.span("sim.wait_command"):
+                    message = recv_latest(self.pipe_conn, self._ipc_timeout)
+
+            # The caller python application stopped responding; nothing more will arrive
+            except TimeoutError as e:
+                print(f"Target angle communication timed out during simulation: {e}")
+                self._shutdown()
+                return
+            self._turn += 1
+
+            # The flag is raised before the final message is sent; read it before replying so the
+            # next turn's flag cannot end this one early
+            shutdown_requested = self._ipc_status_flag.value == 1
+            if is_command(message, SWEEP_COMMAND):
+                angles, distances = self.sweep(message["start"], message["stop"], message.get("every_n", 1),
+                                               message.get("profile"))
+                self.pipe_conn.send(sweep_reply(angles, distances))
+            elif is_command(message, BATCH_COMMAND):
+                angles = message["angles"]
+                self.pipe_conn.send(batch_reply(angles, self.measure_batch(angles)))
+            else:
+                # The ideal simulated sensor needs no averaging; measure commands only carry the angle
+                if is_command(message, MEASURE_COMMAND):
+                    message = message["angle"]
+                with tracing.span("sim.measure"):
+                    self.angle = float(message)
+                    self.distance = self.measure(self.angle)
+                self._send_state()
 
             # Check IPC status flag
-            if self._ipc_status_flag.value == 1:
+            if shutdown_requested:
                 self._shutdown()
 
     def _shutdown(self):
@@ -75,6 +216,9 @@ class Hardware_Sim:
         Shut down and flag parent process it is safe to kill this subprocess
         '''
         print("Shutting down subprocess...")
+        if self._recorder is not None:
+            self._recorder.close()
+        tracing.flush()
         self._shutdown_event.set()
 
         
\ No newline at end of file
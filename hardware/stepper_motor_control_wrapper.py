@@ -6,9 +6,18 @@ Python wrapper for linux system driver for bipolar stepper motor control logic (
 import ctypes
 import os
 import time
+import threading
+from concurrent.futures import Future
+
+HALF_STEP_ANGLE = 0.9
+
+# Step latency histogram layout (MOTOR_JITTER_BINS and MOTOR_JITTER_BIN_US in motor_control_api.h)
+JITTER_BINS = 64
+JITTER_BIN_US = 10
 
 class Stepper_Motor:
-    def __init__(self, library_path=None, chip="/dev/gpiochip0", gpio_pins=[0, 0, 0, 0], speed=0):
+    def __init__(self, library_path=None, chip="/dev/gpiochip0", gpio_pins=[0, 0, 0, 0], speed=0,
+                 acceleration=0, start_speed=None):
         if library_path is None:
             library_path = os.path.join(
             os.path.dirname(__file__), "../libraries/Stepper_Motor_Hybrid/motor_driver.so")
@@ -23,6 +32,8 @@ class Stepper_Motor:
         self._bind_functions()
         self._driver_init()
         self._motor_init()
+        if acceleration > 0:
+            self.motor_set_acceleration(acceleration, start_speed)
 
     # Getter method for _position
     def get_position(self):
@@ -47,6 +58,10 @@ class Stepper_Motor:
         self._lib.motor_init.argtypes = [ctypes.c_float]
         self._lib.motor_init.restype = ctypes.c_int
 
+        # Configure acceleration ramps
+        self._lib.motor_set_acceleration.argtypes = [ctypes.c_float, ctypes.c_float]
+        self._lib.motor_set_acceleration.restype = ctypes.c_int
+
         # Position motor with full step
         self._lib.motor_set_position_full_step.argtypes = [ctypes.c_float]
         self._lib.motor_set_position_full_step.restype = ctypes.c_int
@@ -55,6 +70,25 @@ class Stepper_Motor:
         self._lib.motor_set_position_half_step.argtypes = [ctypes.c_float]
         self._lib.motor_set_position_half_step.restype = ctypes.c_int
 
+        # Asynchronous moves
+        self._lib.motor_move_async.argtypes = [ctypes.c_int, ctypes.c_float]
+        self._lib.motor_move_async.restype = ctypes.c_int
+        self._lib.motor_move_busy.argtypes = []
+        self._lib.motor_move_busy.restype = ctypes.c_int
+        self._lib.motor_move_wait.argtypes = [ctypes.c_int]
+        self._lib.motor_move_wait.restype = ctypes.c_int
+        self._lib.motor_move_cancel.argtypes = []
+        self._lib.motor_move_cancel.restype = ctypes.c_int
+        self._lib.motor_get_step_position.argtypes = []
+        self._lib.motor_get_step_position.restype = ctypes.c_int
+
+        # Step latency histogram
+        self._lib.motor_jitter_enable.argtypes = [ctypes.c_int]
+        self._lib.motor_jitter_enable.restype = ctypes.c_int
+        self._lib.motor_jitter_histogram.argtypes = [
+            ctypes.POINTER(ctypes.c_uint), ctypes.c_int, ctypes.POINTER(ctypes.c_uint)]
+        self._lib.motor_jitter_histogram.restype = ctypes.c_int
+
         # Stop motor
         self._lib.motor_stop.argtypes = []
         self._lib.motor_stop.restype = ctypes.c_int
@@ -80,6 +114,19 @@ class Stepper_Motor:
         else:
             raise RuntimeError(f"Motor initialization failed with status: {status}")
         
+    def motor_set_acceleration(self, acceleration, start_speed=None):
+        '''
+        Configure trapezoidal ramps: moves start and end at start_speed (default: 10% of the
+        cruise speed) and accelerate at the given rate in degrees/s^2; 0 disables the ramps
+        '''
+        if start_speed is None:
+            start_speed = 0.1 * self._speed.value
+        status = self._lib.motor_set_acceleration(ctypes.c_float(acceleration), ctypes.c_float(start_speed))
+        if status == 0:
+            print("Motor acceleration configured....")
+        else:
+            raise RuntimeError(f"Motor acceleration configuration failed with status: {status}")
+
     def motor_set_position_full_step(self, position):
         '''
         Command motor movement postion using full step motor control
@@ -102,6 +149,73 @@ class Stepper_Motor:
         else:
             raise RuntimeError(f"Motor half step positioning failed with status: {status}")
 
+    def motor_move_async(self, position, half_step=True):
+        '''
+        Start a move on the driver's worker thread and return immediately.
+        The returned Future completes with the step position in degrees once the move ends
+        (including a cancelled move); add_done_callback() notifies of completion.
+        '''
+        self.set_position(position)
+        status = self._lib.motor_move_async(2 if half_step else 1, ctypes.c_float(self._position))
+        if status != 0:
+            raise RuntimeError(f"Motor asynchronous move failed to start with status: {status}")
+
+        # ctypes releases the GIL while the watcher blocks in the driver
+        move = Future()
+        move.set_running_or_notify_cancel()
+        def watch():
+            status = self._lib.motor_move_wait(-1)
+            if status == 0:
+                move.set_result(self.motor_step_position())
+            else:
+                move.set_exception(RuntimeError(f"Motor asynchronous move failed with status: {status}"))
+        threading.Thread(target=watch, daemon=True).start()
+        return move
+
+    def motor_move_busy(self):
+        '''
+        True while an asynchronous move is in progress
+        '''
+        return bool(self._lib.motor_move_busy())
+
+    def motor_move_wait(self, timeout=None):
+        '''
+        Block until the asynchronous move completes; returns False on timeout (seconds)
+        '''
+        status = self._lib.motor_move_wait(-1 if timeout is None else int(timeout * 1000))
+        if status < 0:
+            raise RuntimeError(f"Motor asynchronous move failed with status: {status}")
+        return status == 0
+
+    def motor_move_cancel(self):
+        '''
+        Stop the asynchronous move after its current step
+        '''
+        self._lib.motor_move_cancel()
+
+    def motor_step_position(self):
+        '''
+        Motor position in degrees since initialization, updated after every step of a move
+        '''
+        return self._lib.motor_get_step_position() * HALF_STEP_ANGLE
+
+    def motor_jitter_enable(self, enable=True):
+        '''
+        Start (or stop) recording how late each step wakes up after its deadline; clears the histogram
+        '''
+        self._lib.motor_jitter_enable(int(enable))
+
+    def motor_jitter_histogram(self):
+        '''
+        Step latency histogram recorded since motor_jitter_enable():
+        counts per JITTER_BIN_US bin (the last bin collects the overflow), worst case and step count
+        '''
+        counts = (ctypes.c_uint * JITTER_BINS)()
+        max_us = ctypes.c_uint()
+        bins = self._lib.motor_jitter_histogram(counts, JITTER_BINS, ctypes.byref(max_us))
+        counts = list(counts[:bins])
+        return {"bin_us": JITTER_BIN_US, "counts": counts, "max_us": max_us.value, "steps": sum(counts)}
+
     def motor_stop(self):
         '''
         Halt current to the motor and clean up memory
@@ -0,0 +1,141 @@
+"""
+Shared-memory ring buffer for sensor telemetry
+The real-time process writes fixed-size records; the agent process reads them zero-copy as NumPy views
+
+Layout:
+ - Header: capacity and published record count (the write sequence counter)
+ - Records: TELEMETRY_DTYPE ring, slot = (seq - 1) % capacity
+
+Single writer, any number of readers.  Each record carries its own sequence number,
+written last, so readers can detect a slot that was overwritten while they read it.
+"""
+
+import time
+import numpy as np
+from multiprocessing import shared_memory
+
+DEFAULT_CAPACITY = 4096
+
+TELEMETRY_DTYPE = np.dtype([
+    ("seq", np.uint64),
+    ("timestamp", np.float64),
+    ("angle", np.float64),
+    ("distance", np.float64),
+    ("ambient", np.uint16),
+    ("signal", np.uint16),
+    ("spads", np.uint16),
+    ("status", np.uint8),
+], align=True)
+
+_HEADER_DTYPE = np.dtype([("capacity", np.uint64), ("write_seq", np.uint64)])
+_HEADER_BYTES = 64
+
+class Telemetry_Ring_Buffer:
+    def __init__(self, name=None, capacity=DEFAULT_CAPACITY, create=False):
+        if create:
+            if capacity <= 0:
+                raise ValueError("Telemetry buffer capacity must be greater than 0")
+            size = _HEADER_BYTES + capacity * TELEMETRY_DTYPE.itemsize
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            if name is None:
+                raise ValueError("Telemetry buffer name is required to attach")
+            # Child processes share the creator's resource tracker, so attaching does not take ownership
+            self._shm = shared_memory.SharedMemory(name=name)
+
+        self._owner = create
+        self._header = np.ndarray((1,), dtype=_HEADER_DTYPE, buffer=self._shm.buf)
+        if create:
+            self._header["capacity"] = capacity
+            self._header["write_seq"] = 0
+        self._capacity = int(self._header["capacity"][0])
+        self._records = np.ndarray(
+            (self._capacity,), dtype=TELEMETRY_DTYPE, buffer=self._shm.buf, offset=_HEADER_BYTES)
+
+    # Getter for shared memory name, used by other processes to attach
+    @property
+    def name(self):
+        return self._shm.name
+
+    # Getter for ring capacity in records
+    @property
+    def capacity(self):
+        return self._capacity
+
+    # Getter for number of records published so far
+    @property
+    def write_seq(self):
+        return int(self._header["write_seq"][0])
+
+    def write(self, angle, distance, ambient=0, signal=0, spads=0, status=0, timestamp=None):
+        '''
+        Publish one record (single writer only)
+        '''
+        seq = self.write_seq + 1
+        idx = (seq - 1) % self._capacity
+        slot = self._records[idx:idx + 1]
+        slot["seq"] = 0
+        slot["timestamp"] = time.monotonic() if timestamp is None else timestamp
+        slot["angle"] = angle
+        slot["distance"] = distance
+        slot["ambient"] = ambient
+        slot["signal"] = signal
+        slot["spads"] = spads
+        slot["status"] = status
+        slot["seq"] = seq
+        self._header["write_seq"] = seq
+        return seq
+
+    def latest(self):
+        '''
+        Zero-copy view of the most recent record, or None if nothing was written
+        '''
+        seq = self.write_seq
+        if seq == 0:
+            return None
+        return self._records[(seq - 1) % self._capacity]
+
+    def read_latest(self, retries=3):
+        '''
+        Consistent copy of the most recent record
+        '''
+        for _ in range(retries):
+            seq = self.write_seq
+            if seq == 0:
+                return None
+            record = self._records[(seq - 1) % self._capacity].copy()
+            if record["seq"] == seq:
+                return record
+        raise RuntimeError("Telemetry record was overwritten during every read attempt")
+
+    def read_range(self, start_seq, stop_seq=None):
+        '''
+        Records with sequence numbers in [start_seq, stop_seq).
+        Returns a zero-copy view when the range does not wrap the ring, otherwise a copy.
+        Sequences older than the ring capacity are no longer available and are skipped.
+        '''
+        newest = self.write_seq
+        stop_seq = newest + 1 if stop_seq is None else min(stop_seq, newest + 1)
+        start_seq = max(start_seq, stop_seq - self._capacity, 1)
+        if start_seq >= stop_seq:
+            return self._records[:0]
+        first = (start_seq - 1) % self._capacity
+        last = first + (stop_seq - start_seq)
+        if last <= self._capacity:
+            return self._records[first:last]
+        return np.concatenate((self._records[first:], self._records[:last - self._capacity]))
+
+    def close(self):
+        '''
+        Release this process's mapping of the buffer
+        '''
+        self._header = None
+        self._records = None
+        self._shm.close()
+
+    def unlink(self):
+        '''
+        Destroy the shared memory segment (creating process only)
+        '''
+        if self._owner:
+            self._shm.unlink()
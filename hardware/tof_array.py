@@ -0,0 +1,361 @@
+"""
+Several VL53L1X sensors on one I2C bus
+Every sensor boots at the default address 0x29, so the sensors are brought up one at a time with
+their XSHUT lines: all are held in reset, then each is released in turn and moved to its own address
+before the next one wakes.
+
+ - ToF_Array: XSHUT address assignment and interleaved or simultaneous ranging.  The array stands in for
+   a single ToF_Sensor: measurements come from the primary sensor and read_all() adds the others.
+ - Libgpiod_Output_Line: XSHUT output line (libgpiod)
+ - Simulated_I2C_Bus, Simulated_ToF, Simulated_XSHUT_Line: software bus and sensors for testing without hardware
+
+Ranging modes:
+ - simultaneous: every sensor ranges continuously; one reading from each takes about one timing budget
+ - interleaved: one sensor ranges at a time, so sensors with overlapping fields of view cannot see each
+   other's emitters; one reading from each takes one timing budget per sensor
+"""
+
+import time
+from smbus2 import SMBus, i2c_msg
+from VL53L1_wrapper import ToF_Sensor, ToF_Reading, DEFAULT_I2C_ADDR, DEFAULT_I2C_BUS
+from data_ready import DEFAULT_GPIO_CHIP
+
+try:
+    import gpiod
+    from gpiod.line import Direction, Value
+except ImportError:
+    gpiod = None
+
+RANGING_MODES = ("simultaneous", "interleaved")
+I2C_ADDRESS_REGISTER = 0x0001
+BOOT_TIME = 0.002
+
+class Libgpiod_Output_Line:
+    '''
+    libgpiod v2 backend for a single output line, initially low (sensor held in reset)
+    '''
+    def __init__(self, chip=DEFAULT_GPIO_CHIP, pin=0):
+        if gpiod is None:
+            raise RuntimeError("libgpiod python bindings (gpiod) are not installed")
+        self._pin = pin
+        settings = gpiod.LineSettings(direction = Direction.OUTPUT, output_value = Value.INACTIVE)
+        self._request = gpiod.request_lines(chip, consumer="vl53l1x-xshut", config={pin: settings})
+
+    def set_value(self, value):
+        self._request.set_value(self._pin, Value.ACTIVE if value else Value.INACTIVE)
+
+    def close(self):
+        self._request.release()
+
+def probe_address(bus, address):
+    '''
+    True when a device acknowledges a one byte read at the address
+    '''
+    try:
+        bus.i2c_rdwr(i2c_msg.read(address, 1))
+        return True
+    except OSError:
+        return False
+
+def set_i2c_address(bus, address, new_address):
+    '''
+    Move the sensor answering at address to new_address (7-bit); lasts until the sensor is reset
+    '''
+    bus.i2c_rdwr(i2c_msg.write(address, [I2C_ADDRESS_REGISTER >> 8, I2C_ADDRESS_REGISTER & 0xFF, new_address]))
+
+class ToF_Array:
+    def __init__(self, xshut_pins=None, addresses=None, offsets=None, ranging="simultaneous",
+                 i2c_bus=DEFAULT_I2C_BUS, gpio_chip=DEFAULT_GPIO_CHIP, xshut_lines=None, bus=None,
+                 sensor_factory=ToF_Sensor, boot_time=BOOT_TIME, sleep=time.sleep, **sensor_options):
+        if xshut_lines is None:
+            if not xshut_pins:
+                raise ValueError("Sensor array needs one XSHUT pin per sensor")
+            xshut_lines = [Libgpiod_Output_Line(chip = gpio_chip, pin = pin) for pin in xshut_pins]
+        count = len(xshut_lines)
+        # Addresses from a JSON configuration may be hex strings
+        addresses = ([int(address, 0) if isinstance(address, str) else address for address in addresses]
+                     if addresses is not None else [DEFAULT_I2C_ADDR + 1 + i for i in range(count)])
+        offsets = [float(offset) for offset in offsets] if offsets is not None else [0.0] * count
+        if len(addresses) != count or len(offsets) != count:
+            raise ValueError("Sensor array needs one address and one angular offset per XSHUT line")
+        if len(set(addresses)) != count or not all(0x08 <= address <= 0x77 for address in addresses):
+            raise ValueError("Sensor addresses must be distinct 7-bit I2C addresses")
+        # A sensor left at the default address would collide with the next one to wake
+        if DEFAULT_I2C_ADDR in addresses[:-1]:
+            raise ValueError(f"Only the last sensor may keep the default address 0x{DEFAULT_I2C_ADDR:02x}")
+        if ranging not in RANGING_MODES:
+            raise ValueError(f"Ranging mode must be one of {', '.join(RANGING_MODES)}")
+
+        self._xshut_lines = xshut_lines
+        self._addresses = addresses
+        self._offsets = offsets
+        self._ranging = ranging
+        self._i2c_bus = i2c_bus
+        self._boot_time = boot_time
+        self._sleep = sleep
+        self._ranging_started = False
+        self._owns_bus = bus is None
+        self._bus = SMBus(i2c_bus) if bus is None else bus
+        self._sensors = []
+
+        # Bring the sensors up one at a time, then attach a driver to each at its new address
+        self.assign_addresses()
+        self._sensors = [sensor_factory(i2c_bus = i2c_bus, i2c_addr = address, **sensor_options)
+                         for address in addresses]
+
+    # Getter for the sensors in array order; the first is the primary sensor
+    @property
+    def sensors(self):
+        return self._sensors
+
+    # Getter for the primary sensor
+    @property
+    def primary(self):
+        return self._sensors[0]
+
+    # Getter for sensor I2C addresses
+    @property
+    def addresses(self):
+        return self._addresses
+
+    # Getter for sensor angular offsets from the motor angle (degrees)
+    @property
+    def offsets(self):
+        return self._offsets
+
+    # Getter for ranging mode
+    @property
+    def ranging(self):
+        return self._ranging
+
+    def assign_addresses(self):
+        '''
+        Hold every sensor in reset, then release them one at a time and move each to its address
+        '''
+        for line in self._xshut_lines:
+            line.set_value(0)
+        self._sleep(self._boot_time)
+        for i, (line, address) in enumerate(zip(self._xshut_lines, self._addresses)):
+            line.set_value(1)
+            self._sleep(self._boot_time)
+            if not probe_address(self._bus, DEFAULT_I2C_ADDR):
+                raise RuntimeError(f"No sensor answered at 0x{DEFAULT_I2C_ADDR:02x} after releasing XSHUT line {i}")
+            if address != DEFAULT_I2C_ADDR:
+                set_i2c_address(self._bus, DEFAULT_I2C_ADDR, address)
+                if not probe_address(self._bus, address):
+                    raise RuntimeError(f"Sensor {i} did not move to address 0x{address:02x}")
+        print(f"Sensor array addresses assigned: {', '.join(f'0x{address:02x}' for address in self._addresses)}")
+
+    def initialize_ranging(self):
+        '''
+        Start continuous ranging on every sensor; interleaved arrays start each sensor as it is read
+        '''
+        if self._ranging == "simultaneous":
+            for sensor in self._sensors:
+                sensor.initialize_ranging()
+        self._ranging_started = True
+
+    def stop_ranging(self):
+        if self._ranging == "simultaneous":
+            for sensor in self._sensors:
+                sensor.stop_ranging()
+        self._ranging_started = False
+
+    def _read(self, sensor, timeout):
+        if self._ranging == "simultaneous":
+            return sensor.read_sensor(timeout = timeout)
+        sensor.initialize_ranging()
+        try:
+            return sensor.read_sensor(timeout = timeout)
+        finally:
+            sensor.stop_ranging()
+
+    def read_sensor(self, out=None, timeout=5):
+        '''
+        One reading from the primary sensor
+        '''
+        if not self._ranging_started:
+            raise RuntimeError("Sensor array ranging has not been started")
+        reading = self._read(self.primary, timeout)
+        if out is None:
+            return reading
+        return self.primary.last_reading(out)
+
+    def last_reading(self, out=None):
+        return self.primary.last_reading(out)
+
+    def read_all(self, first=0, timeout=5):
+        '''
+        One reading from every sensor from index first on, in array order.
+        Each reading is owned by its sensor and overwritten on that sensor's next read.
+        '''
+        if not self._ranging_started:
+            raise RuntimeError("Sensor array ranging has not been started")
+        return [self._read(sensor, timeout) for sensor in self._sensors[first:]]
+
+    def acquire(self, n, target_precision=None):
+        '''
+        Batched acquisition on the primary sensor; in interleaved mode it ranges alone meanwhile
+        '''
+        if not self._ranging_started:
+            raise RuntimeError("Sensor array ranging has not been started")
+        if self._ranging == "simultaneous":
+            return self.primary.acquire(n, target_precision = target_precision)
+        self.primary.initialize_ranging()
+        try:
+            return self.primary.acquire(n, target_precision = target_precision)
+        finally:
+            self.primary.stop_ranging()
+
+    def set_roi(self, x, y):
+        for sensor in self._sensors:
+            sensor.set_roi(x, y)
+
+    def set_ranging_profile(self, profile):
+        for sensor in self._sensors:
+            sensor.set_ranging_profile(profile)
+
+    def close(self):
+        '''
+        Hold every sensor in reset and release the bus and lines
+        '''
+        for line in self._xshut_lines:
+            line.set_value(0)
+            line.close()
+        if self._owns_bus:
+            self._bus.close()
+
+class Simulated_XSHUT_Line:
+    '''
+    Stand-in XSHUT line powering one simulated sensor
+    '''
+    def __init__(self, sensor):
+        self._sensor = sensor
+
+    def set_value(self, value):
+        self._sensor.set_powered(bool(value))
+
+    def close(self):
+        pass
+
+class Simulated_ToF:
+    '''
+    Stand-in VL53L1X on a simulated bus: boots at the default address, moves on an address
+    register write, and ranges one reading per call while ranging is started
+    '''
+    def __init__(self, bus, distance=100):
+        self._bus = bus
+        self._distance = distance
+        self._powered = False
+        self._ranging = False
+        self._roi = None
+        self._profile = None
+        self._reading = ToF_Reading()
+        self.address = DEFAULT_I2C_ADDR
+        self.reads = 0
+        bus.attach(self)
+
+    # Getter for power state
+    @property
+    def powered(self):
+        return self._powered
+
+    # Getter for ranging state
+    @property
+    def ranging(self):
+        return self._ranging
+
+    # Getter for configured ROI
+    @property
+    def roi(self):
+        return self._roi
+
+    # Getter for configured ranging profile
+    @property
+    def profile(self):
+        return self._profile
+
+    def set_powered(self, powered):
+        # Leaving reset reboots the sensor at the default address
+        if powered and not self._powered:
+            self.address = DEFAULT_I2C_ADDR
+        self._powered = powered
+        if not powered:
+            self._ranging = False
+
+    def write_register(self, register, value):
+        if register == I2C_ADDRESS_REGISTER:
+            self.address = value & 0x7F
+
+    def initialize_ranging(self):
+        self._ranging = True
+        self._bus.ranging_changed()
+
+    def stop_ranging(self):
+        self._ranging = False
+
+    def read_sensor(self, out=None, timeout=5):
+        if not self._ranging:
+            raise TimeoutError("Timeout waiting for VL53L1 sensor polling")
+        self.reads += 1
+        reading = self._reading if out is None else out
+        reading.status = 0
+        reading.distance = self._distance() if callable(self._distance) else self._distance
+        return reading
+
+    def last_reading(self, out=None):
+        if out is None:
+            return self._reading
+        for field in ToF_Reading.__slots__:
+            setattr(out, field, getattr(self._reading, field))
+        return out
+
+    def acquire(self, n, target_precision=None):
+        distances = [self.read_sensor().distance for _ in range(n)]
+        return {"median": sorted(distances)[len(distances) // 2], "samples": n, "valid": n}
+
+    def set_roi(self, x, y):
+        self._roi = (x, y)
+
+    def set_ranging_profile(self, profile):
+        self._profile = profile
+
+class Simulated_I2C_Bus:
+    '''
+    Stand-in SMBus carrying simulated sensors.
+    Like the real bus, a write reaches every powered device at its address.
+    '''
+    def __init__(self):
+        self._devices = []
+        self.max_ranging = 0
+
+    def attach(self, device):
+        self._devices.append(device)
+
+    def devices_at(self, address):
+        return [device for device in self._devices if device.powered and device.address == address]
+
+    def sensor_at(self, i2c_bus=DEFAULT_I2C_BUS, i2c_addr=DEFAULT_I2C_ADDR, **options):
+        '''
+        Sensor factory for ToF_Array: the simulated sensor answering at the address
+        '''
+        devices = self.devices_at(i2c_addr)
+        if len(devices) != 1:
+            raise OSError(f"{len(devices)} devices answer at 0x{i2c_addr:02x}")
+        return devices[0]
+
+    def ranging_changed(self):
+        self.max_ranging = max(self.max_ranging, sum(1 for device in self._devices if device.ranging))
+
+    def i2c_rdwr(self, *messages):
+        for message in messages:
+            devices = self.devices_at(message.addr)
+            if not devices:
+                raise OSError(121, "Remote I/O error")
+            if not message.flags & 1:
+                data = bytes(message)
+                for device in devices:
+                    device.write_register((data[0] << 8) | data[1], data[2])
+
+    def close(self):
+        pass
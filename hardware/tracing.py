@@ -0,0 +1,147 @@
+"""
+Span tracing across the agent and real-time processes
+Spans are timestamped on the system-wide monotonic clock, so spans from both processes
+share one time base.  Each process buffers its spans and flushes them to a part file next
+to the trace; export() merges the parts into one Chrome trace for chrome://tracing or
+https://ui.perfetto.dev.
+
+Tracing is off unless enable() is called or the SCANNER_TRACE environment variable names
+the trace file.  When off, span() returns one shared no-op context manager.
+
+Usage:
+    with tracing.span("agent.update_angle", turn=3):
+        ...
+"""
+import os
+import glob
+import json
+import time
+import threading
+import contextlib
+
+TRACE_ENV = "SCANNER_TRACE"
+# Buffered spans written out before the buffer grows past this many events
+FLUSH_EVENTS = 10000
+
+_NULL_SPAN = contextlib.nullcontext()
+_lock = threading.Lock()
+_path = os.environ.get(TRACE_ENV) or None
+_events = []
+_events_pid = os.getpid()
+_process_name = None
+_named_pid = None
+
+class _Span:
+    '''
+    Complete ("X") trace event recorded when the block exits
+    '''
+    __slots__ = ("_name", "_args", "_start")
+
+    def __init__(self, name, args):
+        self._name = name
+        self._args = args
+
+    def __enter__(self):
+        self._start = time.monotonic_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.monotonic_ns()
+        if exc_type is not None:
+            self._args["error"] = exc_type.__name__
+        _record(self._name, self._start, end, self._args)
+        return False
+
+def enabled():
+    return _path is not None
+
+# Trace file of this run, or None when tracing is off
+def trace_path():
+    return _path
+
+def enable(path):
+    '''
+    Start tracing to the given Chrome trace file.  Child processes started afterwards trace too.
+    Part files left over from an earlier run of the same trace are discarded.
+    '''
+    global _path
+    _path = os.path.abspath(path)
+    os.environ[TRACE_ENV] = _path
+    for part in glob.glob(f"{glob.escape(_path)}.*.part"):
+        os.remove(part)
+
+def disable():
+    global _path, _events
+    _path = None
+    os.environ.pop(TRACE_ENV, None)
+    with _lock:
+        _events = []
+
+def set_process_name(name):
+    '''
+    Label this process's track in the trace viewer
+    '''
+    global _process_name
+    _process_name = name
+
+def span(name, **args):
+    '''
+    Context manager timing a block as one span; free when tracing is off
+    '''
+    if _path is None:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+def _record(name, start, end, args):
+    global _events, _events_pid
+    pid = os.getpid()
+    event = {"name": name, "ph": "X", "ts": start / 1000, "dur": (end - start) / 1000,
+             "pid": pid, "tid": threading.get_native_id(), "args": args}
+    with _lock:
+        # A forked child starts with an empty buffer rather than its parent's spans
+        if pid != _events_pid:
+            _events = []
+            _events_pid = pid
+        _events.append(event)
+        full = len(_events) >= FLUSH_EVENTS
+    if full:
+        flush()
+
+def flush():
+    '''
+    Append this process's buffered spans to its part file
+    '''
+    global _events, _named_pid
+    if _path is None:
+        return
+    pid = os.getpid()
+    with _lock:
+        events = _events if pid == _events_pid else []
+        _events = []
+    if _process_name is not None and _named_pid != pid:
+        events.insert(0, {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": _process_name}})
+        _named_pid = pid
+    if not events:
+        return
+    with open(f"{_path}.{pid}.part", "a") as file:
+        for event in events:
+            file.write(json.dumps(event) + "\n")
+
+def export(path=None):
+    '''
+    Flush this process and merge the part files of every process into one Chrome trace.
+    Returns the number of trace events written.
+    '''
+    path = path or _path
+    if path is None:
+        return 0
+    flush()
+    events = []
+    for part in sorted(glob.glob(f"{glob.escape(os.path.abspath(path))}.*.part")):
+        with open(part, "r") as file:
+            events.extend(json.loads(line) for line in file if line.strip())
+        os.remove(part)
+    events.sort(key=lambda event: event.get("ts", 0))
+    with open(path, "w") as file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+    return len(events)
@@ -0,0 +1,19 @@
+#ifndef FAKE_GPIOD_H
+#define FAKE_GPIOD_H
+
+/*
+ * gpiod.h (fake)
+ *
+ * Description:
+ *     Minimal stand-in for the libgpiod v2 header so the motor driver builds on hosts
+ *     without libgpiod.  Only the types used by the driver sources are declared; the
+ *     fake GPIO backend (motor_gpio_fake.c) replaces motor_gpio.c.
+ */
+
+enum gpiod_line_value {
+    GPIOD_LINE_VALUE_ERROR = -1,
+    GPIOD_LINE_VALUE_INACTIVE = 0,
+    GPIOD_LINE_VALUE_ACTIVE = 1,
+};
+
+#endif // FAKE_GPIOD_H
@@ -0,0 +1,64 @@
+/*
+ * motor_gpio_fake.c
+ *
+ * Description:
+ *     Fake GPIO backend for the stepper motor driver. Instead of driving the H-bridge pins
+ *     it records every output state change with a CLOCK_MONOTONIC timestamp, so step timing
+ *     and speed profiles can be tested on any Linux host.
+ *
+ *     Build with: make motor_driver_fake.so
+ */
+
+#include "motor_gpio.h"
+#include <time.h>
+
+#define FAKE_GPIO_MAX_EVENTS 65536
+
+/* Recorded step events: timestamp in seconds and the 4 line values packed as bits */
+static double event_times[FAKE_GPIO_MAX_EVENTS];
+static int event_states[FAKE_GPIO_MAX_EVENTS];
+static int event_count = 0;
+
+int gpio_init(const char *gpiochip_name, const unsigned int *gpio_pins)
+{
+    event_count = 0;
+    return 0;
+}
+
+int gpio_set_states(enum gpiod_line_value *gpio_states)
+{
+    struct timespec now;
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    if (event_count < FAKE_GPIO_MAX_EVENTS) {
+        int packed = 0;
+        for (int i = 0; i < 4; i++) {
+            packed |= (gpio_states[i] == GPIOD_LINE_VALUE_ACTIVE) << i;
+        }
+        event_times[event_count] = now.tv_sec + now.tv_nsec * 1e-9;
+        event_states[event_count] = packed;
+        event_count++;
+    }
+    return 0;
+}
+
+/*
+ * Copies up to max_events recorded events into the caller's arrays.
+ * Returns the number of events copied.
+ */
+int fake_gpio_get_events(double *times, int *states, int max_events)
+{
+    int count = event_count < max_events ? event_count : max_events;
+    for (int i = 0; i < count; i++) {
+        times[i] = event_times[i];
+        states[i] = event_states[i];
+    }
+    return count;
+}
+
+/*
+ * Discards all recorded events.
+ */
+void fake_gpio_reset(void)
+{
+    event_count = 0;
+}
@@ -18,6 +18,10 @@
 #include <stdlib.h>
 #include "motor_gpio.h"
 
+/* Step wake-up latency histogram: bins of MOTOR_JITTER_BIN_US, the last bin collects the overflow */
+#define MOTOR_JITTER_BINS 64
+#define MOTOR_JITTER_BIN_US 10
+
 
 /* 
  * Initializes the motor control drive system.
@@ -36,6 +40,17 @@ int driver_init(const char* gpiochip_name, const unsigned int* gpio_pins);
  */
 int motor_init(float speed);
 
+/*
+ * Configures trapezoidal acceleration and deceleration ramps for all following moves.
+ * Moves start and end at start_speed and ramp to the cruise speed set by motor_init.
+ * An acceleration of 0 disables the ramps (constant speed, the motor_init default).
+ * 
+ * Parameters:
+ *     acceleration - Ramp rate in degrees per second squared.
+ *     start_speed - Speed of the first and last step in degrees per second.
+ */
+int motor_set_acceleration(float acceleration, float start_speed);
+
 /*
  * Moves the motor to a specified target position using full step mode.
  * 
@@ -52,6 +67,68 @@ int motor_set_position_full_step(float position);
  */
 int motor_set_position_half_step(float position);
 
+/*
+ * Starts a move on a worker thread and returns immediately.
+ * Only one move runs at a time; blocking moves fail while it is in progress.
+ * 
+ * Parameters:
+ *     step_type - Full step (1) or half step (2) motor control.
+ *     position - The angle in degrees to move the motor by.
+ * Returns:
+ *     0 when the move started, -1 if a move is already running or the thread failed to start.
+ */
+int motor_move_async(int step_type, float position);
+
+/*
+ * Returns 1 while an asynchronous move is in progress, otherwise 0.
+ */
+int motor_move_busy(void);
+
+/*
+ * Blocks until the asynchronous move completes.
+ * 
+ * Parameters:
+ *     timeout_ms - Maximum time to wait in milliseconds; negative waits indefinitely.
+ * Returns:
+ *     0 when no move is running, 1 on timeout, -1 if the last move failed.
+ */
+int motor_move_wait(int timeout_ms);
+
+/*
+ * Requests the running move to stop after its current step.
+ * Completion is still signalled through motor_move_wait.
+ */
+int motor_move_cancel(void);
+
+/*
+ * Current motor position in half steps (0.9 degrees) since motor_init,
+ * updated after every step, including during an asynchronous move.
+ */
+int motor_get_step_position(void);
+
+/*
+ * Enables or disables recording of step timing jitter and clears the histogram.
+ * Each step sleeps until an absolute CLOCK_MONOTONIC deadline; the histogram counts how
+ * late the step loop woke up after each deadline.
+ * 
+ * Parameters:
+ *     enable - 1 to record step latencies, 0 to stop recording.
+ */
+int motor_jitter_enable(int enable);
+
+/*
+ * Copies the step latency histogram recorded since motor_jitter_enable.
+ * 
+ * Parameters:
+ *     counts - Array receiving up to num_bins step counts, bin i covering
+ *              i * MOTOR_JITTER_BIN_US to (i + 1) * MOTOR_JITTER_BIN_US microseconds late.
+ *     num_bins - Size of the counts array.
+ *     max_us - Receives the largest recorded latency in microseconds.
+ * Returns:
+ *     Number of bins copied.
+ */
+int motor_jitter_histogram(unsigned int *counts, int num_bins, unsigned int *max_us);
+
 /*
  * Stops motor operation and halts all movement.
  * Stops energizing all motor phases.
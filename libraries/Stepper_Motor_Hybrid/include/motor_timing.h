@@ -23,41 +23,18 @@ typedef struct
 {
     bool operational;
     float speed;
+    float acceleration;
+    float start_speed;
     int position;
     int last_step;
+    int half_step_position;
+    int cancel_requested;
     
 } Motor_State_t;
 
-/*
- * @struct Motor_full_step_logic_t
- * @brief Represents the step logic for the motor
- *
- * This structure provides the step logic for the motor for full step mode
- */
-typedef struct {
-    enum gpiod_line_value gpio_step0[4];
-    enum gpiod_line_value gpio_step1[4];
-    enum gpiod_line_value gpio_step2[4];
-    enum gpiod_line_value gpio_step3[4];
-} Motor_full_step_logic_t;
-
-
-/*
- * @struct Motor_half_step_logic_t
- * @brief Represents the step logic for the motor
- *
- * This structure provides the step logic for the motor for half step mode
- */
-typedef struct {
-    enum gpiod_line_value gpio_step0[4];
-    enum gpiod_line_value gpio_step1[4];
-    enum gpiod_line_value gpio_step2[4];
-    enum gpiod_line_value gpio_step3[4];
-    enum gpiod_line_value gpio_step4[4];
-    enum gpiod_line_value gpio_step5[4];
-    enum gpiod_line_value gpio_step6[4];
-    enum gpiod_line_value gpio_step7[4];
-} Motor_half_step_logic_t;
+/* Phases per electrical cycle: rows of the GPIO phase tables */
+#define MOTOR_FULL_STEP_PHASES 4
+#define MOTOR_HALF_STEP_PHASES 8
 
 /* 
  * Initializes the motor control timing.
@@ -69,4 +46,19 @@ typedef struct {
   * Returns:
  *     0 on success, -1 on failure.
  */
-int motor_drive(int step_type, float position);
\ No newline at end of file
+int motor_drive(int step_type, float position);
+
+/*
+ * Pause after a step of a move following the trapezoidal speed profile.
+ * Speed starts at start_speed, rises at the configured acceleration until the cruise
+ * speed, and falls at the same rate to reach start_speed again on the last step.
+ * Short moves never reach the cruise speed (triangular profile).
+ *
+ * Parameters:
+ *      step_index is the zero based index of the step within the move
+ *      num_steps is the total number of steps of the move
+ *      step_size is the angle of one step in degrees
+ * Returns:
+ *     pause in microseconds.
+ */
+int motor_step_pause_us(int step_index, int num_steps, float step_size);
\ No newline at end of file
@@ -14,6 +14,9 @@
 #include "motor_control_api.h" 
 #include "motor_gpio.h"   
 #include "motor_timing.h" 
+#include <errno.h>
+#include <pthread.h>
+#include <time.h>
 
 // GPIO Initialization output states to ensure no current is going through the motor windings
 enum gpiod_line_value gpio_initial_states[] = {GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE};
@@ -21,6 +24,13 @@ enum gpiod_line_value gpio_initial_states[] = {GPIOD_LINE_VALUE_INACTIVE, GPIOD_
 /* Instantiate motor instance for global access */
 Motor_State_t *motor_state = NULL;
 
+/* Asynchronous move: one worker thread at a time, completion signalled on move_done */
+static pthread_mutex_t move_lock = PTHREAD_MUTEX_INITIALIZER;
+static pthread_cond_t move_done = PTHREAD_COND_INITIALIZER;
+static int move_step_type = 0;
+static float move_position = 0;
+static int move_status = 0;
+
 int driver_init(const char* gpiochip_name, const unsigned int* gpio_pins) 
 {
     int gpio_status = gpio_init(gpiochip_name, gpio_pins);
@@ -46,17 +56,44 @@ int motor_init(float speed)
     // Initialize motor states
     motor_state->operational = false;
     motor_state->speed = speed;
+    motor_state->acceleration = 0;
+    motor_state->start_speed = speed;
     motor_state->position = 0;
     motor_state->last_step = 0;
+    motor_state->half_step_position = 0;
+    motor_state->cancel_requested = 0;
 
     return 0;
 }
 
 
-int motor_set_position_full_step(float position) 
+int motor_set_acceleration(float acceleration, float start_speed) 
 {
+    if (!motor_state || acceleration < 0 || start_speed <= 0) {
+        return -1;
+    }
+
+    // Ramps never start above the cruise speed
+    motor_state->acceleration = acceleration;
+    motor_state->start_speed = start_speed < motor_state->speed ? start_speed : motor_state->speed;
+
+    return 0;
+}
+
+static int motor_set_position(int step_type, float position) 
+{
+    // Blocking moves never run alongside an asynchronous move
+    pthread_mutex_lock(&move_lock);
+    bool busy = !motor_state || motor_state->operational;
+    if (!busy) {
+        motor_state->cancel_requested = 0;
+    }
+    pthread_mutex_unlock(&move_lock);
+    if (busy) {
+        return -1;
+    }
+
     // Drive motor
-    int step_type = 1;
     int status = motor_drive(step_type, position);
     if (status){
         return -1;
@@ -65,21 +102,121 @@ int motor_set_position_full_step(float position)
     return 0;
 }
 
+int motor_set_position_full_step(float position) 
+{
+    return motor_set_position(1, position);
+}
+
 int motor_set_position_half_step(float position) 
 {
-    // Drive motor
-    int step_type = 2;
-    int status = motor_drive(step_type, position);
-    if (status){
+    return motor_set_position(2, position);
+}
+
+static void *motor_move_worker(void *arg)
+{
+    int status = motor_drive(move_step_type, move_position);
+
+    // Flag completion to waiting callers
+    pthread_mutex_lock(&move_lock);
+    move_status = status;
+    motor_state->operational = false;
+    pthread_cond_broadcast(&move_done);
+    pthread_mutex_unlock(&move_lock);
+    return NULL;
+}
+
+int motor_move_async(int step_type, float position) 
+{
+    if (step_type != 1 && step_type != 2) {
         return -1;
     }
 
+    pthread_mutex_lock(&move_lock);
+    if (!motor_state || motor_state->operational) {
+        pthread_mutex_unlock(&move_lock);
+        return -1;
+    }
+    motor_state->operational = true;
+    motor_state->cancel_requested = 0;
+    move_step_type = step_type;
+    move_position = position;
+
+    // Detached worker; completion is observed through the motor state and move_done
+    pthread_t worker;
+    int status = pthread_create(&worker, NULL, motor_move_worker, NULL);
+    if (status == 0) {
+        pthread_detach(worker);
+    } else {
+        motor_state->operational = false;
+    }
+    pthread_mutex_unlock(&move_lock);
+
+    return status == 0 ? 0 : -1;
+}
+
+int motor_move_busy(void) 
+{
+    pthread_mutex_lock(&move_lock);
+    int busy = motor_state && motor_state->operational;
+    pthread_mutex_unlock(&move_lock);
+    return busy;
+}
+
+int motor_move_wait(int timeout_ms) 
+{
+    struct timespec deadline;
+    clock_gettime(CLOCK_REALTIME, &deadline);
+    deadline.tv_sec += timeout_ms / 1000;
+    deadline.tv_nsec += (long)(timeout_ms % 1000) * 1000000L;
+    if (deadline.tv_nsec >= 1000000000L) {
+        deadline.tv_nsec -= 1000000000L;
+        deadline.tv_sec++;
+    }
+
+    pthread_mutex_lock(&move_lock);
+    int status = 0;
+    while (motor_state && motor_state->operational) {
+        if (timeout_ms < 0) {
+            pthread_cond_wait(&move_done, &move_lock);
+        } else if (pthread_cond_timedwait(&move_done, &move_lock, &deadline) == ETIMEDOUT) {
+            status = 1;
+            break;
+        }
+    }
+    if (status == 0 && move_status != 0) {
+        status = -1;
+    }
+    pthread_mutex_unlock(&move_lock);
+
+    return status;
+}
+
+int motor_move_cancel(void) 
+{
+    if (!motor_state) {
+        return -1;
+    }
+    __atomic_store_n(&motor_state->cancel_requested, 1, __ATOMIC_RELEASE);
+
     return 0;
 }
 
+int motor_get_step_position(void) 
+{
+    if (!motor_state) {
+        return 0;
+    }
+
+    return __atomic_load_n(&motor_state->half_step_position, __ATOMIC_ACQUIRE);
+}
+
 
 int motor_stop(void) 
 {
+    // Finish any asynchronous move before releasing the motor
+    motor_move_cancel();
+    motor_move_wait(-1);
+
     // Set GPIOs to inactive
     int initial_status = gpio_set_states(gpio_initial_states);
     if (initial_status){
@@ -11,141 +11,154 @@
 #include "motor_timing.h"
 #include "motor_control_api.h"
 #include "motor_gpio.h"
+#include <errno.h>
 #include <math.h>
-#include <unistd.h>
+#include <string.h>
+#include <time.h>
 
 extern Motor_State_t *motor_state;
 
-/* GPIO state control logic */
+/* GPIO state control logic: one row of H-bridge line values per phase */
 // Full Step Logic
-Motor_full_step_logic_t motor_full_step_logic = {
-    .gpio_step0 = {GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE},
-    .gpio_step1 = {GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE},
-    .gpio_step2 = {GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE},
-    .gpio_step3 = {GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE}
+static enum gpiod_line_value full_step_phases[MOTOR_FULL_STEP_PHASES][4] = {
+    {GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE},
+    {GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE},
+    {GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE},
+    {GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE}
 };
 // Half Step Logic
-Motor_half_step_logic_t motor_half_step_logic = {
-    .gpio_step0 = {GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE},
-    .gpio_step1 = {GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE},
-    .gpio_step2 = {GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE},
-    .gpio_step3 = {GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE},
-    .gpio_step4 = {GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE},
-    .gpio_step5 = {GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE},
-    .gpio_step6 = {GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE},
-    .gpio_step7 = {GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE}
+static enum gpiod_line_value half_step_phases[MOTOR_HALF_STEP_PHASES][4] = {
+    {GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE},
+    {GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE},
+    {GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE},
+    {GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE},
+    {GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE},
+    {GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE},
+    {GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_INACTIVE},
+    {GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE, GPIOD_LINE_VALUE_ACTIVE, GPIOD_LINE_VALUE_INACTIVE}
 };
 
+/* Step wake-up latency histogram */
+static bool jitter_enabled = false;
+static unsigned int jitter_counts[MOTOR_JITTER_BINS];
+static unsigned int jitter_max_us = 0;
+
+static void deadline_add_us(struct timespec *deadline, int pause_us)
+{
+    deadline->tv_nsec += (long)pause_us * 1000;
+    while (deadline->tv_nsec >= 1000000000L) {
+        deadline->tv_nsec -= 1000000000L;
+        deadline->tv_sec++;
+    }
+}
+
+static void record_jitter(const struct timespec *deadline)
+{
+    struct timespec now;
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    long late_ns = (now.tv_sec - deadline->tv_sec) * 1000000000L + (now.tv_nsec - deadline->tv_nsec);
+    unsigned int late_us = late_ns > 0 ? (unsigned int)(late_ns / 1000) : 0;
+    unsigned int bin = late_us / MOTOR_JITTER_BIN_US;
+    jitter_counts[bin < MOTOR_JITTER_BINS ? bin : MOTOR_JITTER_BINS - 1]++;
+    if (late_us > jitter_max_us) {
+        jitter_max_us = late_us;
+    }
+}
+
 int motor_drive(int step_type, float position)
 {
-    
+    enum gpiod_line_value (*phases)[4];
+    int num_phases;
+    float step_size;
+
     // Full step motor control
     if (step_type == 1)
     {
-        float full_step_size = 1.8;
-        float full_step_num_steps = abs(position) / full_step_size;
-        int pause_us = (int)(1e6 / (motor_state->speed) * full_step_size);
-        int last_step = motor_state->last_step;
-        int executed_steps = 0;
-        
-        // Execute motor steps
-        while (executed_steps < full_step_num_steps) {
-            if (position > 0)
-            {
-                last_step = (last_step + 1) % 4;
-            } else
-            {
-                last_step = (last_step + 3) % 4;
-            }
-        
-            switch (last_step)
-            {
-                case 0:
-                    gpio_set_states(motor_full_step_logic.gpio_step0);
-                    break;
-                case 1:
-                    gpio_set_states(motor_full_step_logic.gpio_step1);
-                    break;
-                case 2:
-                    gpio_set_states(motor_full_step_logic.gpio_step2);
-                    break;   
-                case 3:
-                    gpio_set_states(motor_full_step_logic.gpio_step3);
-                    break; 
-                default:
-                    break;
-            }
-                // Software pause to control speed and updated step count
-                executed_steps++;
-                usleep(pause_us);
-        }
-        // Update the step state and position
-        motor_state->last_step = last_step;
-        motor_state->position += position;
-        return 0;
-    } 
-    
+        phases = full_step_phases;
+        num_phases = MOTOR_FULL_STEP_PHASES;
+        step_size = 1.8;
+    }
     // Half step motor control
     else if (step_type == 2)
     {
-        float half_step_size = 0.9;
-        float half_step_num_steps = abs(position) / half_step_size;
-        int pause_us = (int)(1e6 / (motor_state->speed) * half_step_size);
-        int last_step = motor_state->last_step;
-        int executed_steps = 0;
-        
-        // Execute motor steps
-        while (executed_steps < half_step_num_steps) {
-            if (position > 0)
-            {
-                last_step = (last_step + 1) % 8;
-            } else
-            {
-                last_step = (last_step + 7) % 8;
-            }
-        
-            switch (last_step)
-            {
-                case 0:
-                    gpio_set_states(motor_half_step_logic.gpio_step0);
-                    break;
-                case 1:
-                    gpio_set_states(motor_half_step_logic.gpio_step1);
-                    break;
-                case 2:
-                    gpio_set_states(motor_half_step_logic.gpio_step2);
-                    break;   
-                case 3:
-                    gpio_set_states(motor_half_step_logic.gpio_step3);
-                    break; 
-                case 4:
-                    gpio_set_states(motor_half_step_logic.gpio_step4);
-                    break;
-                case 5:
-                    gpio_set_states(motor_half_step_logic.gpio_step5);
-                    break;
-                case 6:
-                    gpio_set_states(motor_half_step_logic.gpio_step6);
-                    break;   
-                case 7:
-                    gpio_set_states(motor_half_step_logic.gpio_step7);
-                    break; 
-                default:
-                    break;
-            }
-                // Software pause to control speed and updated step count
-                executed_steps++;
-                usleep(pause_us);
-        }
-        // Update the step state and position
-        motor_state->last_step = last_step;
-        motor_state->position += position;
-        return 0;
-    } 
-    
+        phases = half_step_phases;
+        num_phases = MOTOR_HALF_STEP_PHASES;
+        step_size = 0.9;
+    }
     else
     {
         return -1;
     }
-    
-}
\ No newline at end of file
+
+    int num_steps = (int)lroundf(fabsf(position) / step_size);
+    int direction = position > 0 ? 1 : num_phases - 1;
+    int half_steps = (position > 0 ? 1 : -1) * (step_type == 1 ? 2 : 1);
+    int last_step = motor_state->last_step;
+    int executed_steps = 0;
+
+    // Each step is due a fixed time after the previous deadline, so GPIO write time and
+    // scheduler latency delay single steps without accumulating into speed error
+    struct timespec deadline;
+    clock_gettime(CLOCK_MONOTONIC, &deadline);
+
+    // Execute motor steps; a cancelled move stops after the current step
+    for (; executed_steps < num_steps; executed_steps++)
+    {
+        if (__atomic_load_n(&motor_state->cancel_requested, __ATOMIC_ACQUIRE)) {
+            break;
+        }
+        last_step = (last_step + direction) % num_phases;
+        gpio_set_states(phases[last_step]);
+        __atomic_add_fetch(&motor_state->half_step_position, half_steps, __ATOMIC_RELEASE);
+
+        // Sleep until the absolute deadline following the speed profile
+        deadline_add_us(&deadline, motor_step_pause_us(executed_steps, num_steps, step_size));
+        while (clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME, &deadline, NULL) == EINTR) {
+        }
+        if (jitter_enabled) {
+            record_jitter(&deadline);
+        }
+    }
+
+    // Update the step state and position
+    motor_state->last_step = last_step;
+    motor_state->position += (position > 0 ? 1 : -1) * executed_steps * step_size;
+    return 0;
+}
+
+int motor_jitter_enable(int enable)
+{
+    jitter_enabled = enable != 0;
+    memset(jitter_counts, 0, sizeof(jitter_counts));
+    jitter_max_us = 0;
+    return 0;
+}
+
+int motor_jitter_histogram(unsigned int *counts, int num_bins, unsigned int *max_us)
+{
+    int bins = num_bins < MOTOR_JITTER_BINS ? num_bins : MOTOR_JITTER_BINS;
+    memcpy(counts, jitter_counts, bins * sizeof(unsigned int));
+    *max_us = jitter_max_us;
+    return bins;
+}
+
+int motor_step_pause_us(int step_index, int num_steps, float step_size)
+{
+    float speed = motor_state->speed;
+
+    // Cruise speed unless ramps are configured
+    if (motor_state->acceleration > 0)
+    {
+        // Distance from the nearer end of the move sets the ramp speed: v^2 = v0^2 + 2 a s
+        int steps_from_end = num_steps - 1 - step_index;
+        int ramp_steps = step_index < steps_from_end ? step_index : steps_from_end;
+        float ramp_speed = sqrtf(motor_state->start_speed * motor_state->start_speed
+                                 + 2.0f * motor_state->acceleration * ramp_steps * step_size);
+        if (ramp_speed < speed)
+        {
+            speed = ramp_speed;
+        }
+    }
+
+    return (int)(1e6 / speed * step_size);
+}
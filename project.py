@@ -9,20 +9,27 @@ import sys
 import os
 import multiprocessing
 import psutil
-import time
 import json
 import argparse
 import logging
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "hardware"))
 sys.path.append(os.path.join(os.path.dirname(__file__), "ai"))
-from agent_openai import OpenAIAgent
+from agent_openai import DEFAULT_MODEL
+from agent_factory import AGENTS, create_agent
+from response_cache import ResponseCache, CacheMissError, CACHE_MODES, DEFAULT_MAX_ENTRIES
 from simulation import Hardware_Sim
 from run_hardware import Hardware_Control
+from scene_geometry import BUILTIN_SCENES
+from VL53L1_wrapper import RANGING_PROFILES, DEFAULT_I2C_ADDR
+from ipc_utils import recv_latest, is_command, batch_command, sweep_command, measure_command, BATCH_COMMAND, SWEEP_COMMAND
+from telemetry_buffer import Telemetry_Ring_Buffer
+import tracing
 
 # System constants
 TARGET_ANGLE_IC = 0
 REAL_TIME_CORE = 3
+DEFAULT_GPIO_PINS = [17, 27, 23, 24]
 
 # Exit Codes
 EXIT_CODES = {
@@ -43,9 +50,9 @@ logging.basicConfig(
     ]
 )
 
-def parse_arguments():
+def build_parser():
     """
-    Parse command-line arguments.
+    Command-line arguments; channel configuration entries override the same option names.
     """
     parser = argparse.ArgumentParser(
         description="Motor Control and AI Integration Project."
@@ -55,14 +62,180 @@ def parse_arguments():
         help="Execution mode: 1 for hardware simulation, 2 for real hardware."
     )
     parser.add_argument(
-        "-p", "--prompt", type=int, choices=[1, 2, 3, 4, 5, 6], required=True,
+        "-p", "--prompt", type=int, choices=[1, 2, 3, 4, 5, 6, 7], required=True,
         help="Specify the prompt type to use (1 for Overly Descriptive, 2 for more to come)."
     )
     parser.add_argument(
-        "-a", "--agent", type=str, required=True,
-        help="Specify the ai agent type to use (openAI or openAI model 4o)."
+        "-a", "--agent", type=str, choices=sorted(AGENTS), required=True,
+        help="Specify the ai agent type to use (openAI, openAI-stream to act on the angle while the response streams, "
+             "or the classical grid-refine, golden-section, multi-start and sweep search agents)."
+    )
+    parser.add_argument(
+        "-g", "--geometry", type=str, choices=sorted(BUILTIN_SCENES), default="line",
+        help="Simulation mode scene geometry (mode 1 only)."
+    )
+    parser.add_argument(
+        "--lut-cache", type=str, default=None,
+        help="Directory to cache simulated scene distance tables (mode 1 only)."
+    )
+    parser.add_argument(
+        "--data-ready-pin", type=int, default=None,
+        help="GPIO line wired to the ToF sensor GPIO1 interrupt (mode 2 only; default: poll the sensor)."
+    )
+    parser.add_argument(
+        "--ranging-profile", type=str, choices=sorted(RANGING_PROFILES), default=None,
+        help="ToF ranging profile for single-angle measurements (mode 2 only; default: driver defaults)."
+    )
+    parser.add_argument(
+        "--sweep-profile", type=str, choices=sorted(RANGING_PROFILES), default="fast",
+        help="ToF ranging profile used during sweeps (mode 2 only)."
+    )
+    parser.add_argument(
+        "--samples", type=int, default=1,
+        help="ToF readings averaged (median) per measurement (mode 2 only)."
+    )
+    parser.add_argument(
+        "--target-precision", type=float, default=None,
+        help="Stop sampling once the 95%% confidence interval is within this many mm (mode 2 only)."
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--final-samples", type=int, default=1,
+        help="ToF readings averaged (median) for the agent's final angle only (mode 2 only)."
+    )
+    parser.add_argument(
+        "--motor-speed", type=float, default=90,
+        help="Stepper motor cruise speed in degrees per second (mode 2 only)."
+    )
+    parser.add_argument(
+        "--motor-acceleration", type=float, default=0,
+        help="Stepper motor ramp acceleration in degrees per second squared; 0 moves at constant speed (mode 2 only)."
+    )
+    parser.add_argument(
+        "--motor-jitter", action="store_true",
+        help="Record stepper step timing latency and print its distribution at shutdown (mode 2 only)."
+    )
+    parser.add_argument(
+        "--range-while-moving", action="store_true",
+        help="Move the motor asynchronously and keep ranging into telemetry during moves (mode 2 only)."
+    )
+    parser.add_argument(
+        "--model", type=str, default=DEFAULT_MODEL,
+        help="Chat completions model name."
+    )
+    parser.add_argument(
+        "--base-url", type=str, default=None,
+        help="OpenAI-compatible API base URL, e.g. the local stand-in server (default: OpenAI)."
+    )
+    parser.add_argument(
+        "--compact-context", action="store_true",
+        help="Send the agent a table of observations instead of the full conversation history each turn."
+    )
+    parser.add_argument(
+        "--batch", action="store_true",
+        help="Let the agent request several angles per turn and receive all (angle, distance) pairs at once (use with prompt 7)."
+    )
+    parser.add_argument(
+        "--cache", type=str, default=None,
+        help="SQLite file caching agent responses by model, prompt and context."
+    )
+    parser.add_argument(
+        "--cache-mode", type=str, choices=CACHE_MODES, default="read-through",
+        help="record: always query and store; replay: cached responses only (offline); read-through: query on a miss."
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=DEFAULT_MAX_ENTRIES,
+        help="Maximum number of cached responses; least recently used entries are evicted."
+    )
+    parser.add_argument(
+        "--ipc-timeout", type=float, default=None,
+        help="Seconds to wait for a hardware or agent message before shutting down (default: wait indefinitely)."
+    )
+    parser.add_argument(
+        "--record", type=str, default=None,
+        help="Record every measurement of the session to a binary file."
+    )
+    parser.add_argument(
+        "--replay", type=str, default=None,
+        help="Replay a recorded session to the agent instead of the simulated scene (mode 1 only)."
+    )
+    parser.add_argument(
+        "--profile", type=str, nargs="+", default=None,
+        help="Simulate from recorded scan profiles (session recordings or angle,distance CSV files) instead of a scene (mode 1 only)."
+    )
+    parser.add_argument(
+        "--profile-noise", action="store_true",
+        help="Add noise resampled from the readings recorded at each angle to simulated profile measurements."
+    )
+    parser.add_argument(
+        "--profile-seed", type=int, default=None,
+        help="Seed for profile noise resampling."
+    )
+    parser.add_argument(
+        "--trace", type=str, default=None,
+        help="Record per-turn spans in both processes and export them as a Chrome trace JSON file."
+    )
+    parser.add_argument(
+        "--core", type=int, default=REAL_TIME_CORE,
+        help=f"CPU core the real-time process is pinned to (default {REAL_TIME_CORE})."
+    )
+    parser.add_argument(
+        "--i2c-addr", type=lambda value: int(value, 0), default=DEFAULT_I2C_ADDR,
+        help="I2C address of the proximity sensor (mode 2 only)."
+    )
+    parser.add_argument(
+        "--gpio-pins", type=int, nargs=4, default=DEFAULT_GPIO_PINS,
+        help="Stepper motor GPIO lines (mode 2 only)."
+    )
+    parser.add_argument(
+        "--tof-array", type=str, default=None,
+        help="JSON sensor array configuration: xshut_pins, addresses, offsets (degrees) and ranging mode (mode 2 only)."
+    )
+    parser.add_argument(
+        "--channels", type=int, default=1,
+        help="Run this many independent scanner channels, each with its own real-time process, core and agent."
+    )
+    parser.add_argument(
+        "--channel-config", type=str, default=None,
+        help="JSON list of per-channel option overrides (e.g. mode, core, i2c_addr, gpio_pins, geometry, prompt)."
+    )
+    return parser
+
+def parse_arguments():
+    """
+    Parse command-line arguments.
+    """
+    return build_parser().parse_args()
+
+def get_hardware_options(args):
+    """
+    Collect optional keyword arguments for the hardware process from CLI arguments.
+    """
+    options = {"ipc_timeout": args.ipc_timeout}
+    if args.mode == 1:
+        options["geom_type"] = args.geometry
+        options["lut_cache_dir"] = args.lut_cache
+        options["replay_path"] = args.replay
+        options["profile_paths"] = args.profile
+        options["profile_noise"] = args.profile_noise
+        options["profile_seed"] = args.profile_seed
+    elif args.mode == 2:
+        options["i2c_addr"] = args.i2c_addr
+        options["gpio_pins"] = list(args.gpio_pins)
+        options["data_ready_pin"] = args.data_ready_pin
+        if args.tof_array is not None:
+            with open(args.tof_array, "r") as file:
+                options["tof_array"] = json.load(file)
+        options["measure_profile"] = args.ranging_profile
+        options["sweep_profile"] = args.sweep_profile
+        options["samples_per_measurement"] = args.samples
+        options["target_precision"] = args.target_precision
+        options["motor_speed"] = args.motor_speed
+        options["motor_acceleration"] = args.motor_acceleration
+        options["motor_jitter"] = args.motor_jitter
+        options["range_while_moving"] = args.range_while_moving
+    if args.record is not None:
+        options["record_path"] = args.record
+    return options
 
 def get_prompt(prompt):
     """
@@ -84,7 +257,7 @@ def get_prompt(prompt):
         logging.error("Invalid prompt. Please update promp library.")
         return None
 
-def initialize_system(mode):
+def initialize_system(mode, hardware_options=None, core=REAL_TIME_CORE):
     """
     Perform system initialization tasks:
      - Configure host environment
@@ -100,7 +273,7 @@ def initialize_system(mode):
     shutdown_event = multiprocessing.Event()
     realtime_process = multiprocessing.Process(
         target=run_system, 
-        args=(mode, child_conn, ipc_status_flag, init_event, error_event, shutdown_event)
+        args=(mode, child_conn, ipc_status_flag, init_event, error_event, shutdown_event, hardware_options)
     )
     realtime_process.start()
     
@@ -113,7 +286,7 @@ def initialize_system(mode):
         logging.info("System initialized successfully.")
         pid = realtime_process.pid
         p = psutil.Process(pid)
-        p.cpu_affinity([REAL_TIME_CORE])  
+        p.cpu_affinity([core])  
         hardware_status = 0
 
     # Send error return value if initialization fails
@@ -134,11 +307,14 @@ def initialize_system(mode):
 
     return parent_conn, realtime_process, hardware_status, ipc_status_flag, shutdown_event
 
-def run_system(mode, pipe_conn, ipc_status_flag, init_event, error_event, shutdown_event):
+def run_system(mode, pipe_conn, ipc_status_flag, init_event, error_event, shutdown_event,
+               hardware_options=None):
     """
     Motor control and environmental sensing subprocess.
     Process is killed if the hardware initialization fails.
     """
+    hardware_options = hardware_options or {}
+    tracing.set_process_name("hardware")
     try:
         if mode == 1:
             logging.info("Starting hardware simulation...")
@@ -148,9 +324,11 @@ def run_system(mode, pipe_conn, ipc_status_flag, init_event, error_event, shutdo
                 error_event = error_event,
                 shutdown_event = shutdown_event,
                 ipc_status_flag = ipc_status_flag, 
-                initial_angle = TARGET_ANGLE_IC)
+                initial_angle = TARGET_ANGLE_IC,
+                **hardware_options)
         elif mode == 2:
             logging.info("Starting proximity sensing and motor control...")
+            hardware_options = {"gpio_pins": DEFAULT_GPIO_PINS, **hardware_options}
             hardware = Hardware_Control(
                 conn = pipe_conn, 
                 init_event = init_event,
@@ -158,8 +336,7 @@ def run_system(mode, pipe_conn, ipc_status_flag, init_event, error_event, shutdo
                 shutdown_event = shutdown_event,
                 ipc_status_flag = ipc_status_flag, 
                 initial_angle = TARGET_ANGLE_IC, 
-                motor_speed = 90, 
-                gpio_pins = [17, 27, 23, 24]
+                **hardware_options
             )
         else:
             raise ValueError("Invalid mode")
@@ -174,7 +351,23 @@ def run_system(mode, pipe_conn, ipc_status_flag, init_event, error_event, shutdo
         logging.error(f"Unexpected error: {e}")
         sys.exit(EXIT_CODES["UNEXPECTED_ERROR"])
     
-def graceful_system_shutdown(pipe_conn, realtime_process, shutdown_event):
+def release_telemetry(telemetry):
+    '''
+    Unmap and destroy the shared memory telemetry buffer
+    '''
+    if telemetry is not None:
+        telemetry.close()
+        telemetry.unlink()
+
+def export_trace():
+    '''
+    Merge the spans of both processes into the Chrome trace file when tracing is on
+    '''
+    if tracing.enabled():
+        count = tracing.export()
+        logging.info(f"Trace with {count} events written to {tracing.trace_path()}")
+
+def graceful_system_shutdown(pipe_conn, realtime_process, shutdown_event, telemetry=None):
     '''
     Returns hardware to starting position
     Gracefully shuts down applications
@@ -186,9 +379,11 @@ def graceful_system_shutdown(pipe_conn, realtime_process, shutdown_event):
     pipe_conn.close()
     realtime_process.terminate()
     realtime_process.join()
+    release_telemetry(telemetry)
+    export_trace()
     sys.exit(EXIT_CODES["SUCCESS"])
 
-def unexpected_shutdown(error, pipe_conn, realtime_process,):
+def unexpected_shutdown(error, pipe_conn, realtime_process, telemetry=None):
     '''
     Handles premature shutdowns other than an ai agent completing its goal
     '''
@@ -196,6 +391,8 @@ def unexpected_shutdown(error, pipe_conn, realtime_process,):
     pipe_conn.close()
     realtime_process.terminate()
     realtime_process.join()
+    release_telemetry(telemetry)
+    export_trace()
     sys.exit(error)
 
 def initialize_agent(pipe_conn, args):
@@ -205,18 +402,27 @@ def initialize_agent(pipe_conn, args):
     status = 0
     aiAgent = None
     # Instantiate AI agent with desired model
-    if args.agent == "openAI":
-        logging.info("Initializing openAI agent...")
-        aiAgent = OpenAIAgent(TARGET_ANGLE_IC)      
+    if args.agent in AGENTS:
+        logging.info(f"Initializing {args.agent} agent...")
+        aiAgent = create_agent(args.agent, TARGET_ANGLE_IC, compact_context=args.compact_context,
+                               model=args.model, base_url=args.base_url, batch_mode=args.batch)
     else:
         logging.error("Invalid ai agent model")
         status = EXIT_CODES["INVALID_TYPE"]
 
     if status == 0:
+        # Serve repeated requests from the on-disk response cache
+        if args.cache is not None:
+            aiAgent.response_cache = ResponseCache(args.cache, mode=args.cache_mode, max_entries=args.cache_size)
+
         # Start communication with ai agent
         aiAgent.initial_prompt = get_prompt(str(args.prompt))  
-        aiAgent.connect_agent()
-        aiAgent.initialize_agent() 
+        try:
+            aiAgent.connect_agent()
+            aiAgent.initialize_agent() 
+        except (ValueError, CacheMissError) as e:
+            logging.error(f"Agent initialization failed: {e}")
+            return aiAgent, EXIT_CODES["UNEXPECTED_ERROR"]
 
         # Handle agent's initial response
         if aiAgent.comprehension == "nok":
@@ -230,54 +436,251 @@ def initialize_agent(pipe_conn, args):
 
     return aiAgent, status
 
-def main():
-    
-    # Parse input arguments for application flow control
-    args = parse_arguments()
+def load_channel_config(path, args):
+    """
+    Per-channel arguments: the CLI arguments with each channel's overrides from a JSON list.
+    Without a configuration file, --channels copies of the CLI arguments are used.
+    """
+    if path is None:
+        overrides = [{} for _ in range(args.channels)]
+    else:
+        with open(path, "r") as file:
+            overrides = json.load(file)
+        if not isinstance(overrides, list) or not overrides:
+            raise ValueError("Channel configuration must be a non-empty JSON list of option overrides")
+
+    channels = []
+    for channel, override in enumerate(overrides):
+        unknown = set(override) - set(vars(args))
+        if unknown:
+            raise ValueError(f"Unknown options in channel {channel} configuration: {', '.join(sorted(unknown))}")
+        channel_args = argparse.Namespace(**{**vars(args), **override})
+        if isinstance(channel_args.i2c_addr, str):
+            channel_args.i2c_addr = int(channel_args.i2c_addr, 0)
+        # Files written per run get one copy per channel unless the configuration names them
+        for option in ("trace", "record"):
+            value = getattr(channel_args, option)
+            if value is not None and option not in override:
+                root, ext = os.path.splitext(value)
+                setattr(channel_args, option, f"{root}.ch{channel}{ext}")
+        if "core" not in override:
+            channel_args.core = None
+        channels.append(channel_args)
+
+    # Channels without a configured core get their own, from the highest down
+    configured = {channel_args.core for channel_args in channels if channel_args.core is not None}
+    free = iter(channel_cores(len(channels), exclude=configured))
+    for channel_args in channels:
+        if channel_args.core is None:
+            channel_args.core = next(free)
+    return channels
+
+def channel_cores(count, exclude=()):
+    """
+    Cores for real-time processes, from the highest down, leaving core 0 to the agents and the OS.
+    Cores are shared once every available core has a channel.
+    """
+    available = sorted(os.sched_getaffinity(0), reverse=True)
+    cores = [core for core in available if core not in exclude and (core != 0 or len(available) == 1)]
+    cores = cores or available
+    if count > len(cores):
+        logging.warning(f"{count} channels share {len(cores)} real-time cores")
+    return [cores[i % len(cores)] for i in range(count)]
+
+def reply_measurements(message, telemetry, angle):
+    """
+    (angle, distance) pairs from a hardware reply; a single distance was measured at the agent's angle.
+    The distance always comes from the pipe.  Telemetry is only logged, since a sensor array publishes
+    its offset sensors' readings after the primary reading.
+    """
+    # A batch reply carries every (angle, distance) pair the agent asked for
+    if is_command(message, BATCH_COMMAND):
+        measurements = message["measurements"]
+        logging.info(f"Latest measurements are " + "; ".join(f"{a:g}: {d:g}" for a, d in measurements))
+        return measurements
+
+    # A sweep reply carries the whole distance profile
+    if is_command(message, SWEEP_COMMAND):
+        measurements = list(zip(message["angles"], message["distances"]))
+        logging.info(f"Swept {len(measurements)} angles from {measurements[0][0]:g} to {measurements[-1][0]:g}")
+        return measurements
+
+    # Full sensor record for the latest reading from shared memory telemetry
+    distance = float(message)
+    record = telemetry.read_latest()
+    if record is not None:
+        logging.info(f"Telemetry: angle {record['angle']:.1f}, distance {record['distance']:g}, "
+                     f"ambient {record['ambient']}, signal {record['signal']}, SPADs {record['spads']}, "
+                     f"status {record['status']}")
+    logging.info(f"Latest measured distance is " + str(distance))
+    return [(angle, distance)]
+
+def run_channel(args, channel=None, results=None):
+    """
+    Run one scanner: a real-time process pinned to its core and the agent loop in this process.
+    A supervised channel reports its result to the supervisor's queue before shutting down.
+    """
+    if channel is not None:
+        formatter = logging.Formatter(f"%(asctime)s [%(levelname)s] [channel {channel}] %(message)s")
+        for handler in logging.getLogger().handlers:
+            handler.setFormatter(formatter)
+
+    # Tracing is switched on before the realtime process starts so both processes record spans
+    if args.trace is not None:
+        tracing.enable(args.trace)
+        tracing.set_process_name("agent")
+
+    # Shared memory telemetry written by the realtime process with every sensor reading
+    telemetry = Telemetry_Ring_Buffer(create=True)
+    hardware_options = get_hardware_options(args)
+    hardware_options["telemetry_name"] = telemetry.name
 
     # Initialize the system and configure based on CLI arguments
-    pipe_conn, realtime_process, hardware_status, ipc_status_flag, shutdown_event = initialize_system(args.mode)
+    pipe_conn, realtime_process, hardware_status, ipc_status_flag, shutdown_event = initialize_system(
+        args.mode, hardware_options, args.core)
     if hardware_status != 0:
-        unexpected_shutdown(EXIT_CODES["HARDWARE_ERROR"], pipe_conn, realtime_process)
+        unexpected_shutdown(EXIT_CODES["HARDWARE_ERROR"], pipe_conn, realtime_process, telemetry)
     
     # Create AI agent and prompt the agent with initial instructions
     aiAgent, agent_status = initialize_agent(pipe_conn, args)
     if agent_status != 0:
-        unexpected_shutdown(agent_status, pipe_conn, realtime_process)
+        unexpected_shutdown(agent_status, pipe_conn, realtime_process, telemetry)
+
+    # New target angles go straight to the hardware; streaming agents send them before their response completes
+    aiAgent.angle_listener = pipe_conn.send
 
     # Loop to iteratively interact with the AI agent
+    turn = 0
     while True:
-        time.sleep(0.1)
+        turn += 1
         
-        # Retrieve proximity distance from hardware; configure pipe as LIFO and then flush
-        distance = None
-        while not pipe_conn.poll():
-            time.sleep(0.1)
-        while pipe_conn.poll():
-            distance = pipe_conn.recv()
+        # Block until the hardware signals a new proximity distance; configure pipe as LIFO and then flush
+        try:
+            with tracing.span("main.wait_hardware", turn=turn):
+                message = recv_latest(pipe_conn, args.ipc_timeout)
+        except TimeoutError as e:
+            logging.error(f"Hardware communication timed out: {e}")
+            unexpected_shutdown(EXIT_CODES["HARDWARE_ERROR"], pipe_conn, realtime_process, telemetry)
 
-        # Update AI agent with latest distance and send new target angle
-        logging.info(f"Latest measured distance is " + str(distance))
-        aiAgent.distance = distance
-        aiAgent.update_angle()
+        measurements = reply_measurements(message, telemetry, aiAgent.angle)
+        distance = measurements[-1][1]
 
-        # Wait for AI agent response
-        while aiAgent.query_state == False:
-            time.sleep(0.1)
-        aiAgent.query_state = False
+        # Update AI agent with latest distance and send new target angle
+        if args.batch or is_command(message, SWEEP_COMMAND):
+            aiAgent.measurements = measurements
+        else:
+            aiAgent.distance = distance
+        aiAgent.angle_dispatched = False
+        try:
+            with tracing.span("main.agent_turn", turn=turn):
+                aiAgent.update_angle()
+        except CacheMissError as e:
+            logging.error(f"Replay failed: {e}")
+            unexpected_shutdown(EXIT_CODES["UNEXPECTED_ERROR"], pipe_conn, realtime_process, telemetry)
+        if aiAgent.token_history:
+            usage = aiAgent.token_history[-1]
+            logging.info(f"Agent request: {usage['messages']} messages, {usage['prompt_tokens']} prompt tokens, "
+                         f"{usage['completion_tokens']} completion tokens")
 
         # Shut down interaction with AI agent
         if aiAgent.complete_state == True:
-            aiAgent.get_agent_logic()
-            pipe_conn.send(aiAgent.angle)
+            try:
+                aiAgent.get_agent_logic()
+            except CacheMissError as e:
+                logging.warning(f"No cached agent logic response: {e}")
+            # Raise the shutdown flag before the final angle so the hardware sees it after its last move
             ipc_status_flag.value = 1
+            # The final answer may be measured with more samples than the search
+            if args.final_samples > 1:
+                pipe_conn.send(measure_command(aiAgent.angle, samples=args.final_samples,
+                                               target_precision=args.target_precision))
+            else:
+                pipe_conn.send(aiAgent.angle)
             break
 
-        # Update hardware target angle
-        pipe_conn.send(aiAgent.angle)
+        # Update hardware target angles; in batch mode the hardware measures them all before replying
+        with tracing.span("main.dispatch", turn=turn):
+            # Agents may ask for a whole sweep profile in one round trip
+            if aiAgent.sweep_request is not None:
+                pipe_conn.send(sweep_command(*aiAgent.sweep_request))
+            elif args.batch:
+                pipe_conn.send(batch_command(aiAgent.target_angles or [aiAgent.angle]))
+            # Otherwise send the target angle unless the agent already sent it while streaming
+            else:
+                aiAgent.dispatch_angle()
     
     # Shut down application
-    graceful_system_shutdown(pipe_conn, realtime_process, shutdown_event)
+    aiAgent.close()
+    if aiAgent.response_cache is not None:
+        logging.info(f"Response cache: {aiAgent.response_cache.hits} hits, {aiAgent.response_cache.misses} misses")
+        aiAgent.response_cache.close()
+
+    # The reply to the final angle is on the pipe once the realtime process has shut down
+    shutdown_event.wait()
+    try:
+        final_distance = float(recv_latest(pipe_conn, 0))
+        logging.info(f"Final distance at {aiAgent.angle:g} degrees is {final_distance:g}")
+    except (TimeoutError, EOFError, OSError, TypeError, ValueError):
+        final_distance = None
+    if results is not None:
+        results.put({"channel": channel, "turns": turn, "final_angle": aiAgent.angle,
+                     "final_distance": final_distance})
+    graceful_system_shutdown(pipe_conn, realtime_process, shutdown_event, telemetry)
+
+def run_channels(channels):
+    """
+    Supervise one process per channel and collect their results.
+    Channels run independently; one failing does not stop the others.
+    Returns the results in channel order with each channel's exit status.
+    """
+    results = multiprocessing.Queue()
+    processes = []
+    for channel, channel_args in enumerate(channels):
+        logging.info(f"Starting channel {channel}: mode {channel_args.mode}, core {channel_args.core}, "
+                     f"agent {channel_args.agent}, prompt {channel_args.prompt}")
+        process = multiprocessing.Process(target=run_channel, args=(channel_args, channel, results),
+                                          name=f"channel-{channel}")
+        process.start()
+        processes.append(process)
+
+    # A keyboard interrupt reaches every channel; keep waiting for them to shut down
+    for process in processes:
+        while process.is_alive():
+            try:
+                process.join()
+            except KeyboardInterrupt:
+                logging.warning("Interrupted; waiting for channels to shut down...")
+
+    reported = {}
+    while not results.empty():
+        result = results.get()
+        reported[result["channel"]] = result
+    summary = []
+    for channel, process in enumerate(processes):
+        result = reported.get(channel, {"channel": channel, "turns": None, "final_angle": None,
+                                        "final_distance": None})
+        result["exit_code"] = process.exitcode
+        summary.append(result)
+        logging.info(f"Channel {channel}: exit code {process.exitcode}, {result['turns']} turns, "
+                     f"final angle {result['final_angle']}, final distance {result['final_distance']}")
+    return summary
+
+def main():
+    
+    # Parse input arguments for application flow control
+    args = parse_arguments()
+
+    # Multi-channel mode: a supervisor runs each scanner channel in its own process
+    if args.channels > 1 or args.channel_config is not None:
+        try:
+            channels = load_channel_config(args.channel_config, args)
+        except (OSError, ValueError) as e:
+            logging.error(f"Invalid channel configuration: {e}")
+            sys.exit(EXIT_CODES["INVALID_TYPE"])
+        summary = run_channels(channels)
+        failed = [result["exit_code"] for result in summary if result["exit_code"] != EXIT_CODES["SUCCESS"]]
+        sys.exit(failed[0] if failed else EXIT_CODES["SUCCESS"])
+    run_channel(args)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,107 @@
+'''
+Unit test for the VL53L1 ToF sensor wrapper
+'''
+import sys
+import os
+import itertools
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../hardware")))
+
+from unittest.mock import MagicMock, patch
+from VL53L1_wrapper import ToF_Sensor, ToF_Reading
+
+def _fake_readings(lib, readings):
+    '''
+    Make the fake driver return (distance, status) pairs from VL53L1X_GetResult
+    '''
+    readings = iter(readings)
+    def get_result(dev, result_ref):
+        result = result_ref._obj
+        result.Distance, result.Status = next(readings)
+        return 0
+    lib.VL53L1X_GetResult.side_effect = get_result
+
+@pytest.fixture
+def sensor():
+    with patch("VL53L1_wrapper.ctypes.CDLL") as mock_cdll, \
+         patch.object(ToF_Sensor, "_probe_i2c_sensor", return_value=-1):
+        lib = mock_cdll.return_value
+        for name in ("VL53L1X_ClearInterrupt", "VL53L1X_StartRanging", "VL53L1X_StopRanging",
+                     "VL53L1X_SetDistanceMode", "VL53L1X_SetTimingBudgetInMs",
+                     "VL53L1X_SetInterMeasurementInMs"):
+            getattr(lib, name).return_value = 0
+        data_ready = MagicMock()
+        data_ready.wait.return_value = True
+        yield ToF_Sensor(library_path="fake.so", data_ready=data_ready), lib
+
+def test_acquire_statistics(sensor):
+    '''
+    Batched acquisition summarizes valid readings and counts range statuses.
+    '''
+    # Arrange: Four valid readings and one signal failure
+    tof, lib = sensor
+    _fake_readings(lib, [(100, 0), (104, 0), (5000, 2), (102, 0), (98, 0)])
+
+    # Act
+    stats = tof.acquire(5)
+
+    # Assert
+    assert stats["samples"] == 5
+    assert stats["valid"] == 4
+    assert stats["median"] == 101
+    assert stats["mean"] == 101
+    assert stats["std"] == pytest.approx(2.582, abs=1e-3)
+    assert stats["status_counts"] == {0: 4, 2: 1}
+
+def test_acquire_stops_at_target_precision(sensor):
+    '''
+    Acquisition stops early once the confidence interval is tight enough.
+    '''
+    # Arrange: Steady readings alternating by 1 mm
+    tof, lib = sensor
+    _fake_readings(lib, itertools.cycle([(200, 0), (201, 0)]))
+
+    # Act
+    stats = tof.acquire(50, target_precision=1.0)
+
+    # Assert
+    assert stats["samples"] < 50
+    assert stats["median"] == pytest.approx(200.5, abs=0.5)
+
+def test_read_sensor_reuses_record(sensor):
+    '''
+    The fast polling path fills the caller's record in place.
+    '''
+    # Arrange
+    tof, lib = sensor
+    _fake_readings(lib, [(150, 0), (160, 4)])
+    reading = ToF_Reading()
+
+    # Act
+    first = tof.read_sensor(reading)
+    second = tof.read_sensor(reading)
+
+    # Assert
+    assert first is reading and second is reading
+    assert (reading.distance, reading.status) == (160, 4)
+    assert lib.VL53L1X_ClearInterrupt.call_count == 2
+
+def test_set_ranging_profile(sensor):
+    '''
+    Ranging profiles pause ranging while the sensor is reconfigured.
+    '''
+    # Arrange
+    tof, lib = sensor
+    tof.initialize_ranging()
+
+    # Act
+    tof.set_ranging_profile("fast")
+
+    # Assert
+    lib.VL53L1X_StopRanging.assert_called_once()
+    assert lib.VL53L1X_SetDistanceMode.call_args.args[1].value == 1
+    assert lib.VL53L1X_SetTimingBudgetInMs.call_args.args[1].value == 20
+    assert lib.VL53L1X_StartRanging.call_count == 2
+    with pytest.raises(ValueError):
+        tof.set_ranging_profile("unknown")
@@ -0,0 +1,95 @@
+'''
+Unit test for the classical search agents and their strategies
+'''
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../ai")))
+
+from evaluate import run_episode, load_prompts
+from agent_factory import create_agent
+from search_strategies import make_strategy
+
+def _two_minima(angle):
+    '''
+    Distance profile with a local minimum at -60 degrees and the closest obstacle at 50 degrees
+    '''
+    return min(200 + abs(angle + 60), 100 + abs(angle - 50))
+
+def _search(strategy, profile):
+    observations = [(0.0, profile(0.0))]
+    angle, finished = strategy.next_step(observations)
+    while not finished:
+        observations.append((angle, profile(angle)))
+        angle, finished = strategy.next_step(observations)
+    return angle, observations
+
+@pytest.mark.parametrize("agent", ["grid-refine", "golden-section", "multi-start", "sweep"])
+@pytest.mark.parametrize("batch", [False, True])
+def test_agents_converge(agent, batch):
+    '''
+    Every classical agent finds the closest obstacle without querying a model.
+    '''
+    # Arrange
+    episode = {
+        "prompt": "2", "prompt_text": load_prompts()["2"], "scene": "two_obstacles", "agent": agent, "seed": 0,
+        "agent_options": {"base_url": None, "seed": 0, "batch_mode": batch}, "batch": batch,
+        "cache": None, "cache_mode": "read-through", "max_turns": 60,
+    }
+
+    # Act
+    result = run_episode(episode)
+
+    # Assert
+    assert result["status"] == "ok", result["error"]
+    assert result["converged"] is True
+    assert result["angle_error"] < 2.0
+    assert result["prompt_tokens"] == 0
+
+def test_golden_section_reuses_interior_points():
+    '''
+    Golden-section search measures each angle once and narrows in on a single minimum.
+    '''
+    # Act
+    angle, observations = _search(make_strategy("golden-section"), lambda angle: 100 + abs(angle - 23))
+
+    # Assert
+    angles = [round(angle, 1) for angle, _ in observations]
+    assert angle == pytest.approx(23, abs=1.8)
+    assert len(angles) == len(set(angles)) == 12
+
+def test_multi_start_escapes_local_minimum():
+    '''
+    Multi-start local search finds the closest obstacle next to a wider local minimum.
+    '''
+    # Act
+    angle, observations = _search(make_strategy("multi-start"), _two_minima)
+
+    # Assert
+    assert angle == pytest.approx(50, abs=1.8)
+    assert len(observations) < 40
+
+def test_batch_agent_requests_coarse_grid():
+    '''
+    In batch mode the grid-refine agent asks for the whole coarse grid in its first turn.
+    '''
+    # Arrange
+    agent = create_agent("grid-refine", 0, batch_mode=True, model="unused")
+    agent.connect_agent()
+    agent.initialize_agent()
+
+    # Act
+    agent.measurements = [(0.0, _two_minima(0.0))]
+    agent.update_angle()
+    first = agent.target_angles
+    agent.measurements = [(angle, _two_minima(angle)) for angle in first]
+    agent.update_angle()
+
+    # Assert
+    assert agent.comprehension == "ok"
+    assert first == [-90.0, -70.0, -50.0, -30.0, -10.0, 10.0, 30.0, 50.0, 70.0, 90.0]
+    assert agent.target_angles == [40.0]
+    assert agent.observations[-1] == (90.0, _two_minima(90.0))
+    assert agent.token_history == []
@@ -0,0 +1,203 @@
+'''
+Unit test for the OpenAI agents
+'''
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../ai")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../hardware")))
+
+from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from agent_openai import OpenAIAgent, AsyncOpenAIAgent, leading_angle
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+class _Fake_Stream:
+    '''
+    Async iterator over response chunks; records the listener calls seen before each chunk
+    '''
+    def __init__(self, parts, listener):
+        self._parts = iter(parts)
+        self._listener = listener
+        self.calls_per_chunk = []
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        self.calls_per_chunk.append(self._listener.call_count)
+        try:
+            return _chunk(next(self._parts))
+        except StopIteration:
+            raise StopAsyncIteration
+
+def _streaming_agent(parts):
+    listener = MagicMock()
+    stream = _Fake_Stream(parts, listener)
+    async def create(**kwargs):
+        return stream
+    agent = AsyncOpenAIAgent(0)
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}), \
+         patch("agent_openai.AsyncOpenAI") as mock_client:
+        mock_client.return_value.chat.completions.create = create
+        agent.connect_agent()
+    agent.angle_listener = listener
+    return agent, listener, stream
+
+def test_leading_angle():
+    '''
+    A number counts as complete only once a character that cannot continue it arrives.
+    '''
+    assert leading_angle("4") is None
+    assert leading_angle("45.") is None
+    assert leading_angle("45\n") == 45.0
+    assert leading_angle(" -12.5 degrees") == -12.5
+    assert leading_angle("finished 10") is None
+
+def test_stream_dispatches_angle_early():
+    '''
+    The streaming agent sends the angle before the response finishes streaming.
+    '''
+    # Arrange
+    agent, listener, stream = _streaming_agent(["-3", "6", "\n", "(searching left)"])
+    agent.distance = 120.0
+
+    # Act
+    agent.update_angle()
+
+    # Assert: Dispatched once, before the last chunk was read
+    listener.assert_called_once_with(-36.0)
+    assert stream.calls_per_chunk[-2] == 1
+    assert agent.dispatch_angle() is False
+
+def test_stream_finished_is_not_dispatched():
+    '''
+    Completion responses are left to the main loop so the shutdown flag goes out first.
+    '''
+    # Arrange
+    agent, listener, stream = _streaming_agent(["FINISHED ", "12", ""])
+    agent.distance = 80.0
+
+    # Act
+    agent.update_angle()
+
+    # Assert
+    listener.assert_not_called()
+    assert agent.complete_state is True
+    assert agent.angle == 12.0
+
+def test_compact_context_request_size():
+    '''
+    Compaction keeps every request to the prompt exchange plus one observation table.
+    '''
+    # Arrange: Synchronous agent answering with a sweep of angles
+    agent = OpenAIAgent(0, compact_context=True)
+    requests = []
+    replies = iter(["OK", "30", "-30", "60", "FINISHED -30", "logic"])
+    def create(messages, model):
+        requests.append(list(messages))
+        usage = SimpleNamespace(prompt_tokens=10 * len(messages), completion_tokens=1)
+        message = SimpleNamespace(content=next(replies))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+    agent._client = MagicMock()
+    agent._client.chat.completions.create = create
+    agent.initial_prompt = "prompt"
+
+    # Act
+    agent.initialize_agent()
+    for distance in [500.0, 97.9, 575.6, 4000.0]:
+        agent.distance = distance
+        agent.update_angle()
+    agent.get_agent_logic()
+
+    # Assert: Constant request length; the table holds every observation
+    assert [len(messages) for messages in requests] == [1, 3, 3, 3, 3, 4]
+    assert "-30 | 575.6\n0 | 500\n30 | 97.9\n60 | 4000" in requests[4][2]["content"]
+    assert requests[4][2]["content"].endswith("Current angle: 60\nLatest distance: 4000.0")
+    assert requests[5][3]["content"].startswith("In 200 words")
+    assert [usage["prompt_tokens"] for usage in agent.token_history] == [10, 30, 30, 30, 30, 40]
+
+def test_compact_context_after_unparsed_reply():
+    '''
+    A reply without an angle keeps the sensor where it is; later rows still pair each angle with its own distance.
+    '''
+    # Arrange
+    agent = OpenAIAgent(0, compact_context=True)
+    requests = []
+    replies = iter(["OK", "30", "turning left", "-30", "10"])
+    def create(messages, model):
+        requests.append(list(messages))
+        message = SimpleNamespace(content=next(replies))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+    agent._client = MagicMock()
+    agent._client.chat.completions.create = create
+    agent.initial_prompt = "prompt"
+
+    # Act: The third reply fails to parse, so 98.5 is measured at 30 degrees again
+    agent.initialize_agent()
+    for distance in [500.0, 97.9, 98.5, 575.6]:
+        agent.distance = distance
+        agent.update_angle()
+
+    # Assert
+    assert "-30 | 575.6\n0 | 500\n30 | 98.5\n" in requests[4][2]["content"]
+
+def test_batch_mode_requests_angle_lists():
+    '''
+    Batch agents send every measured pair and parse a list of valid target angles per turn.
+    '''
+    # Arrange
+    agent = OpenAIAgent(0, batch_mode=True)
+    requests = []
+    replies = iter(["OK", "-60, -30, 30, 95, 60", "25,35", "FINISHED 30"])
+    def create(messages, model):
+        requests.append(messages[-1]["content"])
+        message = SimpleNamespace(content=next(replies))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+    agent._client = MagicMock()
+    agent._client.chat.completions.create = create
+    agent.initial_prompt = "prompt"
+
+    # Act
+    agent.initialize_agent()
+    agent.measurements = [(0, 500.0)]
+    agent.update_angle()
+    first_targets = agent.target_angles
+    agent.measurements = [(-60, 412.0), (-30, 125.0), (30, 75.0), (60, 390.0)]
+    agent.update_angle()
+    agent.measurements = [(25, 80.0), (35, 78.5)]
+    agent.update_angle()
+
+    # Assert: Out of range angles are skipped; the final answer works as before
+    assert first_targets == [-60.0, -30.0, 30.0, 60.0]
+    assert requests[1:] == ["0: 500", "-60: 412; -30: 125; 30: 75; 60: 390", "25: 80; 35: 78.5"]
+    assert agent.complete_state is True
+    assert agent.angle == 30.0
+
+def test_batch_mode_reply_without_angles():
+    '''
+    A batch reply with no valid angles falls back to the current angle instead of the previous batch.
+    '''
+    # Arrange
+    agent = OpenAIAgent(10, batch_mode=True)
+    replies = iter(["OK", "-60, 60", "Let me think about that."])
+    def create(messages, model):
+        message = SimpleNamespace(content=next(replies))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+    agent._client = MagicMock()
+    agent._client.chat.completions.create = create
+    agent.initial_prompt = "prompt"
+
+    # Act
+    agent.initialize_agent()
+    agent.measurements = [(10, 500.0)]
+    agent.update_angle()
+    agent.measurements = [(-60, 412.0), (60, 390.0)]
+    agent.update_angle()
+
+    # Assert
+    assert agent.target_angles == [agent.angle]
+    assert agent.complete_state is False
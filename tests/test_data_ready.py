@@ -0,0 +1,101 @@
+'''
+Unit test for sensor data-ready wait strategies
+'''
+import sys
+import os
+import time
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../hardware")))
+
+from data_ready import GPIO_Data_Ready, Polling_Data_Ready, Simulated_Data_Ready_Line
+
+PERIOD = 0.03
+
+def _measure_latency(waiter, line, reads):
+    '''
+    Wait for consecutive readings and record the delay after each measurement completed
+    '''
+    latencies = []
+    for _ in range(reads):
+        assert waiter.wait(timeout=1)
+        latencies.append(time.monotonic() - line.ready_time)
+        line.clear()
+    return latencies
+
+def test_gpio_wait_latency():
+    '''
+    Edge-driven waits return as soon as the interrupt line asserts.
+    '''
+    # Arrange
+    line = Simulated_Data_Ready_Line(period=PERIOD)
+    waiter = GPIO_Data_Ready(line)
+
+    # Act
+    latencies = _measure_latency(waiter, line, 5)
+
+    # Assert: Far below the original 100 ms polling quantization
+    assert max(latencies) < 0.01
+
+def test_polling_learns_period():
+    '''
+    Adaptive polling learns the measurement period and keeps latency at the short poll interval.
+    '''
+    # Arrange
+    line = Simulated_Data_Ready_Line(period=PERIOD)
+    checks = []
+    waiter = Polling_Data_Ready(lambda: checks.append(1) or line.is_asserted(), max_interval=0.005)
+
+    # Act
+    latencies = _measure_latency(waiter, line, 8)
+
+    # Assert
+    assert waiter.period == pytest.approx(PERIOD, rel=0.3)
+    assert max(latencies[2:]) < 0.015
+    assert len(checks) < 8 * PERIOD / 0.001
+
+def test_wait_timeout():
+    '''
+    Both strategies report a timeout when no data arrives.
+    '''
+    # Arrange
+    line = Simulated_Data_Ready_Line(period=10)
+
+    # Act and assert
+    assert GPIO_Data_Ready(line).wait(timeout=0.01) is False
+    assert Polling_Data_Ready(line.is_asserted).wait(timeout=0.01) is False
+
+class _Glitch_Line:
+    '''
+    Line with one queued edge event whose level never asserts
+    '''
+    def __init__(self):
+        self.queued = 1
+        self.waits = 0
+
+    def is_asserted(self):
+        return False
+
+    def wait_edge(self, timeout):
+        self.waits += 1
+        if self.queued:
+            return True
+        time.sleep(timeout)
+        return False
+
+    def drain(self):
+        self.queued = 0
+
+def test_gpio_wait_drains_spurious_edge():
+    '''
+    An edge without the line asserting is consumed, so the wait blocks instead of spinning until the timeout.
+    '''
+    # Arrange
+    line = _Glitch_Line()
+
+    # Act
+    ready = GPIO_Data_Ready(line).wait(timeout=0.05)
+
+    # Assert
+    assert ready is False
+    assert line.waits == 2
@@ -0,0 +1,57 @@
+'''
+Unit test for the evaluation harness
+'''
+import sys
+import os
+import csv
+import threading
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../ai")))
+
+from evaluate import run_episode, ground_truth, scene_lookup_table, write_results, load_prompts
+from standin_server import StandInServer
+
+@pytest.fixture
+def standin():
+    server = StandInServer(("127.0.0.1", 0), strategy="bisection")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def _episode(base_url, scene="line"):
+    return {
+        "prompt": "2", "prompt_text": load_prompts()["2"], "scene": scene, "agent": "openAI", "seed": 0,
+        "agent_options": {"base_url": base_url, "seed": 0},
+        "cache": None, "cache_mode": "read-through", "max_turns": 60,
+    }
+
+def test_ground_truth():
+    '''
+    Ground truth is the shortest distance in the scene table and where it occurs.
+    '''
+    distance, angles = ground_truth(scene_lookup_table("line"))
+    assert distance == pytest.approx(10.0)
+    assert 0.0 in angles and max(abs(angle) for angle in angles) < 10
+
+def test_run_episode(standin, tmp_path, monkeypatch):
+    '''
+    An episode against the stand-in converges and is scored against ground truth.
+    '''
+    # Arrange
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+    # Act
+    result = run_episode(_episode(standin.base_url))
+    write_results([result], str(tmp_path / "results.csv"))
+
+    # Assert
+    assert result["status"] == "ok", result["error"]
+    assert result["converged"] is True
+    assert result["turns"] > 5
+    assert result["angle_error"] < 2.0
+    assert result["prompt_tokens"] > 0
+    with open(tmp_path / "results.csv") as file:
+        assert next(csv.DictReader(file))["scene"] == "line"
@@ -0,0 +1,36 @@
+'''
+Unit test for inter-process communication helpers
+'''
+import sys
+import os
+import multiprocessing
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../hardware")))
+
+from ipc_utils import recv_latest, wait_for_message
+
+def test_recv_latest_flushes_pipe():
+    '''
+    Only the most recent message is returned (LIFO flush).
+    '''
+    # Arrange
+    parent_conn, child_conn = multiprocessing.Pipe()
+    for angle in (10.0, 20.0, 30.0):
+        child_conn.send(angle)
+
+    # Act and assert
+    assert recv_latest(parent_conn, timeout=1) == 30.0
+    assert not parent_conn.poll()
+
+def test_recv_latest_timeout():
+    '''
+    A timeout raises instead of blocking forever.
+    '''
+    # Arrange
+    parent_conn, child_conn = multiprocessing.Pipe()
+
+    # Act and assert
+    assert wait_for_message(parent_conn, timeout=0.01) is False
+    with pytest.raises(TimeoutError):
+        recv_latest(parent_conn, timeout=0.01)
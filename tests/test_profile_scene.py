@@ -0,0 +1,75 @@
+'''
+Unit test for the data-driven simulation from recorded scan profiles
+'''
+import sys
+import os
+import pytest
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../hardware")))
+
+from unittest.mock import MagicMock, patch
+from profile_scene import Profile_Lookup_Table, load_profiles
+from session_recorder import Session_Recorder
+from simulation import Hardware_Sim
+
+def test_table_median_and_interpolation():
+    '''
+    Each measured step holds its median reading; steps in between are interpolated.
+    '''
+    # Arrange: Three readings at 0 degrees (one outlier) and one at 9 degrees
+    angles = [0.0, 0.1, -0.2, 9.0]
+    distances = [100.0, 102.0, 900.0, 120.0]
+
+    # Act
+    lut = Profile_Lookup_Table(angles, distances)
+
+    # Assert
+    assert lut.lookup(0) == 102.0
+    assert lut.lookup(9) == 120.0
+    assert lut.lookup(4.5) == pytest.approx(111.0)
+    assert lut.lookup(-90) == 102.0
+    assert lut.lookup(90) == 120.0
+
+def test_noise_resampled_from_recorded_residuals():
+    '''
+    With noise, measurements draw from the residuals at the nearest repeatedly measured step.
+    '''
+    # Arrange: Repeats only at 0 degrees, residuals -1, 0, +1
+    lut = Profile_Lookup_Table([0, 0, 0, 45], [99.0, 100.0, 101.0, 200.0], noise = True, seed = 0)
+
+    # Act
+    near = lut.lookup_many(np.zeros(500))
+    far = lut.lookup_many(np.full(500, 45.0))
+
+    # Assert
+    assert set(near) == {99.0, 100.0, 101.0}
+    assert set(far - 200.0) == {-1.0, 0.0, 1.0}
+    with pytest.raises(ValueError):
+        Profile_Lookup_Table([0, 45], [100.0, 200.0], noise = True)
+
+def test_simulation_from_recorded_profiles(tmp_path):
+    '''
+    Hardware_Sim answers from pooled session and CSV profiles instead of a scene.
+    '''
+    # Arrange
+    session_path = str(tmp_path / "sweep.bin")
+    recorder = Session_Recorder(session_path)
+    recorder.append(1, -9.0, -9.0, 300.0)
+    recorder.append(1, 0.0, 0.0, 999.0, status = 4)
+    recorder.append(1, 9.0, 9.0, 100.0)
+    recorder.close()
+    csv_path = tmp_path / "sweep.csv"
+    csv_path.write_text("angle,distance\n0,200\n")
+
+    # Act
+    with patch.object(Hardware_Sim, "_sim_transition"):
+        sim = Hardware_Sim(conn = MagicMock(), shutdown_event = MagicMock(), ipc_status_flag = MagicMock(),
+                           init_event = MagicMock(), error_event = MagicMock(),
+                           profile_paths = [session_path, str(csv_path)])
+
+    # Assert
+    assert sim.scene is None
+    assert sim.distance == 200.0
+    assert list(sim.measure_batch([9, -9, 4.5])) == [100.0, 300.0, 150.0]
+    assert len(load_profiles([session_path])[0]) == 2
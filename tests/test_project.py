@@ -3,6 +3,8 @@ Unit test for central application logic
 '''
 import sys
 import os
+import argparse
+import multiprocessing
 import pytest
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../hardware")))
@@ -11,6 +13,11 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from unittest.mock import MagicMock, patch
 from project import TARGET_ANGLE_IC, EXIT_CODES, REAL_TIME_CORE
 from project import run_system, initialize_system, graceful_system_shutdown
+from project import build_parser, load_channel_config, run_channel, run_channels, reply_measurements
+from run_hardware import Hardware_Control
+from telemetry_buffer import Telemetry_Ring_Buffer
+from ipc_utils import recv_latest
+from tof_array import Simulated_I2C_Bus, Simulated_ToF, Simulated_XSHUT_Line
 
 @pytest.fixture
 def run_system_mocks():
@@ -181,4 +188,109 @@ def test_graceful_system_shutdown():
     # Act and assert
     with pytest.raises(SystemExit) as excinfo:
         graceful_system_shutdown(pipe_conn, realtime_process, shutdown_event)
-    assert excinfo.value.code == EXIT_CODES["SUCCESS"]
\ No newline at end of file
+    assert excinfo.value.code == EXIT_CODES["SUCCESS"]
+def test_load_channel_config(tmp_path):
+    '''
+    Test per-channel overrides on top of the CLI arguments, with a core and output files per channel.
+    '''
+    # Arrange
+    args = build_parser().parse_args(["-a", "openAI", "-m", "1", "-p", "2", "--record", "scan.bin"])
+    config = tmp_path / "channels.json"
+    config.write_text('[{"mode": 2, "i2c_addr": "0x30", "gpio_pins": [5, 6, 13, 19]}, '
+                      '{"geometry": "corridor", "core": 1}, {"record": "other.bin"}]')
+
+    # Act
+    with patch("os.sched_getaffinity", return_value = {0, 1, 2, 3}):
+        channels = load_channel_config(str(config), args)
+
+    # Assert
+    assert [channel.mode for channel in channels] == [2, 1, 1]
+    assert channels[0].i2c_addr == 0x30
+    assert channels[0].gpio_pins == [5, 6, 13, 19]
+    assert channels[1].geometry == "corridor"
+    assert [channel.core for channel in channels] == [3, 1, 2]
+    assert [channel.record for channel in channels] == ["scan.ch0.bin", "scan.ch1.bin", "other.bin"]
+    with pytest.raises(ValueError):
+        config.write_text('[{"not_an_option": 1}]')
+        load_channel_config(str(config), args)
+
+def _fake_channel(args, channel, results):
+    '''
+    Channel stand-in: channel 1 fails before reporting a result
+    '''
+    if channel == 1:
+        sys.exit(EXIT_CODES["HARDWARE_ERROR"])
+    results.put({"channel": channel, "turns": 3, "final_angle": args.core * 1.0, "final_distance": 10.0})
+    sys.exit(EXIT_CODES["SUCCESS"])
+
+def test_run_channels():
+    '''
+    Test the supervisor runs every channel and collects results and exit codes in channel order.
+    '''
+    # Arrange
+    args = build_parser().parse_args(["-a", "openAI", "-m", "1", "-p", "2"])
+    channels = [argparse.Namespace(**{**vars(args), "core": core}) for core in (3, 2, 1)]
+
+    # Act
+    with patch("project.run_channel", _fake_channel):
+        summary = run_channels(channels)
+
+    # Assert
+    assert [result["exit_code"] for result in summary] == [0, EXIT_CODES["HARDWARE_ERROR"], 0]
+    assert [result["final_angle"] for result in summary] == [3.0, None, 1.0]
+
+def test_sensor_array_reply_distance():
+    '''
+    With a sensor array the agent receives the primary sensor's distance, although the offset
+    sensors' readings are published to telemetry after it.
+    '''
+    # Arrange: Simulated three sensor array publishing to shared memory telemetry
+    telemetry = Telemetry_Ring_Buffer(create=True)
+    parent_conn, child_conn = multiprocessing.Pipe()
+    bus = Simulated_I2C_Bus()
+    devices = [Simulated_ToF(bus, distance = distance) for distance in (100, 120, 80)]
+    with patch("run_hardware.ToF_Sensor"), patch("run_hardware.Stepper_Motor"), \
+         patch.object(Hardware_Control, "_hardware_transition"):
+        hardware = Hardware_Control(
+            conn = child_conn,
+            init_event = MagicMock(),
+            error_event = MagicMock(),
+            shutdown_event = MagicMock(),
+            ipc_status_flag = MagicMock(),
+            initial_angle = 10,
+            telemetry_name = telemetry.name,
+            tof_array = {"xshut_lines": [Simulated_XSHUT_Line(device) for device in devices], "bus": bus,
+                         "sensor_factory": bus.sensor_at, "offsets": [0, -20, 20]},
+        )
+
+    # Act
+    hardware._measure_and_send()
+    measurements = reply_measurements(recv_latest(parent_conn, 1), telemetry, 10.0)
+    latest = telemetry.read_latest()
+    hardware._shutdown()
+    telemetry.close()
+    telemetry.unlink()
+
+    # Assert
+    assert measurements == [(10.0, 100.0)]
+    assert latest["angle"] == pytest.approx(30.0)
+    assert latest["distance"] == 80
+
+def test_run_channel_sweep_agent():
+    '''
+    The sweep agent gets whole distance profiles from the simulation in one round trip per sweep.
+    '''
+    # Arrange
+    args = build_parser().parse_args(["-a", "sweep", "-m", "1", "-p", "2", "-g", "two_obstacles", "--core", "0"])
+    results = multiprocessing.Queue()
+
+    # Act
+    with pytest.raises(SystemExit) as exit_info:
+        run_channel(args, results = results)
+    result = results.get(timeout = 5)
+
+    # Assert: Initial reading, coarse sweep and refining sweep
+    assert exit_info.value.code == EXIT_CODES["SUCCESS"]
+    assert result["turns"] == 3
+    assert result["final_angle"] == pytest.approx(27.9)
+    assert result["final_distance"] == pytest.approx(96.2)
@@ -0,0 +1,101 @@
+'''
+Unit test for the LLM response cache
+'''
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../ai")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../hardware")))
+
+from unittest.mock import MagicMock
+from types import SimpleNamespace
+from response_cache import ResponseCache, CacheMissError, request_key
+from agent_openai import OpenAIAgent
+
+PROMPT = [{"role": "user", "content": "Find the closest obstacle."}]
+
+def test_request_key_normalizes_whitespace():
+    '''
+    Formatting differences in the context do not change the key; model and content do.
+    '''
+    spaced = [{"role": "user", "content": "  Find the closest\n obstacle. "}]
+    assert request_key("gpt-4o", spaced) == request_key("gpt-4o", PROMPT)
+    assert request_key("gpt-4o-mini", PROMPT) != request_key("gpt-4o", PROMPT)
+
+def test_lru_eviction(tmp_path):
+    '''
+    The least recently used response is evicted once the size cap is exceeded.
+    '''
+    # Arrange
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_entries=2)
+    first = [{"role": "user", "content": "1"}]
+    second = [{"role": "user", "content": "2"}]
+    third = [{"role": "user", "content": "3"}]
+    cache.store("gpt-4o", first, "10")
+    cache.store("gpt-4o", second, "20")
+
+    # Act: Touch the first entry, then overflow the cache
+    cache.lookup("gpt-4o", first)
+    cache.store("gpt-4o", third, "30")
+
+    # Assert
+    assert len(cache) == 2
+    assert cache.lookup("gpt-4o", first) == "10"
+    assert cache.lookup("gpt-4o", second) is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+def test_modes(tmp_path):
+    '''
+    Record always misses, replay fails on a miss and read-through returns stored responses.
+    '''
+    path = str(tmp_path / "cache.db")
+    record = ResponseCache(path, mode="record")
+    record.store("gpt-4o", PROMPT, "OK")
+    assert record.lookup("gpt-4o", PROMPT) is None
+    record.close()
+
+    replay = ResponseCache(path, mode="replay")
+    assert replay.lookup("gpt-4o", PROMPT) == "OK"
+    with pytest.raises(CacheMissError):
+        replay.lookup("gpt-4o", [{"role": "user", "content": "other"}])
+
+    with pytest.raises(ValueError):
+        ResponseCache(path, mode="offline")
+
+def test_agent_replays_offline(tmp_path, monkeypatch):
+    '''
+    A recorded session replays without an API key or client.
+    '''
+    # Arrange: Record a short session against a fake client
+    path = str(tmp_path / "cache.db")
+    replies = iter(["OK", "45"])
+    def create(messages, model):
+        message = SimpleNamespace(content=next(replies))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+    recorder = OpenAIAgent(0)
+    recorder.response_cache = ResponseCache(path, mode="record")
+    recorder._client = MagicMock()
+    recorder._client.chat.completions.create = create
+    recorder.initial_prompt = "prompt"
+    recorder.initialize_agent()
+    recorder.distance = 120.0
+    recorder.update_angle()
+
+    # Act: Replay the same session with no API key
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    agent = OpenAIAgent(0)
+    agent.response_cache = ResponseCache(path, mode="replay")
+    agent.connect_agent()
+    agent.initial_prompt = "prompt"
+    agent.initialize_agent()
+    agent.distance = 120.0
+    agent.update_angle()
+
+    # Assert
+    assert agent.comprehension == "ok"
+    assert agent.angle == 45.0
+    assert agent.token_history[-1]["cached"] is True
+    agent.distance = 300.0
+    with pytest.raises(CacheMissError):
+        agent.update_angle()
@@ -3,12 +3,20 @@ Unit test for realtime hardware control logic
 '''
 import sys
 import os
+import multiprocessing
 import pytest
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../hardware")))
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
+from types import SimpleNamespace
 from run_hardware import Hardware_Control
+from session_recorder import load_session
+from tof_array import Simulated_I2C_Bus, Simulated_ToF, Simulated_XSHUT_Line
+from ipc_utils import measure_command, recv_latest
+
+# Unpatched state machine, for tests that drive it one message at a time
+_hardware_transition = Hardware_Control._hardware_transition
 
 @pytest.fixture
 def initialization_mocks():
@@ -45,8 +53,10 @@ def test_initialization(initialization_mocks):
     )
     
     # Assert: Hardware wrappers are initialized correctly and class members are assigned during instantiation
-    mock_tof_sensor.assert_called_once_with(i2c_bus = hardware._i2c_bus, i2c_addr = hardware._i2c_addr)
-    mock_stepper_motor.assert_called_once_with(gpio_pins = hardware._gpio_pins, speed = hardware._motor_speed)
+    mock_tof_sensor.assert_called_once_with(i2c_bus = hardware._i2c_bus, i2c_addr = hardware._i2c_addr,
+                                            data_ready_pin = hardware._data_ready_pin)
+    mock_stepper_motor.assert_called_once_with(gpio_pins = hardware._gpio_pins, speed = hardware._motor_speed,
+                                               acceleration = 0, start_speed = None)
     assert hardware.pipe_conn == mock_pipe_conn
     assert hardware._last_angle == 30
     assert hardware._motor_speed == 360
@@ -73,3 +83,293 @@ def test_initialization_failure(initialization_mocks):
             gpio_pins = [17, 27, 23, 24],
             motor_speed = 360,
         )
+
+def test_sweep(initialization_mocks):
+    '''
+    Tests a sweep ranging every other motor step.
+    Ensures the motor steps at motor precision and a reading is taken at each ranged step.
+    '''
+    # Arrange: Mock hardware wrappers with a fixed sensor reading
+    mock_tof_sensor, mock_stepper_motor, mock_transition, mock_event, mock_value = initialization_mocks
+    mock_tof_sensor.return_value.read_sensor.return_value.distance = 120
+    hardware = Hardware_Control(
+        conn = MagicMock(),
+        init_event = MagicMock(),
+        error_event = MagicMock(),
+        shutdown_event = MagicMock(),
+        ipc_status_flag = MagicMock(),
+        initial_angle = 0,
+        gpio_pins = [17, 27, 23, 24],
+        motor_speed = 360,
+    )
+
+    # Act
+    angles, distances = hardware.sweep(-1.8, 1.8, every_n = 2)
+
+    # Assert: Move to the start, then two ranged steps of 2 x 0.9 degrees
+    moves = [call.args[0] for call in mock_stepper_motor.return_value.motor_set_position_half_step.call_args_list]
+    assert moves == pytest.approx([-1.8, 1.8, 1.8])
+    assert list(angles) == pytest.approx([-1.8, 0.0, 1.8])
+    assert list(distances) == [120, 120, 120]
+    assert hardware._last_angle == pytest.approx(1.8)
+
+    # Assert: Sweep ranges with the fast profile and restores the measurement profile
+    profiles = [call.args[0] for call in mock_tof_sensor.return_value.set_ranging_profile.call_args_list]
+    assert profiles == ["fast", "default"]
+
+def test_measure_with_samples(initialization_mocks):
+    '''
+    Tests a measurement with several samples reports the batched median.
+    '''
+    # Arrange
+    mock_tof_sensor, mock_stepper_motor, mock_transition, mock_event, mock_value = initialization_mocks
+    mock_tof_sensor.return_value.acquire.return_value = {"median": 250.0}
+    mock_tof_sensor.return_value.last_reading.return_value.distance = 251
+    hardware = Hardware_Control(
+        conn = MagicMock(),
+        init_event = MagicMock(),
+        error_event = MagicMock(),
+        shutdown_event = MagicMock(),
+        ipc_status_flag = MagicMock(),
+        samples_per_measurement = 8,
+    )
+
+    # Act
+    distance = hardware._measure(samples = 8, target_precision = 2.0)
+
+    # Assert
+    mock_tof_sensor.return_value.acquire.assert_called_once_with(8, target_precision = 2.0)
+    mock_tof_sensor.return_value.read_sensor.assert_not_called()
+    assert distance == 250.0
+
+def test_measure_batch_planned_order(initialization_mocks):
+    '''
+    Tests batch targets are visited in travel-minimizing order and reported in request order.
+    '''
+    # Arrange: Distance reading encodes the visit number
+    mock_tof_sensor, mock_stepper_motor, mock_transition, mock_event, mock_value = initialization_mocks
+    mock_tof_sensor.return_value.read_sensor.side_effect = [
+        MagicMock(distance = 100 + i) for i in range(3)]
+    hardware = Hardware_Control(
+        conn = MagicMock(),
+        init_event = MagicMock(),
+        error_event = MagicMock(),
+        shutdown_event = MagicMock(),
+        ipc_status_flag = MagicMock(),
+        motor_speed = 90,
+    )
+
+    # Act
+    distances = hardware.measure_batch([45, -9, 45.2, -18])
+
+    # Assert: -9, -18, then 45 once for both targets on its step
+    moves = [call.args[0] for call in mock_stepper_motor.return_value.motor_set_position_half_step.call_args_list]
+    assert moves == pytest.approx([-9.0, -9.0, 63.0])
+    assert list(distances) == [102, 100, 102, 101]
+    assert hardware.move_report["stops"] == 3
+    assert hardware.move_report["predicted"] == pytest.approx(90 * 0.01)
+
+def test_record_session(initialization_mocks, tmp_path):
+    '''
+    Tests every measurement is recorded with its turn, commanded angle and full sensor reading.
+    '''
+    # Arrange
+    mock_tof_sensor, mock_stepper_motor, mock_transition, mock_event, mock_value = initialization_mocks
+    mock_tof_sensor.return_value.read_sensor.side_effect = [
+        SimpleNamespace(distance = 100 + i, ambient = i, sig_per_spad = 50, num_spads = 8, status = 0)
+        for i in range(3)]
+    path = str(tmp_path / "session.bin")
+    hardware = Hardware_Control(
+        conn = MagicMock(),
+        init_event = MagicMock(),
+        error_event = MagicMock(),
+        shutdown_event = MagicMock(),
+        ipc_status_flag = MagicMock(),
+        record_path = path,
+    )
+
+    # Act
+    hardware._measure()
+    hardware._turn = 1
+    hardware.measure_batch([10, -10])
+    hardware._shutdown()
+
+    # Assert
+    session = load_session(path)
+    assert list(session["turn"]) == [0, 1, 1]
+    assert session["commanded_angle"] == pytest.approx([0.0, -9.9, 9.9])
+    assert session["angle"] == pytest.approx([0.0, -9.9, 9.9])
+    assert list(session["distance"]) == [100, 101, 102]
+    assert list(session["ambient"]) == [0, 1, 2]
+    assert list(session["spads"]) == [8, 8, 8]
+
+def test_sensor_array_offsets(initialization_mocks, tmp_path):
+    '''
+    Tests a sensor array measures with its primary sensor and records the others at their angular offsets.
+    '''
+    # Arrange: Three simulated sensors on one bus
+    mock_tof_sensor, mock_stepper_motor, mock_transition, mock_event, mock_value = initialization_mocks
+    bus = Simulated_I2C_Bus()
+    devices = [Simulated_ToF(bus, distance = distance) for distance in (100, 120, 80)]
+    path = str(tmp_path / "session.bin")
+    hardware = Hardware_Control(
+        conn = MagicMock(),
+        init_event = MagicMock(),
+        error_event = MagicMock(),
+        shutdown_event = MagicMock(),
+        ipc_status_flag = MagicMock(),
+        record_path = path,
+        tof_array = {"xshut_lines": [Simulated_XSHUT_Line(device) for device in devices], "bus": bus,
+                     "sensor_factory": bus.sensor_at, "offsets": [0, -20, 20], "ranging": "interleaved"},
+    )
+
+    # Act
+    distance = hardware._measure()
+    hardware._shutdown()
+
+    # Assert
+    session = load_session(path)
+    mock_tof_sensor.assert_not_called()
+    assert distance == 100
+    assert list(session["angle"]) == [0.0, -20.0, 20.0]
+    assert list(session["distance"]) == [100, 120, 80]
+    assert all(device.roi == (4, 4) for device in devices)
+    assert bus.max_ranging == 1
+
+def test_measure_command_overrides_sampling(initialization_mocks):
+    '''
+    Tests a measure command moves to its angle and measures with its own sample count and target precision.
+    '''
+    # Arrange: Single reading by default
+    mock_tof_sensor, mock_stepper_motor, mock_transition, mock_event, mock_value = initialization_mocks
+    mock_tof = mock_tof_sensor.return_value
+    mock_tof.read_sensor.return_value = SimpleNamespace(distance = 120)
+    mock_tof.acquire.return_value = {"median": 97.5}
+    parent_conn, child_conn = multiprocessing.Pipe()
+    hardware = Hardware_Control(
+        conn = child_conn,
+        init_event = MagicMock(),
+        error_event = MagicMock(),
+        shutdown_event = MagicMock(),
+        ipc_status_flag = SimpleNamespace(value = 0),
+    )
+    parent_conn.send(measure_command(9.0, samples = 8, target_precision = 2.0))
+
+    # Act
+    _hardware_transition(hardware, test_mode = "on")
+
+    # Assert: Initial reading with the defaults, then the overridden acquisition at the new angle
+    assert recv_latest(parent_conn, 1) == 97.5
+    mock_tof.read_sensor.assert_called_once()
+    mock_tof.acquire.assert_called_once_with(8, target_precision = 2.0)
+    assert hardware._last_angle == pytest.approx(9.0)
+
+def test_measure_command_keeps_default_precision(initialization_mocks):
+    '''
+    Tests a measure command that only overrides the sample count keeps the configured target precision.
+    '''
+    # Arrange: Configured target precision; the command sets samples only
+    mock_tof_sensor, mock_stepper_motor, mock_transition, mock_event, mock_value = initialization_mocks
+    mock_tof = mock_tof_sensor.return_value
+    mock_tof.acquire.return_value = {"median": 97.5}
+    parent_conn, child_conn = multiprocessing.Pipe()
+    hardware = Hardware_Control(
+        conn = child_conn,
+        init_event = MagicMock(),
+        error_event = MagicMock(),
+        shutdown_event = MagicMock(),
+        ipc_status_flag = SimpleNamespace(value = 0),
+        target_precision = 1.5,
+    )
+    parent_conn.send(measure_command(9.0, samples = 8))
+
+    # Act
+    _hardware_transition(hardware, test_mode = "on")
+
+    # Assert: Initial acquisition and the commanded one both use the configured precision
+    assert recv_latest(parent_conn, 1) == 97.5
+    assert mock_tof.acquire.call_args_list[-1] == call(8, target_precision = 1.5)
+
+def test_ipc_timeout_shuts_down():
+    '''
+    Tests the real-time process shuts the hardware down when the caller stops sending within the IPC timeout.
+    '''
+    # Arrange: Pipe on which no target angle ever arrives
+    parent_conn, child_conn = multiprocessing.Pipe()
+    shutdown_event = MagicMock()
+
+    # Act
+    with patch("run_hardware.ToF_Sensor") as mock_tof_sensor, patch("run_hardware.Stepper_Motor") as mock_stepper_motor:
+        mock_tof_sensor.return_value.read_sensor.return_value = SimpleNamespace(distance = 120)
+        Hardware_Control(
+            conn = child_conn,
+            init_event = MagicMock(),
+            error_event = MagicMock(),
+            shutdown_event = shutdown_event,
+            ipc_status_flag = SimpleNamespace(value = 0),
+            ipc_timeout = 0.05,
+        )
+
+    # Assert: Initial distance sent, then shut down after the timeout
+    assert parent_conn.recv() == 120.0
+    mock_stepper_motor.return_value.motor_stop.assert_called_once()
+    shutdown_event.set.assert_called_once()
+
+def test_range_while_moving(initialization_mocks):
+    '''
+    Tests moves run asynchronously while readings are published at the live motor angle.
+    '''
+    # Arrange: The move completes after two readings; the motor passes 0.9 and 1.8 degrees
+    mock_tof_sensor, mock_stepper_motor, mock_transition, mock_event, mock_value = initialization_mocks
+    motor = mock_stepper_motor.return_value
+    motor.motor_move_async.return_value.done.side_effect = [False, False, True]
+    motor.motor_step_position.side_effect = [0.0, 0.9, 1.8]
+    mock_tof_sensor.return_value.read_sensor.side_effect = [MagicMock(distance = 300), MagicMock(distance = 290)]
+    hardware = Hardware_Control(
+        conn = MagicMock(),
+        init_event = MagicMock(),
+        error_event = MagicMock(),
+        shutdown_event = MagicMock(),
+        ipc_status_flag = MagicMock(),
+        range_while_moving = True,
+    )
+    hardware._telemetry = MagicMock()
+
+    # Act
+    hardware._move_to(2.7)
+
+    # Assert
+    motor.motor_move_async.assert_called_once_with(pytest.approx(2.7))
+    motor.motor_set_position_half_step.assert_not_called()
+    written = [(call.kwargs["angle"], call.kwargs["distance"]) for call in hardware._telemetry.write.call_args_list]
+    assert written == [(pytest.approx(0.9), 300), (pytest.approx(1.8), 290)]
+    assert hardware._last_angle == pytest.approx(2.7)
+
+def test_range_while_moving_sensor_failure(initialization_mocks):
+    '''
+    Tests a ranging failure mid-move cancels the move and keeps the angle actually reached.
+    '''
+    # Arrange: The second reading fails; the cancelled move stops at 1.8 degrees
+    mock_tof_sensor, mock_stepper_motor, mock_transition, mock_event, mock_value = initialization_mocks
+    motor = mock_stepper_motor.return_value
+    motor.motor_move_async.return_value.done.return_value = False
+    motor.motor_move_async.return_value.result.return_value = 1.8
+    motor.motor_step_position.side_effect = [0.0, 0.9]
+    mock_tof_sensor.return_value.read_sensor.side_effect = [MagicMock(distance = 300), OSError("I2C read failed")]
+    hardware = Hardware_Control(
+        conn = MagicMock(),
+        init_event = MagicMock(),
+        error_event = MagicMock(),
+        shutdown_event = MagicMock(),
+        ipc_status_flag = MagicMock(),
+        range_while_moving = True,
+    )
+    hardware._telemetry = MagicMock()
+
+    # Act
+    with pytest.raises(OSError):
+        hardware._move_to(2.7)
+
+    # Assert
+    motor.motor_move_cancel.assert_called_once()
+    assert hardware._last_angle == pytest.approx(1.8)
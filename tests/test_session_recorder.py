@@ -0,0 +1,73 @@
+'''
+Unit test for the binary session recorder
+'''
+import sys
+import os
+import pytest
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../hardware")))
+
+from types import SimpleNamespace
+from session_recorder import Session_Recorder, Session_Replay, load_session, SESSION_DTYPE
+
+def test_recorder_grows_and_loads_zero_copy(tmp_path):
+    '''
+    Records appended past the initial mapping load back as a file-backed structured array.
+    '''
+    # Arrange
+    path = str(tmp_path / "session.bin")
+    recorder = Session_Recorder(path, growth = 4)
+    reading = SimpleNamespace(distance = 250, ambient = 3, sig_per_spad = 40, num_spads = 12, status = 0)
+
+    # Act
+    for i in range(10):
+        recorder.append(i // 3, i * 1.0, i * 0.9, 100.0 + i, timestamp = float(i))
+    recorder.append_reading(4, 9.0, 9.0, reading, distance = 248.5)
+    live = load_session(path)
+    recorder.close()
+    session = load_session(path)
+
+    # Assert
+    assert len(live) == len(session) == 11
+    assert os.path.getsize(path) == 64 + 11 * SESSION_DTYPE.itemsize
+    assert isinstance(session, np.memmap)
+    assert session.dtype == SESSION_DTYPE
+    assert list(session["turn"]) == [0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 4]
+    assert session["distance"][9] == 109.0
+    assert session["angle"][9] == pytest.approx(8.1)
+    last = session[-1]
+    assert (last["distance"], last["ambient"], last["signal"], last["spads"]) == (248.5, 3, 40, 12)
+
+def test_replay_groups_turns(tmp_path):
+    '''
+    Replay hands out the records of one turn at a time and repeats the final turn.
+    '''
+    # Arrange
+    path = str(tmp_path / "session.bin")
+    recorder = Session_Recorder(path)
+    for turn, angle in [(0, 0.0), (1, 10.8), (1, -10.8), (2, 5.4)]:
+        recorder.append(turn, angle, angle, abs(angle) + 10)
+    recorder.close()
+    replay = Session_Replay(path)
+
+    # Act
+    turns = [replay.next_turn() for _ in range(4)]
+
+    # Assert
+    assert replay.turns == 3
+    assert [len(turn) for turn in turns] == [1, 2, 1, 1]
+    assert list(turns[1]["distance"]) == [20.8, 20.8]
+    assert turns[3]["angle"][0] == 5.4
+
+def test_load_rejects_other_files(tmp_path):
+    '''
+    Files without the session header are rejected.
+    '''
+    # Arrange
+    path = tmp_path / "not_a_session.bin"
+    path.write_bytes(b"\0" * 128)
+
+    # Act and assert
+    with pytest.raises(ValueError):
+        load_session(str(path))
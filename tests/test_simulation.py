@@ -0,0 +1,315 @@
+'''
+Unit test for the hardware simulation and scene geometry
+'''
+import sys
+import os
+import math
+import multiprocessing
+import pytest
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../hardware")))
+
+from unittest.mock import MagicMock, patch
+from scene_geometry import Spatial_Scene, Scene_Lookup_Table, load_scene
+from simulation import Hardware_Sim
+from scan_planner import sweep_angles, plan_moves, move_time
+from ipc_utils import recv_latest, request_sweep, request_batch
+from session_recorder import load_session
+
+def test_line_scene_matches_original_geometry():
+    '''
+    Built-in line scene reproduces the original 10 / cos(angle) wall.
+    '''
+    # Arrange: Angles across the field of view
+    angles = np.arange(-89.1, 89.2, 0.9)
+    scene = load_scene("line")
+
+    # Act
+    distances = scene.distances(angles)
+
+    # Assert
+    expected = 10 / np.cos(np.radians(angles))
+    assert np.allclose(distances, expected)
+
+def test_scene_primitives_return_nearest_hit():
+    '''
+    Rays report the nearest obstacle and the max range when nothing is hit.
+    '''
+    # Arrange: Circle straight ahead, rectangle to the right
+    scene = Spatial_Scene(max_range=1000)
+    scene.add_circle(0, 50, 10)
+    scene.add_rectangle(100, 0, 20, 200)
+
+    # Act
+    distances = scene.distances([0, 90, -90])
+
+    # Assert
+    assert distances[0] == pytest.approx(40)
+    assert distances[1] == pytest.approx(90)
+    assert distances[2] == pytest.approx(1000)
+
+def test_polygon_requires_vertices():
+    '''
+    Polygons need at least two vertices.
+    '''
+    with pytest.raises(ValueError):
+        Spatial_Scene().add_polygon([(0, 0)])
+
+def test_unknown_geometry():
+    '''
+    Unknown built-in names are rejected.
+    '''
+    with pytest.raises(ValueError):
+        load_scene("not_a_scene")
+
+@pytest.fixture
+def simulation_mocks():
+    with patch.object(Hardware_Sim, "_sim_transition") as mock_transition:
+        yield mock_transition
+
+def test_simulation_measure(simulation_mocks):
+    '''
+    Hardware_Sim measurements come from the loaded scene.
+    '''
+    # Act: Create instance of Hardware_Sim
+    sim = Hardware_Sim(
+        conn = MagicMock(),
+        shutdown_event = MagicMock(),
+        ipc_status_flag = MagicMock(),
+        init_event = MagicMock(),
+        error_event = MagicMock(),
+        geom_type = "line",
+        initial_angle = 0,
+    )
+
+    # Assert
+    assert sim.distance == 10.0
+    assert sim.measure(45) == round(10 / math.cos(math.pi / 4), 1)
+
+def test_simulation_invalid_geometry(simulation_mocks):
+    '''
+    An invalid scene flags the parent process before raising.
+    '''
+    # Arrange
+    init_event = MagicMock()
+    error_event = MagicMock()
+
+    # Act and assert
+    with pytest.raises(ValueError):
+        Hardware_Sim(
+            conn = MagicMock(),
+            shutdown_event = MagicMock(),
+            ipc_status_flag = MagicMock(),
+            init_event = init_event,
+            error_event = error_event,
+            geom_type = "unknown",
+        )
+    error_event.set.assert_called_once()
+    init_event.set.assert_called_once()
+
+def test_lookup_table_quantized_to_motor_step():
+    '''
+    Lookup table covers -90 to +90 degrees at motor step resolution.
+    '''
+    # Arrange
+    lut = Scene_Lookup_Table(load_scene("line"), step=0.9)
+
+    # Act and assert
+    assert len(lut.angles) == 201
+    assert lut.lookup(45.2) == pytest.approx(10 / math.cos(math.radians(45.0)))
+    assert lut.index(-120) == 0
+    assert lut.index(120) == 200
+
+def test_lookup_table_rebuilds_on_scene_change():
+    '''
+    Changing the scene definition invalidates the lookup table.
+    '''
+    # Arrange
+    scene = load_scene("line")
+    lut = Scene_Lookup_Table(scene)
+    assert lut.lookup(0) == pytest.approx(10)
+
+    # Act: Place an obstacle in front of the wall
+    scene.add_circle(0, 5, 1)
+
+    # Assert
+    assert lut.lookup(0) == pytest.approx(4)
+
+def test_lookup_table_disk_cache(tmp_path):
+    '''
+    Tables are cached on disk keyed by the scene hash.
+    '''
+    # Arrange
+    scene = load_scene("two_obstacles")
+    first = Scene_Lookup_Table(scene, cache_dir=str(tmp_path))
+    cached = list(tmp_path.glob("scene_lut_*.npy"))
+
+    # Act: Second table loads from disk without ray-casting
+    with patch.object(Spatial_Scene, "distances") as mock_distances:
+        second = Scene_Lookup_Table(scene, cache_dir=str(tmp_path))
+
+    # Assert
+    assert len(cached) == 1
+    mock_distances.assert_not_called()
+    assert np.array_equal(first.table, second.table)
+
+def test_sweep_angles_every_nth_step():
+    '''
+    Sweeps range every Nth motor step and always include the final step.
+    '''
+    # Act
+    full = sweep_angles(-90, 90)
+    coarse = sweep_angles(10, -10, every_n=4)
+
+    # Assert
+    assert len(full) == 201
+    assert full[0] == -90 and full[-1] == 90
+    assert list(coarse) == pytest.approx([9.9, 6.3, 2.7, -0.9, -4.5, -8.1, -9.9])
+
+def test_plan_moves_minimizes_travel():
+    '''
+    Targets are merged per motor step and visited from the nearer extreme, with each target mapped to its stop.
+    '''
+    # Act
+    stops, index = plan_moves([30, -10, 5, 5.2, 60, -40], start=0)
+    monotonic, _ = plan_moves([-45, 0, 45, 90], start=80, reference=0.0, monotonic=True)
+
+    # Assert: 5 and 5.2 share a step; the negative side is nearer, so it is visited first
+    assert list(stops) == pytest.approx([-9.9, -39.6, 5.4, 29.7, 60.3])
+    assert list(stops[index]) == pytest.approx([29.7, -9.9, 5.4, 5.4, 60.3, -39.6])
+    assert list(monotonic) == pytest.approx([90, 45, 0, -45], abs=0.5)
+    assert move_time(stops, 0, speed=90) == pytest.approx(155 * 0.01)
+    assert move_time(stops, 0, speed=0) is None
+
+def test_simulation_sweep(simulation_mocks):
+    '''
+    Simulated sweeps return the whole profile and leave the sensor at the final angle.
+    '''
+    # Arrange
+    sim = Hardware_Sim(
+        conn = MagicMock(),
+        shutdown_event = MagicMock(),
+        ipc_status_flag = MagicMock(),
+        init_event = MagicMock(),
+        error_event = MagicMock(),
+    )
+
+    # Act
+    angles, distances = sim.sweep(-45, 45, every_n=2)
+
+    # Assert
+    assert len(angles) == len(distances) == 51
+    assert distances[0] == round(10 / math.cos(math.radians(45)), 1)
+    assert distances[25] == 10.0
+    assert sim.angle == 45.0
+
+def _run_simulation(conn, ipc_status_flag, init_event, error_event, shutdown_event, **options):
+    '''
+    Real-time process stand-in running the simulation loop
+    '''
+    Hardware_Sim(conn = conn, shutdown_event = shutdown_event, ipc_status_flag = ipc_status_flag,
+                 init_event = init_event, error_event = error_event, ipc_timeout = 5, **options)
+
+def test_simulation_ipc_timeout_shuts_down(tmp_path):
+    '''
+    The simulation shuts down and closes its recording when the caller stops sending within the IPC timeout.
+    '''
+    # Arrange: Pipe on which no target angle ever arrives
+    parent_conn, child_conn = multiprocessing.Pipe()
+    shutdown_event = MagicMock()
+    path = str(tmp_path / "session.bin")
+
+    # Act
+    Hardware_Sim(conn = child_conn, shutdown_event = shutdown_event, ipc_status_flag = MagicMock(value = 0),
+                 init_event = MagicMock(), error_event = MagicMock(), ipc_timeout = 0.05, record_path = path)
+
+    # Assert: Initial distance sent and recorded, then shut down after the timeout
+    assert recv_latest(parent_conn, timeout=1) == 10.0
+    shutdown_event.set.assert_called_once()
+    assert list(load_session(path)["distance"]) == [10.0]
+
+def test_simulation_sweep_over_pipe():
+    '''
+    A sweep command over the pipe returns the profile in a single reply.
+    '''
+    # Arrange: Start the simulation in its own process
+    parent_conn, child_conn = multiprocessing.Pipe()
+    ipc_status_flag = multiprocessing.Value('i', 0)
+    events = [multiprocessing.Event() for _ in range(3)]
+    process = multiprocessing.Process(target=_run_simulation, args=(child_conn, ipc_status_flag, *events))
+    process.start()
+
+    # Act
+    initial_distance = recv_latest(parent_conn, timeout=5)
+    angles, distances = request_sweep(parent_conn, -90, 90, every_n=5, timeout=5)
+    parent_conn.send(0.0)
+    final_distance = recv_latest(parent_conn, timeout=5)
+    process.terminate()
+    process.join()
+
+    # Assert
+    assert initial_distance == final_distance == 10.0
+    assert len(angles) == 41
+    assert distances[20] == 10.0
+
+def test_simulation_batch_over_pipe():
+    '''
+    A batch command measures every target angle and replies with all pairs in request order.
+    '''
+    # Arrange: Start the simulation in its own process
+    parent_conn, child_conn = multiprocessing.Pipe()
+    ipc_status_flag = multiprocessing.Value('i', 0)
+    events = [multiprocessing.Event() for _ in range(3)]
+    process = multiprocessing.Process(target=_run_simulation, args=(child_conn, ipc_status_flag, *events))
+    process.start()
+
+    # Act
+    recv_latest(parent_conn, timeout=5)
+    measurements = request_batch(parent_conn, [45, 0, -45], timeout=5)
+    process.terminate()
+    process.join()
+
+    # Assert
+    distance_45 = round(10 / math.cos(math.radians(45)), 1)
+    assert measurements == [(45.0, distance_45), (0.0, 10.0), (-45.0, distance_45)]
+
+def _scripted_session(**options):
+    '''
+    Run the simulation through an angle, a batch and a final angle, shutting it down on the last turn
+    '''
+    parent_conn, child_conn = multiprocessing.Pipe()
+    ipc_status_flag = multiprocessing.Value('i', 0)
+    events = [multiprocessing.Event() for _ in range(3)]
+    process = multiprocessing.Process(target=_run_simulation, args=(child_conn, ipc_status_flag, *events),
+                                      kwargs=options)
+    process.start()
+    replies = [recv_latest(parent_conn, timeout=5)]
+    parent_conn.send(45.0)
+    replies.append(recv_latest(parent_conn, timeout=5))
+    replies.append(request_batch(parent_conn, [30, -30], timeout=5))
+    ipc_status_flag.value = 1
+    parent_conn.send(0.0)
+    replies.append(recv_latest(parent_conn, timeout=5))
+    events[2].wait(5)
+    process.terminate()
+    process.join()
+    return replies
+
+def test_simulation_record_and_replay(tmp_path):
+    '''
+    A recorded session replays the same replies without the scene, turn by turn.
+    '''
+    # Arrange
+    path = str(tmp_path / "session.bin")
+
+    # Act
+    recorded = _scripted_session(geom_type = "two_obstacles", record_path = path)
+    session = load_session(path)
+    replayed = _scripted_session(geom_type = "line", replay_path = path)
+
+    # Assert
+    assert list(session["turn"]) == [0, 1, 2, 2, 3]
+    assert session["angle"] == pytest.approx([0.0, 45.0, 29.7, -29.7, 0.0])
+    assert list(session["commanded_angle"][:2]) == [0.0, 45.0]
+    assert replayed == recorded
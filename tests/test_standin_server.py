@@ -0,0 +1,143 @@
+'''
+Unit test for the local chat completions stand-in server and its search strategies
+'''
+import sys
+import os
+import json
+import threading
+import urllib.request
+import urllib.error
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../ai")))
+
+from search_strategies import SearchStrategy, make_strategy
+from standin_server import StandInServer, parse_observations
+
+@pytest.fixture
+def server_factory():
+    servers = []
+    def start(**options):
+        server = StandInServer(("127.0.0.1", 0), **options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def _post(server, body):
+    request = urllib.request.Request(
+        server.base_url + "/chat/completions", data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return response.read().decode("utf-8")
+
+def _conversation(*turns):
+    messages = [{"role": "user", "content": "prompt"}, {"role": "assistant", "content": "OK"}]
+    for distance, angle in turns:
+        messages.append({"role": "user", "content": str(distance)})
+        if angle is not None:
+            messages.append({"role": "assistant", "content": str(angle)})
+    return messages
+
+def test_bisection_converges_on_minimum():
+    '''
+    Bisection narrows in on the closest point of a V-shaped distance profile.
+    '''
+    # Arrange: Closest obstacle at 23 degrees
+    strategy = make_strategy("bisection")
+    observations = [(0.0, 100 + abs(0 - 23))]
+
+    # Act: Answer each requested angle until the strategy finishes
+    angle, finished = strategy.next_step(observations)
+    while not finished:
+        observations.append((angle, 100 + abs(angle - 23)))
+        angle, finished = strategy.next_step(observations)
+
+    # Assert
+    assert angle == pytest.approx(23, abs=1.8)
+    assert len(observations) < 20
+
+def test_strategy_requires_next_angle():
+    '''
+    A strategy without _next_angle cannot be created.
+    '''
+    class Incomplete(SearchStrategy):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_parse_observations_full_and_compact():
+    '''
+    Observations come from the raw history or from a compacted table, current position last.
+    '''
+    full = _conversation((500.0, 30), (97.9, -30), (575.6, None))
+    compact = [{"role": "user", "content": "prompt"}, {"role": "assistant", "content": "OK"},
+               {"role": "user", "content": "Measurements so far, sorted by angle:\nangle (degrees) | distance\n"
+                                           "-30 | 575.6\n0 | 500\n30 | 97.9\nCurrent angle: -30\n"
+                                           "Latest distance: 575.6"}]
+    symmetric = compact[:2] + [{"role": "user", "content": "Measurements so far, sorted by angle:\n"
+                                "angle (degrees) | distance\n-30 | 115.5\n0 | 100\n30 | 115.5\n"
+                                "Current angle: -30\nLatest distance: 115.5"}]
+    assert parse_observations(full) == [(0.0, 500.0), (30.0, 97.9), (-30.0, 575.6)]
+    assert parse_observations(compact) == [(0.0, 500.0), (30.0, 97.9), (-30.0, 575.6)]
+    assert parse_observations(symmetric)[-1] == (-30.0, 115.5)
+    assert parse_observations(full[:1]) is None
+
+def test_parse_observations_batch():
+    '''
+    Batch measurement messages contribute every angle: distance pair in order.
+    '''
+    messages = [{"role": "user", "content": "prompt"}, {"role": "assistant", "content": "OK"},
+                {"role": "user", "content": "0: 500"}, {"role": "assistant", "content": "-30, 30"},
+                {"role": "user", "content": "-30: 575.6; 30: 97.9"}]
+    assert parse_observations(messages) == [(0.0, 500.0), (-30.0, 575.6), (30.0, 97.9)]
+
+def test_chat_completion(server_factory):
+    '''
+    The stand-in follows the prompt protocol over the chat completions endpoint.
+    '''
+    # Arrange
+    server = server_factory(strategy="grid", max_turns=2)
+
+    # Act
+    first = json.loads(_post(server, {"model": "m", "messages": _conversation()[:1]}))
+    scan = json.loads(_post(server, {"model": "m", "messages": _conversation((500.0, None))}))
+    done = json.loads(_post(server, {"model": "m", "messages": _conversation((500.0, -90), (80.0, -80), (300.0, None))}))
+
+    # Assert
+    assert first["choices"][0]["message"]["content"] == "OK"
+    assert scan["choices"][0]["message"]["content"] == "-90"
+    assert done["choices"][0]["message"]["content"] == "FINISHED -90"
+    assert done["usage"]["prompt_tokens"] > 0
+
+def test_streaming_with_usage(server_factory):
+    '''
+    Streamed replies arrive as server-sent event chunks followed by usage and [DONE].
+    '''
+    # Arrange
+    server = server_factory(strategy="grid", chunk_size=1)
+
+    # Act
+    body = _post(server, {"model": "m", "stream": True, "stream_options": {"include_usage": True},
+                          "messages": _conversation((500.0, None))})
+
+    # Assert
+    events = [line[len("data: "):] for line in body.splitlines() if line.startswith("data: ")]
+    chunks = [json.loads(event) for event in events[:-1]]
+    text = "".join(chunk["choices"][0]["delta"].get("content") or "" for chunk in chunks if chunk["choices"])
+    assert text == "-90"
+    assert chunks[-1]["usage"]["completion_tokens"] > 0
+    assert events[-1] == "[DONE]"
+
+def test_failure_injection(server_factory):
+    '''
+    Injected failures return the configured HTTP error.
+    '''
+    server = server_factory(failure_rate=1.0, failure_status=429)
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        _post(server, {"model": "m", "messages": _conversation()[:1]})
+    assert excinfo.value.code == 429
@@ -0,0 +1,141 @@
+'''
+Unit test for the stepper motor driver speed profiles against the fake GPIO backend
+'''
+import sys
+import os
+import shutil
+import ctypes
+import threading
+import subprocess
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../hardware")))
+
+from stepper_motor_control_wrapper import Stepper_Motor
+from scan_planner import step_pauses_us
+
+DRIVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../libraries/Stepper_Motor_Hybrid"))
+FAKE_SOURCES = ["src/motor_control_api.c", "src/motor_timing.c", "fake/motor_gpio_fake.c"]
+
+@pytest.fixture(scope="module")
+def fake_driver(tmp_path_factory):
+    '''
+    Motor driver built against the fake GPIO backend (same sources as make motor_driver_fake.so)
+    '''
+    if shutil.which("gcc") is None:
+        pytest.skip("gcc is required to build the fake motor driver")
+    library_path = str(tmp_path_factory.mktemp("motor") / "motor_driver_fake.so")
+    subprocess.run(["gcc", "-shared", "-fPIC", "-O2", "-Ifake", "-Iinclude", "-o", library_path, *FAKE_SOURCES, "-lm"],
+                   cwd=DRIVER_DIR, check=True)
+    return library_path
+
+def _step_times(motor):
+    '''
+    Timestamps of the step events recorded since the last reset
+    '''
+    times = (ctypes.c_double * 4096)()
+    states = (ctypes.c_int * 4096)()
+    count = motor._lib.fake_gpio_get_events(times, states, 4096)
+    motor._lib.fake_gpio_reset()
+    return np.array(times[:count])
+
+def _lateness(times, pauses_us):
+    '''
+    Seconds each step fired after its scheduled time, measured from the first step
+    '''
+    schedule = np.concatenate(([0.0], np.cumsum(pauses_us[:len(times) - 1]) / 1e6))
+    return (times - times[0]) - schedule
+
+def test_constant_speed_without_ramps(fake_driver):
+    '''
+    Without acceleration every half step pauses for the cruise step time.
+    '''
+    # Arrange
+    motor = Stepper_Motor(library_path=fake_driver, speed=900)
+    motor._lib.fake_gpio_reset()
+
+    # Act: 0.9 degrees is a single half step
+    motor.motor_set_position_half_step(0.9)
+    single = _step_times(motor)
+    motor.motor_set_position_half_step(-9)
+    times = _step_times(motor)
+
+    # Assert
+    assert len(single) == 1
+    assert len(times) == 10
+    assert np.all(_lateness(times, np.full(10, 1000)) >= -1e-4)
+
+def test_trapezoidal_profile(fake_driver):
+    '''
+    Tests moves ramp up from the start speed, cruise, and ramp down for the last steps.
+    '''
+    # Arrange
+    motor = Stepper_Motor(library_path=fake_driver, speed=900, acceleration=20000, start_speed=90)
+    motor._lib.fake_gpio_reset()
+    expected = step_pauses_us(100, 900, 0.9, 20000, 90)
+
+    # Act
+    motor.motor_set_position_half_step(90)
+    times = _step_times(motor)
+    lateness = _lateness(times, expected)
+
+    # Assert: Steps follow the profile schedule and are never ahead of it
+    assert len(times) == 100
+    assert np.all(lateness >= -1e-4)
+    assert np.median(lateness) < 0.5e-3
+    assert expected[0] == 10000 and expected[50] == 1000 and expected[-1] == 10000
+    assert np.all(np.diff(expected[:20]) <= 0)
+
+def test_absolute_deadlines_and_jitter(fake_driver):
+    '''
+    Tests step times stay on absolute deadlines and every step's wake-up latency is recorded.
+    '''
+    # Arrange
+    motor = Stepper_Motor(library_path=fake_driver, speed=900)
+    motor._lib.fake_gpio_reset()
+    motor.motor_jitter_enable()
+
+    # Act
+    motor.motor_set_position_half_step(180)
+    times = _step_times(motor)
+    jitter = motor.motor_jitter_histogram()
+
+    # Assert: Per-step write and wake-up latency does not accumulate over 200 steps
+    assert len(times) == 200
+    assert np.median(_lateness(times, np.full(200, 1000))) < 0.5e-3
+    assert jitter["steps"] == 200
+    assert len(jitter["counts"]) == 64
+    assert jitter["max_us"] >= 0
+
+def test_async_move_poll_cancel_and_notify(fake_driver):
+    '''
+    Tests asynchronous moves return at once, report the live step position, and notify on completion or cancel.
+    '''
+    # Arrange
+    motor = Stepper_Motor(library_path=fake_driver, speed=90)
+    origin = motor.motor_step_position()
+    done = []
+    notified = threading.Event()
+
+    # Act: 90 degrees at 90 degrees/s takes a second; cancel part way
+    move = motor.motor_move_async(90)
+    move.add_done_callback(lambda future: (done.append(future.result()), notified.set()))
+    busy = motor.motor_move_busy()
+    finished_early = motor.motor_move_wait(timeout=0.1)
+    position = motor.motor_step_position() - origin
+    motor.motor_move_cancel()
+    final = move.result(timeout=1) - origin
+
+    # Assert
+    assert busy and not finished_early
+    assert 0 < position < 90
+    assert position <= final < 90
+    assert not motor.motor_move_busy()
+    assert notified.wait(timeout=1) and done == [final + origin]
+
+    # Act: A following blocking move runs to completion
+    motor.motor_set_position_half_step(-final)
+
+    # Assert
+    assert motor.motor_step_position() == pytest.approx(origin)
@@ -0,0 +1,74 @@
+'''
+Unit test for the shared-memory telemetry ring buffer
+'''
+import sys
+import os
+import multiprocessing
+import pytest
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../hardware")))
+
+from telemetry_buffer import Telemetry_Ring_Buffer
+
+@pytest.fixture
+def telemetry():
+    buffer = Telemetry_Ring_Buffer(capacity=8, create=True)
+    yield buffer
+    buffer.close()
+    buffer.unlink()
+
+def _writer(name, count):
+    '''
+    Real-time process stand-in publishing records
+    '''
+    buffer = Telemetry_Ring_Buffer(name=name)
+    for i in range(count):
+        buffer.write(angle=0.9 * i, distance=100.0 + i, ambient=i, signal=2 * i, spads=3 * i)
+    buffer.close()
+
+def test_latest_record(telemetry):
+    '''
+    The latest record holds every sensor field.
+    '''
+    # Arrange
+    assert telemetry.latest() is None
+    telemetry.write(angle=1.8, distance=250.0, ambient=12, signal=34, spads=56, status=0)
+
+    # Act
+    record = telemetry.read_latest()
+
+    # Assert
+    assert record["seq"] == 1
+    assert record["distance"] == 250.0
+    assert (record["ambient"], record["signal"], record["spads"]) == (12, 34, 56)
+
+def test_read_range_views_and_wraps(telemetry):
+    '''
+    Non-wrapping ranges are zero-copy views; wrapped ranges are returned in order.
+    '''
+    # Arrange: Overrun the 8 record ring
+    for i in range(12):
+        telemetry.write(angle=i, distance=i)
+
+    # Act
+    view = telemetry.read_range(9, 12)
+    wrapped = telemetry.read_range(1)
+
+    # Assert
+    assert np.shares_memory(view, telemetry.read_range(9, 10))
+    assert list(view["seq"]) == [9, 10, 11]
+    assert list(wrapped["seq"]) == list(range(5, 13))
+
+def test_cross_process_writer(telemetry):
+    '''
+    Records written by another process are visible to the reader.
+    '''
+    # Act
+    process = multiprocessing.Process(target=_writer, args=(telemetry.name, 5))
+    process.start()
+    process.join()
+
+    # Assert
+    assert telemetry.write_seq == 5
+    assert telemetry.read_latest()["distance"] == 104.0
@@ -0,0 +1,72 @@
+'''
+Unit test for VL53L1X sensor arrays on one I2C bus
+'''
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../hardware")))
+
+from tof_array import ToF_Array, Simulated_I2C_Bus, Simulated_ToF, Simulated_XSHUT_Line
+
+def _array(count=3, **options):
+    '''
+    Sensor array on a simulated bus; sensor i reads 100 * (i + 1)
+    '''
+    bus = Simulated_I2C_Bus()
+    devices = [Simulated_ToF(bus, distance = 100 * (i + 1)) for i in range(count)]
+    array = ToF_Array(xshut_lines = [Simulated_XSHUT_Line(device) for device in devices], bus = bus,
+                      sensor_factory = bus.sensor_at, sleep = lambda seconds: None, **options)
+    return array, bus, devices
+
+def test_xshut_address_assignment():
+    '''
+    Sensors are woken one at a time and each ends up alone at its own address.
+    '''
+    # Act
+    array, bus, devices = _array(addresses = ["0x30", 0x31, 0x29], offsets = [0, -15, 15])
+
+    # Assert
+    assert [device.address for device in devices] == [0x30, 0x31, 0x29]
+    assert array.sensors == devices
+    assert array.offsets == [0.0, -15.0, 15.0]
+    assert all(len(bus.devices_at(address)) == 1 for address in (0x30, 0x31, 0x29))
+
+def test_address_assignment_errors():
+    '''
+    Invalid address plans are rejected and a sensor that never answers is reported.
+    '''
+    # Act and assert: The default address can only be kept by the last sensor to wake
+    with pytest.raises(ValueError):
+        _array(addresses = [0x29, 0x30, 0x31])
+    with pytest.raises(ValueError):
+        _array(addresses = [0x30, 0x30, 0x31])
+
+    # Act and assert: Second sensor missing from the bus
+    bus = Simulated_I2C_Bus()
+    present = Simulated_ToF(bus)
+    missing = Simulated_ToF(Simulated_I2C_Bus())
+    with pytest.raises(RuntimeError):
+        ToF_Array(xshut_lines = [Simulated_XSHUT_Line(present), Simulated_XSHUT_Line(missing)], bus = bus,
+                  sensor_factory = bus.sensor_at, sleep = lambda seconds: None)
+
+@pytest.mark.parametrize("ranging, max_ranging", [("simultaneous", 3), ("interleaved", 1)])
+def test_ranging_modes(ranging, max_ranging):
+    '''
+    Both modes read every sensor in array order; interleaved arrays never range two sensors at once.
+    '''
+    # Arrange
+    array, bus, devices = _array(ranging = ranging)
+
+    # Act
+    array.initialize_ranging()
+    primary = array.read_sensor().distance
+    distances = [reading.distance for reading in array.read_all()]
+    others = [reading.distance for reading in array.read_all(first = 1)]
+
+    # Assert
+    assert primary == 100
+    assert distances == [100, 200, 300]
+    assert others == [200, 300]
+    assert bus.max_ranging == max_ranging
+    assert [device.reads for device in devices] == [2, 2, 2]
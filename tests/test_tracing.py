@@ -0,0 +1,75 @@
+'''
+Unit test for cross-process span tracing
+'''
+import sys
+import os
+import json
+import multiprocessing
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../hardware")))
+
+import tracing
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "trace.json"
+    tracing.enable(str(path))
+    yield path
+    tracing.disable()
+    tracing.set_process_name(None)
+
+def _child_spans():
+    tracing.set_process_name("hardware")
+    with tracing.span("hardware.move", rotate=1.8):
+        pass
+    tracing.flush()
+
+def test_span_disabled_is_shared_noop():
+    '''
+    With tracing off every span is the same no-op context manager.
+    '''
+    # Arrange
+    tracing.disable()
+
+    # Act
+    first = tracing.span("agent.update_angle")
+    second = tracing.span("hardware.move", rotate=0.9)
+    with first:
+        pass
+
+    # Assert
+    assert first is second
+    assert not tracing.enabled()
+    assert tracing.export() == 0
+
+def test_export_merges_processes(trace_file):
+    '''
+    Spans from the agent process and a child process end up in one Chrome trace.
+    '''
+    # Arrange
+    tracing.set_process_name("agent")
+    with tracing.span("agent.update_angle", turn=1):
+        pass
+    child = multiprocessing.get_context("fork").Process(target=_child_spans)
+
+    # Act
+    child.start()
+    child.join()
+    with pytest.raises(ValueError):
+        with tracing.span("main.dispatch", turn=1):
+            raise ValueError("failed")
+    count = tracing.export()
+
+    # Assert
+    events = json.loads(trace_file.read_text())["traceEvents"]
+    spans = {event["name"]: event for event in events if event["ph"] == "X"}
+    names = {event["pid"]: event["args"]["name"] for event in events if event["ph"] == "M"}
+    assert count == len(events) == 5
+    assert set(spans) == {"agent.update_angle", "hardware.move", "main.dispatch"}
+    assert names[spans["agent.update_angle"]["pid"]] == "agent"
+    assert names[spans["hardware.move"]["pid"]] == "hardware"
+    assert spans["hardware.move"]["args"] == {"rotate": 1.8}
+    assert spans["main.dispatch"]["args"] == {"turn": 1, "error": "ValueError"}
+    assert spans["agent.update_angle"]["ts"] <= spans["hardware.move"]["ts"] <= spans["main.dispatch"]["ts"]
+    assert not list(trace_file.parent.glob("*.part"))